@@ -4,6 +4,7 @@ ComfyUI Multi-View to 3D Preview Plugin
 """
 
 from .nodes import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+from . import routes  # 注册插件的 HTTP 路由
 
 __all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS']
 
@@ -0,0 +1,137 @@
+"""
+多视角图片的并行编码与写盘
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from .instrumentation import add_bytes, current_profile, timed
+
+
+def _default_workers():
+    """编码线程数：环境变量 MULTIVIEW_ENCODE_WORKERS，默认等于 CPU 核数"""
+    value = os.environ.get("MULTIVIEW_ENCODE_WORKERS", "")
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+ENCODE_WORKERS = _default_workers()
+
+# PIL 格式名对应的 MIME 类型（用于 data URI 和 HTTP 响应）
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+# 预览可选格式：临时预览优先考虑速度和体积
+PREVIEW_FORMATS = ["png", "jpeg", "webp", "webp_lossless"]
+# 保存可选格式：归档输出只允许无损格式
+ARCHIVE_FORMATS = ["png", "webp_lossless"]
+
+
+def get_save_options(image_format, quality=90, compress_level=6):
+    """根据格式名生成 PIL 保存参数，返回 (save_options, 文件扩展名)
+
+    quality 对 jpeg/webp 是画质，对 webp_lossless 是压缩力度（越大越慢越小）；
+    compress_level 只用于 png（0-9，越大越慢越小）。
+    """
+    if image_format == "png":
+        return {"format": "PNG", "compress_level": compress_level}, ".png"
+    if image_format == "jpeg":
+        return {"format": "JPEG", "quality": quality}, ".jpg"
+    if image_format == "webp":
+        return {"format": "WEBP", "quality": quality, "method": 4}, ".webp"
+    if image_format == "webp_lossless":
+        # exact 保留完全透明像素的 RGB，否则 libwebp 会丢弃它们，不再是真正的无损
+        return {"format": "WEBP", "lossless": True, "quality": quality, "exact": True}, ".webp"
+    raise ValueError(f"不支持的图片格式: {image_format}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_encode_pool():
+    """返回所有节点共享的编码线程池（首次使用时创建）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=ENCODE_WORKERS,
+                thread_name_prefix="multiview_encode",
+            )
+        return _pool
+
+
+def _write_view(img_np, filepath, save_options, profile=None):
+    """编码单张视角并写入文件或 BytesIO（PIL 压缩时会释放 GIL）
+
+    开启性能统计时先编码到内存再写入，分别记录 encode 和 write 的耗时。
+    """
+    pil_img = Image.fromarray(img_np)
+    # JPEG 不支持透明通道
+    if save_options.get("format") == "JPEG" and pil_img.mode not in ("RGB", "L"):
+        pil_img = pil_img.convert("RGB")
+    if profile is None:
+        pil_img.save(filepath, **save_options)
+        return filepath
+
+    buffer = io.BytesIO()
+    with timed(profile, "encode"):
+        pil_img.save(buffer, **save_options)
+    data = buffer.getbuffer()
+    if isinstance(filepath, str):
+        with timed(profile, "write"):
+            with open(filepath, "wb") as f:
+                f.write(data)
+        add_bytes(len(data), profile)
+    else:
+        filepath.write(data)
+    return filepath
+
+
+def encode_views(views_np, filepaths, save_options, workers=None, on_written=None):
+    """并行编码并写入所有视角，返回与输入顺序一致的文件路径列表
+
+    views_np 是 tensors_to_uint8 的结果，filepaths 与之一一对应，
+    save_options 原样传给 PIL.Image.save（例如 {"format": "PNG"}）。
+    workers 为 None 时使用共享线程池，否则临时创建指定大小的线程池。
+    on_written(index, filepath) 在每个文件写完后立即调用（可能在编码线程中）。
+    """
+    if len(views_np) != len(filepaths):
+        raise ValueError("图片数量与文件路径数量不一致")
+
+    jobs = list(enumerate(zip(views_np, filepaths)))
+    if workers is None:
+        workers = ENCODE_WORKERS
+    # 编码线程中拿不到当前节点的统计，在这里取出
+    profile = current_profile()
+
+    def run(job):
+        index, (img_np, path) = job
+        _write_view(img_np, path, save_options, profile)
+        if on_written is not None:
+            on_written(index, path)
+        return path
+
+    # 单张图片或单线程时直接在当前线程编码，省去调度开销
+    if workers <= 1 or len(jobs) <= 1:
+        return [run(job) for job in jobs]
+
+    if workers == ENCODE_WORKERS:
+        # map 按提交顺序返回结果，保证 view_NN 的顺序
+        return list(get_encode_pool().map(run, jobs))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="multiview_encode") as pool:
+        return list(pool.map(run, jobs))
+
+
+def encode_views_to_bytes(views_np, save_options, workers=None):
+    """并行编码所有视角到内存，返回与输入顺序一致的 bytes 列表"""
+    buffers = [io.BytesIO() for _ in range(len(views_np))]
+    encode_views(views_np, buffers, save_options, workers=workers)
+    return [buffer.getvalue() for buffer in buffers]
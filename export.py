@@ -0,0 +1,91 @@
+"""
+SaveMultiView3D 的导出：独立目录或单文件，原子写入
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import uuid
+
+from .instrumentation import current_profile, timed
+
+# 导出方式：bundle 每次保存一个独立目录；single_file 图片和 three.js 都嵌入一个 HTML；
+# shared_folder 为旧行为，图片直接写在输出目录（会覆盖同名文件）
+EXPORT_MODES = ["bundle", "single_file", "shared_folder"]
+
+MANIFEST_NAME = "manifest.json"
+
+
+@contextlib.contextmanager
+def atomic_path(path):
+    """给出同目录下的临时路径，代码块正常结束后重命名为 path，出错时删除临时文件
+
+    用于需要自己写文件（例如逐帧写入）的场景；已有完整数据时用 write_atomic。
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_atomic(path, data, profile=None):
+    """先写临时文件再重命名，读者不会看到写了一半的文件
+
+    profile 为性能统计（在编码线程中调用时需要显式传入）。
+    """
+    profile = profile or current_profile()
+    mode = "w" if isinstance(data, str) else "wb"
+    encoding = "utf-8" if isinstance(data, str) else None
+    with timed(profile, "write"):
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, mode, encoding=encoding) as f:
+                f.write(data)
+    if profile is not None:
+        profile.add_bytes(os.path.getsize(path))
+
+
+def reserve_path(directory, stem, suffix="", is_dir=False):
+    """原子地占用一个不重名的路径：{stem}_00001{suffix}、{stem}_00002{suffix} ...
+
+    目录用 mkdir、文件用独占创建（"x" 模式），多个进程同时保存也不会拿到同一个名字。
+    """
+    os.makedirs(directory, exist_ok=True)
+    counter = 1
+    while True:
+        path = os.path.join(directory, f"{stem}_{counter:05d}{suffix}")
+        try:
+            if is_dir:
+                os.mkdir(path)
+            else:
+                with open(path, "x"):
+                    pass
+            return path
+        except FileExistsError:
+            counter += 1
+
+
+def build_manifest(views_np, image_files, image_data, html_file, settings):
+    """生成导出清单；相同输入得到完全相同的内容（键排序、无时间戳）"""
+    views = []
+    for idx, (img_np, name, data) in enumerate(zip(views_np, image_files, image_data)):
+        views.append({
+            "index": idx,
+            "file": name,
+            "width": int(img_np.shape[1]),
+            "height": int(img_np.shape[0]),
+            "channels": int(img_np.shape[2]) if img_np.ndim == 3 else 1,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+
+    manifest = {
+        "html": html_file,
+        "settings": settings,
+        "view_count": len(views),
+        "views": views,
+    }
+    return json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True)
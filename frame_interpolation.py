@@ -0,0 +1,145 @@
+"""
+相邻视角之间的补帧：交叉淡化和按整体位移平移后的混合（不需要光流）
+
+所有视角对在一次批量运算中处理，每个插值时刻只做一次批量插值。
+"""
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from .multi_view import MultiViewImages
+
+# blend 直接交叉淡化；shift_blend 先估计相邻视角的整体位移，把两张图各自平移到中间位置再混合
+FRAME_INTERPOLATION_METHODS = ["shift_blend", "blend"]
+
+# 位移估计使用的最大边长，以及可信位移的上限（占宽/高的比例），超过时退回交叉淡化
+SHIFT_ESTIMATE_SIZE = 128
+MAX_SHIFT_FRACTION = 0.25
+
+
+def _gray(batch):
+    """[N, H, W, C] -> [N, H, W] 灰度"""
+    if batch.shape[-1] >= 3:
+        return batch[..., :3].mean(dim=-1)
+    return batch[..., 0]
+
+
+def estimate_shifts(first, second):
+    """用相位相关估计每对视角的整体位移，返回 (dx, dy) 两个 [N] 张量（原尺寸像素）
+
+    位移的含义：second 中的内容相对 first 移动了 (dx, dy)。
+    """
+    height, width = first.shape[1:3]
+    scale = min(1.0, SHIFT_ESTIMATE_SIZE / max(height, width))
+    size = (max(1, round(height * scale)), max(1, round(width * scale)))
+
+    pair = torch.stack([_gray(first), _gray(second)], dim=1).float()
+    if size != (height, width):
+        pair = F.interpolate(pair, size=size, mode="area")
+    pair = pair - pair.mean(dim=(-2, -1), keepdim=True)
+    # 加窗减弱边缘不连续带来的假峰
+    window = torch.outer(
+        torch.hann_window(size[0], periodic=False, device=pair.device),
+        torch.hann_window(size[1], periodic=False, device=pair.device),
+    )
+    pair = pair * window
+
+    spectrum_a = torch.fft.rfft2(pair[:, 0])
+    spectrum_b = torch.fft.rfft2(pair[:, 1])
+    cross = spectrum_b * spectrum_a.conj()
+    cross = cross / cross.abs().clamp_min(1e-8)
+    correlation = torch.fft.irfft2(cross, s=size)
+
+    peak = correlation.flatten(1).argmax(dim=1)
+    dy = peak // size[1]
+    dx = peak % size[1]
+    dy = torch.where(dy > size[0] // 2, dy - size[0], dy).float()
+    dx = torch.where(dx > size[1] // 2, dx - size[1], dx).float()
+    dx = dx * (width / size[1])
+    dy = dy * (height / size[0])
+
+    # 位移过大时多半不是整体平移，不做平移
+    unreliable = (dx.abs() > MAX_SHIFT_FRACTION * width) | (dy.abs() > MAX_SHIFT_FRACTION * height)
+    dx = torch.where(unreliable, torch.zeros_like(dx), dx)
+    dy = torch.where(unreliable, torch.zeros_like(dy), dy)
+    return dx, dy
+
+
+def _translate(batch, dx, dy):
+    """把 [N, H, W, C] 的内容平移 (dx, dy) 像素，超出部分用边缘像素填充"""
+    count, height, width = batch.shape[:3]
+    ys = torch.linspace(-1 + 1 / height, 1 - 1 / height, height, device=batch.device)
+    xs = torch.linspace(-1 + 1 / width, 1 - 1 / width, width, device=batch.device)
+    grid_y, grid_x = torch.meshgrid(ys, xs, indexing="ij")
+    grid = torch.stack([grid_x, grid_y], dim=-1).expand(count, height, width, 2).clone()
+    # out(x) = in(x - d)，归一化坐标中一个像素为 2 / size
+    grid[..., 0] -= (dx * (2.0 / width))[:, None, None]
+    grid[..., 1] -= (dy * (2.0 / height))[:, None, None]
+    shifted = F.grid_sample(
+        batch.permute(0, 3, 1, 2), grid, mode="bilinear", padding_mode="border", align_corners=False
+    )
+    return shifted.permute(0, 2, 3, 1)
+
+
+def _interpolate_angles(start, end, t, wrap):
+    """按 t 在两组角度之间插值；wrap 时沿正方向绕过 360°"""
+    delta = end - start
+    if wrap:
+        delta = delta % 360.0
+    return start + delta * t
+
+
+def interpolate_views(multi_view_images, inbetween_frames, method="shift_blend", loop=True):
+    """在相邻视角之间插入 inbetween_frames 帧，返回新的 MultiViewImages
+
+    loop 时最后一个视角和第一个视角之间也插帧（适合环绕一周的转台）。
+    插入的帧沿用前一个视角的 source_indices，方位角/俯仰角按比例插值。
+    """
+    images = multi_view_images.images
+    count = images.shape[0]
+    if inbetween_frames <= 0 or count < 2:
+        return multi_view_images
+
+    source = images if images.is_floating_point() else images.float() / 255.0
+    pairs = count if loop else count - 1
+    first = source[:pairs]
+    second = source.roll(-1, dims=0) if loop else source[1:]
+
+    step = inbetween_frames + 1
+    total = pairs * step + (0 if loop else 1)
+    out = torch.empty((total,) + tuple(source.shape[1:]), dtype=source.dtype, device=source.device)
+    out[0:pairs * step:step] = first
+    if not loop:
+        out[-1] = source[-1]
+
+    if method == "shift_blend":
+        dx, dy = estimate_shifts(first, second)
+    for offset in range(1, step):
+        t = offset / step
+        if method == "shift_blend":
+            a = _translate(first, dx * t, dy * t)
+            b = _translate(second, -dx * (1 - t), -dy * (1 - t))
+        else:
+            a, b = first, second
+        out[offset:pairs * step:step] = torch.lerp(a, b, t)
+
+    # 元数据：视角本身保持原值，插入的帧按比例插值
+    t = np.arange(step) / step
+    following = np.roll(np.arange(count), -1)[:pairs]
+    azimuths = multi_view_images.azimuths.astype(np.float64)
+    elevations = multi_view_images.elevations.astype(np.float64)
+    new_azimuths = _interpolate_angles(azimuths[:pairs, None], azimuths[following, None], t, True).reshape(-1)
+    new_elevations = _interpolate_angles(elevations[:pairs, None], elevations[following, None], t, False).reshape(-1)
+    new_sources = np.repeat(multi_view_images.source_indices[:pairs], step)
+    if not loop:
+        new_azimuths = np.append(new_azimuths, azimuths[-1])
+        new_elevations = np.append(new_elevations, elevations[-1])
+        new_sources = np.append(new_sources, multi_view_images.source_indices[-1])
+
+    return MultiViewImages(
+        out,
+        azimuths=new_azimuths,
+        elevations=new_elevations,
+        source_indices=new_sources,
+    )
@@ -0,0 +1,256 @@
+"""
+多视角图片的张量/数组处理工具
+"""
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from .instrumentation import stage
+
+
+def _as_batch(images):
+    """把图片列表或批量张量统一成 [batch, height, width, channels] 张量
+
+    列表中的每一项是 ComfyUI 的 [batch, height, width, channels] 张量，
+    和之前的逐张处理一致，只取每一项的第一张。所有视角尺寸一致时返回
+    拼接后的批量张量，否则返回 None。
+    """
+    if isinstance(images, torch.Tensor):
+        return images
+
+    views = [img[:1] for img in images]
+    if len({tuple(v.shape[1:]) for v in views}) != 1:
+        return None
+
+    device = views[0].device
+    return torch.cat([v.to(device) for v in views], dim=0)
+
+
+def uint8_nbytes(images):
+    """全分辨率 uint8 像素数据的字节数（输入与 tensors_to_uint8 相同）"""
+    if isinstance(images, torch.Tensor):
+        return images.numel()
+    return sum(img[0].numel() for img in images)
+
+
+def _quantize(batch):
+    """在张量所在设备上完成截断、缩放和量化，返回 uint8 张量"""
+    if batch.dtype == torch.uint8:
+        return batch
+    # 只分配一份与批量等大的浮点临时张量，后续均为原地操作
+    scaled = batch.float() if batch.dtype != torch.float32 else batch.clone()
+    scaled.clamp_(0.0, 1.0).mul_(255.0)
+    return scaled.to(torch.uint8)
+
+
+def tensors_to_uint8(images, copy=False):
+    """把多视角图片一次性转换为 uint8 的 NumPy 数据
+
+    images 可以是 [batch, height, width, channels] 张量，也可以是
+    旧格式 MULTI_VIEW_IMAGES 中的图片列表。尺寸一致时所有视角在原设备上批量量化，
+    只做一次设备到主机的拷贝，返回连续的 [batch, height, width, channels]
+    uint8 数组；尺寸不一致时退化为逐张转换，返回 uint8 数组列表。
+    两种返回值都可以直接按视角迭代。
+
+    uint8 的 CPU 输入默认不复制，返回的数组与输入共享内存；copy=True 时保证返回独立的数据
+    （后台写入等在节点返回后才读取数据的场景）。
+    """
+    if not isinstance(images, torch.Tensor) and len(images) == 0:
+        raise ValueError("图片列表不能为空")
+
+    batch = _as_batch(images)
+    if batch is None:
+        with stage("convert"):
+            return [
+                _to_numpy(_quantize(img[:1]), copy and img.dtype == torch.uint8)[0]
+                for img in images
+            ]
+
+    with stage("convert"):
+        quantized = _quantize(batch)
+    with stage("copy"):
+        return _to_numpy(quantized, copy and quantized is images)
+
+
+def _to_numpy(tensor, copy=False):
+    """连续的 NumPy 数组；copy 时 CPU 张量也复制一份"""
+    if copy and tensor.device.type == "cpu":
+        return tensor.numpy().copy()
+    return np.ascontiguousarray(tensor.cpu().numpy())
+
+
+def preview_size(height, width, max_size, power_of_two=False):
+    """计算预览尺寸，返回 (height, width)
+
+    max_size 限制长边（0 表示不限制），按原比例缩小，不会放大。
+    power_of_two 时每条边再向下取到 2 的幂，便于 WebGL 生成 mipmap。
+    """
+    if max_size > 0 and max(height, width) > max_size:
+        scale = max_size / max(height, width)
+        height = max(1, round(height * scale))
+        width = max(1, round(width * scale))
+    if power_of_two:
+        height = 1 << (height.bit_length() - 1)
+        width = 1 << (width.bit_length() - 1)
+    return height, width
+
+
+# uint8 批量（例如内存映射的批量）缩放时每次处理的视角数，避免整批转换为浮点
+UINT8_RESIZE_CHUNK = 4
+
+
+def resize_views(images, max_size, power_of_two=False):
+    """批量缩小多视角图片到预览尺寸
+
+    输入与 tensors_to_uint8 相同；尺寸一致时整批一次插值，返回
+    [batch, height, width, channels] 张量，否则逐张缩放并返回张量列表。
+    uint8 输入分块缩放并保持 uint8，临时内存只与块大小有关。
+    """
+    batch = _as_batch(images)
+    if batch is None:
+        return [resize_views(img[:1], max_size, power_of_two) for img in images]
+
+    height, width = batch.shape[1:3]
+    size = preview_size(height, width, max_size, power_of_two)
+    if size == (height, width):
+        return batch
+
+    with stage("resize"):
+        if batch.dtype != torch.uint8:
+            return _interpolate(batch, size)
+
+        out = torch.empty((batch.shape[0],) + size + (batch.shape[3],), dtype=torch.uint8, device=batch.device)
+        for start in range(0, batch.shape[0], UINT8_RESIZE_CHUNK):
+            chunk = batch[start:start + UINT8_RESIZE_CHUNK]
+            out[start:start + len(chunk)] = _quantize(_interpolate(chunk, size))
+        return out
+
+
+def _interpolate(batch, size):
+    """对 [batch, height, width, channels] 张量整批做双线性插值"""
+    nchw = batch.permute(0, 3, 1, 2)
+    if not nchw.is_floating_point():
+        nchw = nchw.float() / 255.0
+    resized = F.interpolate(nchw, size=size, mode="bilinear", align_corners=False, antialias=True)
+    return resized.permute(0, 2, 3, 1).contiguous()
+
+
+# 尺寸不一致时的统一方式：
+# fit 按比例缩放到目标尺寸内再居中补边，stretch 直接拉伸，pad 不缩放只居中补边
+NORMALIZE_MODES = ["fit", "stretch", "pad"]
+
+
+def _unify_channels(batch, channels):
+    """把灰度/RGB/RGBA 统一为 channels 个通道（补出的透明度为不透明）"""
+    current = batch.shape[-1]
+    if current == channels:
+        return batch
+    if current in (1, 2):
+        # 灰度（可带透明度）先扩展为 RGB
+        color = batch[..., :1].expand(*batch.shape[:-1], 3)
+        alpha = batch[..., 1:] if current == 2 else None
+    elif current in (3, 4):
+        color = batch[..., :3]
+        alpha = batch[..., 3:] if current == 4 else None
+    else:
+        raise ValueError(f"不支持 {current} 通道的图片")
+
+    if channels == 3:
+        return color.contiguous()
+    if alpha is None:
+        alpha = torch.ones_like(batch[..., :1])
+    return torch.cat([color, alpha], dim=-1)
+
+
+def normalize_views(images, mode="fit"):
+    """把尺寸或通道数不同的视角统一成一个连续的批量张量
+
+    images 是 [batch, height, width, channels] 张量列表，每项只取第一张。
+    目标分辨率取所有视角的最大高度和最大宽度；任一视角带透明通道时统一为 RGBA，
+    否则统一为 RGB。相同形状的视角分为一组，每组只做一次插值。
+    """
+    views = [img[:1] for img in images]
+    if len(views) == 0:
+        raise ValueError("图片列表不能为空")
+    if mode not in NORMALIZE_MODES:
+        raise ValueError(f"不支持的统一方式: {mode}")
+
+    device = views[0].device
+    dtype = views[0].dtype if views[0].is_floating_point() else torch.float32
+    target_h = max(v.shape[1] for v in views)
+    target_w = max(v.shape[2] for v in views)
+    channels = 4 if any(v.shape[-1] in (2, 4) for v in views) else 3
+
+    # 形状全部一致时直接拼接，不需要额外的输出缓冲
+    if len({tuple(v.shape[1:]) for v in views}) == 1:
+        batch = torch.cat([v.to(device) for v in views], dim=0)
+        return _unify_channels(batch, channels)
+
+    groups = {}
+    for idx, view in enumerate(views):
+        groups.setdefault(tuple(view.shape[1:3]), []).append(idx)
+
+    # 补边区域为黑色；RGBA 时透明度为 0
+    out = torch.zeros((len(views), target_h, target_w, channels), dtype=dtype, device=device)
+    for (height, width), indices in groups.items():
+        batch = torch.cat([_unify_channels(views[i].to(device), channels) for i in indices], dim=0)
+        if not batch.is_floating_point():
+            batch = batch.to(dtype) / 255.0
+
+        if mode == "stretch":
+            size = (target_h, target_w)
+        elif mode == "fit":
+            scale = min(target_h / height, target_w / width)
+            size = (max(1, round(height * scale)), max(1, round(width * scale)))
+        else:
+            size = (height, width)
+        if size != (height, width):
+            batch = _interpolate(batch, size)
+
+        top = (target_h - size[0]) // 2
+        left = (target_w - size[1]) // 2
+        index = torch.as_tensor(indices, dtype=torch.long, device=device)
+        out[index, top:top + size[0], left:left + size[1]] = batch.to(dtype)
+
+    return out
+
+
+def pack_atlas(views_np, max_atlas_size=4096):
+    """把同尺寸的视角拼成网格图集，返回 (图集页列表, 每个视角的区域)
+
+    每页最多 max_atlas_size × max_atlas_size 像素，放不下时分成多页。
+    区域为 [page, x, y, w, h]，按页尺寸归一化，原点在左上角。
+    """
+    count, height, width, channels = views_np.shape
+    cols = max(1, min(max_atlas_size // width, int(np.ceil(np.sqrt(count)))))
+    rows = max(1, min(max_atlas_size // height, -(-count // cols)))
+    per_page = cols * rows
+
+    pages = []
+    rects = []
+    for start in range(0, count, per_page):
+        chunk = views_np[start:start + per_page]
+        page_rows = -(-len(chunk) // cols)
+        # 不足一行的空位补零，然后一次重排为 [rows*H, cols*W, C]
+        if len(chunk) < page_rows * cols:
+            filler = np.zeros((page_rows * cols - len(chunk), height, width, channels), dtype=views_np.dtype)
+            chunk = np.concatenate([chunk, filler])
+        page = (
+            chunk.reshape(page_rows, cols, height, width, channels)
+            .transpose(0, 2, 1, 3, 4)
+            .reshape(page_rows * height, cols * width, channels)
+        )
+        pages.append(np.ascontiguousarray(page))
+
+        for offset in range(min(per_page, count - start)):
+            row, col = divmod(offset, cols)
+            rects.append([
+                len(pages) - 1,
+                col / cols,
+                row / page_rows,
+                1.0 / cols,
+                1.0 / page_rows,
+            ])
+
+    return pages, rects
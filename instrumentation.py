@@ -0,0 +1,198 @@
+"""
+可选的性能统计：每个节点各阶段的耗时、写入字节数和峰值内存
+
+环境变量 MULTIVIEW_PROFILE=1 开启；设置 MULTIVIEW_PROFILE_LOG=<文件路径> 时同时开启，
+并把每次节点执行的统计追加为一行 JSON。统计结果放在节点 ui 的 "profile" 中，
+3D 预览节点的悬停提示会显示。未开启时 stage() 只多一次变量查询。
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import torch
+
+try:
+    import resource
+except ImportError:
+    # Windows 没有 resource 模块
+    resource = None
+
+PROFILE_ENV = "MULTIVIEW_PROFILE"
+PROFILE_LOG_ENV = "MULTIVIEW_PROFILE_LOG"
+
+# 当前正在执行的节点的统计（编码线程中拿不到，需要显式传入）
+_current = contextvars.ContextVar("multiview_profile", default=None)
+_log_lock = threading.Lock()
+
+
+def profiling_enabled():
+    if os.environ.get(PROFILE_LOG_ENV):
+        return True
+    return os.environ.get(PROFILE_ENV, "").strip().lower() not in ("", "0", "false", "no")
+
+
+def _status_bytes(field):
+    """/proc/self/status 中的内存字段（字节），不是 Linux 时返回 None"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_bytes():
+    peak = _status_bytes("VmHWM:")
+    if peak is not None:
+        return peak
+    if resource is None:
+        return None
+    # ru_maxrss 在 Linux 上是 KB，在 macOS 上是字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Profile:
+    """一次节点执行的统计
+
+    stages 中的耗时按阶段累加；在编码线程中记录的阶段（encode、write、decode）是所有线程的耗时之和，
+    可能超过节点的总耗时。
+    """
+
+    def __init__(self, node, node_id=None):
+        self.node = node
+        self.node_id = node_id
+        self.stages = {}
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        # 只读取不重置：进程的峰值（VmHWM）是全局状态，其他代码也可能在用
+        self._start_peak = _peak_rss_bytes()
+        self._start_rss = _status_bytes("VmRSS:")
+        self._cuda = torch.cuda.is_available()
+        if self._cuda:
+            torch.cuda.reset_peak_memory_stats()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.bytes_written += count
+
+    def _rss_growth(self, peak_rss):
+        """相对节点开始时常驻内存的增长
+
+        节点执行期间进程峰值升高时，新峰值就是本节点的峰值；没有升高时本节点的峰值不超过之前的峰值，
+        只能用结束时的常驻内存作为下限。
+        """
+        if self._start_peak is not None and peak_rss > self._start_peak:
+            return peak_rss - self._start_rss
+        end_rss = _status_bytes("VmRSS:")
+        return max(0, (end_rss or self._start_rss) - self._start_rss)
+
+    def summary(self):
+        summary = {
+            "node": self.node,
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 2),
+            "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            "bytes_written": self.bytes_written,
+        }
+        if self.node_id is not None:
+            summary["node_id"] = str(self.node_id)
+        peak_rss = _peak_rss_bytes()
+        if peak_rss is not None:
+            summary["peak_rss_mb"] = round(peak_rss / 2**20, 1)
+            if self._start_rss is not None:
+                summary["peak_rss_growth_mb"] = round(self._rss_growth(peak_rss) / 2**20, 1)
+        if self._cuda:
+            summary["peak_cuda_mb"] = round(torch.cuda.max_memory_allocated() / 2**20, 1)
+        return summary
+
+
+def current_profile():
+    """当前节点的统计，未开启时为 None；需要在编码线程中记录时先取出再传进去"""
+    return _current.get()
+
+
+@contextmanager
+def timed(profile, name):
+    """把代码块的耗时记到 profile 的 name 阶段；profile 为 None 时什么也不做"""
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - start)
+
+
+def stage(name):
+    """在当前节点的统计中记录一个阶段"""
+    return timed(_current.get(), name)
+
+
+def add_bytes(count, profile=None):
+    profile = profile or _current.get()
+    if profile is not None:
+        profile.add_bytes(count)
+
+
+def _append_log(summary):
+    path = os.environ.get(PROFILE_LOG_ENV)
+    if not path:
+        return
+    line = json.dumps({"time": round(time.time(), 3), **summary}, ensure_ascii=False)
+    with _log_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _attach(result, summary):
+    """把统计放进节点返回值的 ui 中；只返回元组的节点改为 {"ui", "result"} 形式"""
+    if isinstance(result, dict):
+        result.setdefault("ui", {})["profile"] = [summary]
+        return result
+    return {"ui": {"profile": [summary]}, "result": result}
+
+
+def instrument_node(cls):
+    """包装节点的 FUNCTION 方法：开启统计时记录每次执行，未开启时直接调用原方法"""
+    function = getattr(cls, cls.FUNCTION)
+    if getattr(function, "_instrumented", False):
+        return cls
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        if not profiling_enabled():
+            return function(self, *args, **kwargs)
+
+        profile = Profile(cls.__name__, kwargs.get("unique_id"))
+        token = _current.set(profile)
+        try:
+            result = function(self, *args, **kwargs)
+        except BaseException as error:
+            summary = profile.summary()
+            summary["error"] = repr(error)
+            _append_log(summary)
+            raise
+        finally:
+            _current.reset(token)
+
+        summary = profile.summary()
+        _append_log(summary)
+        return _attach(result, summary)
+
+    wrapper._instrumented = True
+    setattr(cls, cls.FUNCTION, wrapper)
+    return cls
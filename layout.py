@@ -0,0 +1,182 @@
+"""
+3D 预览中每个视角的摆放位置
+
+前端预览和导出的 HTML 都直接使用这里计算好的变换矩阵，不再各自实现一遍布局。
+矩阵作用于 2x2 的平面（PlaneGeometry(2, 2)），按列主序展开为 16 个数，
+与 three.js 的 Matrix4.fromArray 一致。
+"""
+
+import numpy as np
+
+# carousel/sphere/cube 为原有布局；multi_ring 把视角分成多层环，turntable 按每个视角的方位角/俯仰角摆放
+LAYOUT_MODES = ["carousel", "sphere", "cube", "multi_ring", "turntable"]
+
+RADIUS = 3.0
+CUBE_DISTANCE = 2.0
+RING_SIZE = 12
+RING_SPACING = 2.2
+PLANE_SIZE = 2.0
+
+# 立方体的六个面（前、后、左、右、上、下）：位置和欧拉角 (rx, ry)
+CUBE_FACES = np.array([
+    [0, 0, 1, 0, 0],
+    [0, 0, -1, 0, np.pi],
+    [-1, 0, 0, 0, -np.pi / 2],
+    [1, 0, 0, 0, np.pi / 2],
+    [0, 1, 0, -np.pi / 2, 0],
+    [0, -1, 0, np.pi / 2, 0],
+], dtype=np.float64)
+
+
+def _rot_x(angles):
+    """绕 X 轴旋转，angles 为 [N] 弧度，返回 [N, 3, 3]"""
+    c, s = np.cos(angles), np.sin(angles)
+    one, zero = np.ones_like(angles), np.zeros_like(angles)
+    return np.stack([
+        np.stack([one, zero, zero], -1),
+        np.stack([zero, c, -s], -1),
+        np.stack([zero, s, c], -1),
+    ], -2)
+
+
+def _rot_y(angles):
+    """绕 Y 轴旋转，angles 为 [N] 弧度，返回 [N, 3, 3]"""
+    c, s = np.cos(angles), np.sin(angles)
+    one, zero = np.ones_like(angles), np.zeros_like(angles)
+    return np.stack([
+        np.stack([c, zero, s], -1),
+        np.stack([zero, one, zero], -1),
+        np.stack([-s, zero, c], -1),
+    ], -2)
+
+
+def _look_at_origin(positions):
+    """与 three.js 中 Object3D.lookAt(0, 0, 0) 相同：平面正面 (+Z) 朝向原点"""
+    z = -positions / np.linalg.norm(positions, axis=1, keepdims=True)
+    up = np.array([0.0, 1.0, 0.0])
+    x = np.cross(up, z)
+    # 正面与上方向平行时稍微偏移一下，与 three.js 的处理方式一致
+    degenerate = np.linalg.norm(x, axis=1) < 1e-12
+    if degenerate.any():
+        z[degenerate, 2] += 0.0001
+        z[degenerate] /= np.linalg.norm(z[degenerate], axis=1, keepdims=True)
+        x[degenerate] = np.cross(up, z[degenerate])
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    y = np.cross(z, x)
+    return np.stack([x, y, z], -1)
+
+
+def _carousel(count):
+    angles = np.arange(count) / count * 2 * np.pi
+    positions = np.stack([np.cos(angles) * RADIUS, np.zeros(count), np.sin(angles) * RADIUS], -1)
+    return positions, _rot_y(-angles), np.ones(count)
+
+
+def _sphere(count):
+    index = np.arange(count)
+    phi = np.arccos(np.clip(-1 + 2 * index / count, -1, 1))
+    theta = np.sqrt(count * np.pi) * phi
+    positions = np.stack([
+        RADIUS * np.cos(theta) * np.sin(phi),
+        RADIUS * np.sin(theta) * np.sin(phi),
+        RADIUS * np.cos(phi),
+    ], -1)
+    return positions, _look_at_origin(positions), np.ones(count)
+
+
+def _cube(count):
+    """前六个视角与原来相同，各占一个面；超过六个时每个面按网格平铺，不再丢弃多出的视角"""
+    index = np.arange(count)
+    faces = CUBE_FACES[index % 6]
+    slots = index // 6
+    grid = int(np.ceil(np.sqrt(np.ceil(count / 6))))
+
+    # 面内网格的偏移（面自身坐标系下），网格为 1 时就是面的中心
+    cell = PLANE_SIZE / grid
+    local = np.stack([
+        -PLANE_SIZE / 2 + cell * (slots % grid + 0.5),
+        PLANE_SIZE / 2 - cell * (slots // grid + 0.5),
+        np.zeros(count),
+    ], -1)
+
+    # three.js 默认欧拉角顺序为 XYZ
+    rotations = _rot_x(faces[:, 3]) @ _rot_y(faces[:, 4])
+    positions = faces[:, :3] * CUBE_DISTANCE + np.einsum("nij,nj->ni", rotations, local)
+    return positions, rotations, np.full(count, 1.0 / grid)
+
+
+def _outward(azimuths, elevations, radius):
+    """朝外的平面：方位角 0 在正前方 (+Z)，俯仰角向上为正，平面正面背离中心"""
+    directions = np.stack([
+        np.cos(elevations) * np.sin(azimuths),
+        np.sin(elevations),
+        np.cos(elevations) * np.cos(azimuths),
+    ], -1)
+    return directions * radius[:, None], _rot_y(azimuths) @ _rot_x(-elevations)
+
+
+def _multi_ring(count, elevations=None):
+    """多层环形：有不同的俯仰角时每个俯仰角一层，否则每 RING_SIZE 个视角一层"""
+    if elevations is not None and len(np.unique(elevations)) > 1:
+        _, rings = np.unique(elevations, return_inverse=True)
+    else:
+        rings = np.arange(count) // RING_SIZE
+    ring_count = int(rings.max()) + 1
+
+    # 每个视角在本层中的序号和本层的视角数
+    order = np.argsort(rings, kind="stable")
+    sizes = np.bincount(rings, minlength=ring_count)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    slots = np.empty(count, dtype=np.int64)
+    slots[order] = np.arange(count) - np.repeat(starts, sizes)
+    ring_sizes = sizes[rings]
+
+    azimuths = slots / ring_sizes * 2 * np.pi
+    # 半径保证同一层的平面不会互相重叠
+    radius = np.maximum(RADIUS, ring_sizes * PLANE_SIZE * 1.1 / (2 * np.pi))
+    positions, rotations = _outward(azimuths, np.zeros(count), radius)
+    positions[:, 1] = (rings - (ring_count - 1) / 2) * RING_SPACING
+    return positions, rotations, np.ones(count)
+
+
+def _turntable(count, azimuths=None, elevations=None):
+    """按视角的拍摄角度摆放在球面上；没有角度信息时按 360° 均分、俯仰为 0"""
+    azimuths = np.arange(count) * (360.0 / count) if azimuths is None else np.asarray(azimuths, np.float64)
+    elevations = np.zeros(count) if elevations is None else np.asarray(elevations, np.float64)
+    positions, rotations = _outward(np.radians(azimuths), np.radians(elevations), np.full(count, RADIUS))
+    return positions, rotations, np.ones(count)
+
+
+def compute_layout(mode, count, azimuths=None, elevations=None):
+    """计算每个视角的变换矩阵，返回 [count, 16] 的 float32 数组（列主序）
+
+    azimuths / elevations 为每个视角的方位角、俯仰角（角度），turntable 和 multi_ring 会用到。
+    """
+    if count <= 0:
+        return np.zeros((0, 16), dtype=np.float32)
+
+    if mode == "carousel":
+        positions, rotations, scales = _carousel(count)
+    elif mode == "sphere":
+        positions, rotations, scales = _sphere(count)
+    elif mode == "cube":
+        positions, rotations, scales = _cube(count)
+    elif mode == "multi_ring":
+        positions, rotations, scales = _multi_ring(
+            count, None if elevations is None else np.asarray(elevations, np.float64)
+        )
+    elif mode == "turntable":
+        positions, rotations, scales = _turntable(count, azimuths, elevations)
+    else:
+        raise ValueError(f"未知的预览模式: {mode}")
+
+    matrices = np.zeros((count, 4, 4), dtype=np.float64)
+    matrices[:, :3, :3] = rotations * scales[:, None, None]
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices.transpose(0, 2, 1).reshape(count, 16).astype(np.float32)
+
+
+def layout_to_json(matrices, decimals=5):
+    """转换为可以放进 ui 数据和 HTML 的嵌套列表"""
+    return np.round(matrices.astype(np.float64), decimals).tolist()
@@ -0,0 +1,53 @@
+"""
+大批量多视角图片的内存映射存储
+
+把 float32 批量按 uint8 写入临时目录中的内存映射文件，下游节点拿到的是映射文件上的张量，
+只有实际访问到的视角才会读入内存，且这部分是可以被系统回收的文件页。
+"""
+
+import os
+import uuid
+import weakref
+
+import numpy as np
+import torch
+
+from .image_utils import tensors_to_uint8
+
+# 写入映射文件时每次转换的视角数（决定了转换过程中的临时内存）
+MAP_CHUNK_VIEWS = 4
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def map_views(images, directory, chunk_views=MAP_CHUNK_VIEWS):
+    """把 [batch, height, width, channels] 张量写入内存映射文件，返回映射文件上的 uint8 张量
+
+    文件在张量释放后删除；POSIX 系统上映射建立后就删除目录项，进程异常退出也不会留下文件。
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"views_{uuid.uuid4().hex}.u8")
+
+    # 通过普通文件写入（数据只进入系统的页缓存），写完后再映射，
+    # 这样写入过程不会让整批数据都算进本进程的常驻内存
+    try:
+        with open(path, "wb") as f:
+            for start in range(0, images.shape[0], chunk_views):
+                f.write(tensors_to_uint8(images[start:start + chunk_views]))
+        # copy-on-write 映射：下游即使原地修改也不会写回文件
+        mapped = np.memmap(path, dtype=np.uint8, mode="c", shape=tuple(images.shape))
+    except BaseException:
+        _remove_quietly(path)
+        raise
+
+    if os.name == "posix":
+        _remove_quietly(path)
+    else:
+        weakref.finalize(mapped, _remove_quietly, path)
+    return torch.from_numpy(mapped)
+
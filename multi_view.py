@@ -0,0 +1,92 @@
+"""
+MULTI_VIEW_IMAGES 数据类型
+"""
+
+import numpy as np
+import torch
+
+
+class MultiViewImages:
+    """多视角图片：一个连续的批量张量加上每个视角的元数据
+
+    - tensor: [batch, height, width, channels] 张量，所有视角共用同一块内存
+    - azimuths / elevations: 每个视角的方位角、俯仰角（角度），默认按 360° 均分、俯仰为 0
+    - source_indices: 每个视角在上游批量中的序号
+
+    旧版本的 MULTI_VIEW_IMAGES 是 {"images": [[1, H, W, C], ...]} 字典，
+    本类仍支持 data["images"] 取得这样的列表（只是原张量的切片视图，不会复制）。
+    """
+
+    def __init__(self, tensor, azimuths=None, elevations=None, source_indices=None):
+        if tensor.ndim != 4 or tensor.shape[0] == 0:
+            raise ValueError("多视角图片必须是非空的 [batch, height, width, channels] 张量")
+
+        count = tensor.shape[0]
+        self.tensor = tensor
+        self.azimuths = (
+            np.arange(count, dtype=np.float32) * (360.0 / count)
+            if azimuths is None else np.asarray(azimuths, dtype=np.float32)
+        )
+        self.elevations = (
+            np.zeros(count, dtype=np.float32)
+            if elevations is None else np.asarray(elevations, dtype=np.float32)
+        )
+        self.source_indices = (
+            np.arange(count, dtype=np.int64)
+            if source_indices is None else np.asarray(source_indices, dtype=np.int64)
+        )
+
+        for name in ("azimuths", "elevations", "source_indices"):
+            if len(getattr(self, name)) != count:
+                raise ValueError(f"{name} 的长度必须等于视角数量 {count}")
+
+    def __len__(self):
+        return self.tensor.shape[0]
+
+    def __getitem__(self, key):
+        # 兼容旧的 {"images": [...]} 字典格式
+        if key == "images":
+            return list(self.tensor.split(1))
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    @property
+    def images(self):
+        """节点内部使用的批量张量"""
+        return self.tensor
+
+    def select(self, indices):
+        """按序号挑选视角；indices 为连续区间时返回的张量不复制数据"""
+        if isinstance(indices, slice):
+            tensor = self.tensor[indices]
+        else:
+            tensor = self.tensor[torch.as_tensor(indices, dtype=torch.long, device=self.tensor.device)]
+        return MultiViewImages(
+            tensor,
+            azimuths=self.azimuths[indices],
+            elevations=self.elevations[indices],
+            source_indices=self.source_indices[indices],
+        )
+
+
+def get_view_images(multi_view_images):
+    """取出节点可直接处理的图片
+
+    MultiViewImages 返回整个批量张量；旧的字典格式返回其中的张量列表。
+    image_utils 中的函数两种输入都接受。
+    """
+    if isinstance(multi_view_images, MultiViewImages):
+        return multi_view_images.images
+    return multi_view_images["images"]
+
+
+def get_view_angles(multi_view_images):
+    """取出每个视角的 (方位角, 俯仰角)，旧的字典格式没有角度信息时返回 (None, None)"""
+    if isinstance(multi_view_images, MultiViewImages):
+        return multi_view_images.azimuths, multi_view_images.elevations
+    return None, None
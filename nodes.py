@@ -4,13 +4,232 @@ Multi-View to 3D Preview Nodes
 
 import torch
 import numpy as np
-from PIL import Image
 import io
 import base64
+import functools
 import json
 import os
+import threading
+import uuid
 import folder_paths
 
+try:
+    from server import PromptServer
+except ImportError:
+    # 不在 ComfyUI 中运行（例如测试）时没有 websocket 推送
+    PromptServer = None
+
+from .encoding import (
+    ARCHIVE_FORMATS,
+    MIME_TYPES,
+    PREVIEW_FORMATS,
+    encode_views,
+    encode_views_to_bytes,
+    get_encode_pool,
+    get_save_options,
+)
+from .export import EXPORT_MODES, MANIFEST_NAME, build_manifest, reserve_path, write_atomic
+from .frame_interpolation import FRAME_INTERPOLATION_METHODS, interpolate_views
+from .image_utils import (
+    NORMALIZE_MODES,
+    normalize_views,
+    pack_atlas,
+    resize_views,
+    tensors_to_uint8,
+    uint8_nbytes,
+)
+from .instrumentation import add_bytes, current_profile, instrument_node, stage
+from .layout import LAYOUT_MODES, compute_layout, layout_to_json
+from .mapped_batch import map_views
+from .multi_view import MultiViewImages, get_view_angles, get_view_images
+from .preview_store import PreviewStore, link_file
+from .text_list import (
+    MAX_PAGE_SIZE,
+    TEXT_DISPLAY_MODES,
+    TEXT_LIST_STORE,
+    TextList,
+    merge_text_lists,
+    parse_text_list,
+    summarize_text_list,
+)
+from .threejs import THREEJS_FILENAME, load_threejs_source, threejs_script_tag
+from .turntable import FORMAT_EXTENSIONS, INTERPOLATION_MODES, TURNTABLE_FORMATS, TurntableFrames, write_turntable
+from .view_cache import ViewCache, hash_views, make_key
+from .view_loader import load_views, source_fingerprint
+from .view_store import VIEW_STORE, view_id
+from .write_queue import WriteQueue
+
+
+# 节点后加的参数一律放在 INPUT_TYPES 的 optional 中，缺少这些输入的旧工作流（包括 API 格式）照常通过校验
+
+# 预览节点共享的编码缓存：上游图片未变化时直接复用已写入的临时文件
+PREVIEW_CACHE = ViewCache()
+
+# 预览节点创建的临时子目录，按字节数和目录数上限淘汰
+PREVIEW_STORE = PreviewStore(folder_paths.get_temp_directory)
+
+# 内存映射批量文件所在的临时子目录
+MAPPED_SUBFOLDER = "multiview_mapped"
+
+
+def _send_to_client(event, data):
+    """通过 ComfyUI 的 websocket 推送消息，不在 ComfyUI 中运行时忽略"""
+    server = getattr(PromptServer, "instance", None)
+    if server is not None:
+        server.send_sync(event, data, server.client_id)
+
+
+def _report_write_failure(description, error):
+    """后台写入失败时通知前端"""
+    _send_to_client("multiview3d.write_failed", {"path": description, "error": str(error)})
+
+
+# SaveMultiView3D 的后台写入队列（MULTIVIEW_WRITE_QUEUE_MB 控制排队数据的内存预算）
+WRITE_QUEUE = WriteQueue(on_failure=_report_write_failure)
+
+
+def _encode_unique_views(views_np, save_options, lookup, target, store, on_view=None):
+    """按内容去重后编码视角，返回 (ui 列表, 本次编码字节数, 命中数)
+
+    内容和编码参数都未变化的视角直接复用之前的编码结果，同一批次中重复的视角只编码一次。
+    编码结果存到哪里由调用方决定：
+    - lookup(key) 返回已有结果的 ui 条目，没有时返回 None
+    - target(key, idx, digest) 返回编码的写入目标（文件路径或 BytesIO）
+    - store(key, target) 在写入目标写完后调用（可能在编码线程中），返回 (ui 条目, 字节数)
+    on_view(indices, image) 在每个视角可用时调用：已有结果的立即调用，其余在编码完成后调用。
+    """
+    with stage("hash"):
+        digests = hash_views(views_np)
+    keys = [
+        make_key(digest, img_np, save_options)
+        for digest, img_np in zip(digests, views_np)
+    ]
+    
+    images = [None] * len(keys)
+    pending = {}
+    for idx, key in enumerate(keys):
+        if key in pending:
+            # 同一批次中重复的视角只编码一次
+            pending[key].append(idx)
+            continue
+        image = lookup(key)
+        if image is not None:
+            images[idx] = image
+            if on_view is not None:
+                on_view([idx], image)
+        else:
+            pending[key] = [idx]
+    
+    pending_keys = list(pending)
+    sizes = [0] * len(pending_keys)
+    
+    def on_written(job, written):
+        key = pending_keys[job]
+        image, sizes[job] = store(key, written)
+        for idx in pending[key]:
+            images[idx] = image
+        if on_view is not None:
+            on_view(pending[key], image)
+    
+    if pending_keys:
+        first_indices = [pending[key][0] for key in pending_keys]
+        encode_views(
+            [views_np[idx] for idx in first_indices],
+            [target(key, idx, digests[idx]) for key, idx in zip(pending_keys, first_indices)],
+            save_options,
+            on_written=on_written,
+        )
+    
+    hits = len(keys) - sum(len(indices) for indices in pending.values())
+    return images, sum(sizes), hits
+
+
+def _save_temp_views(views_np, subfolder_prefix, save_options, ext, owner=None, name_prefix="view",
+                     on_view=None):
+    """把视角写入临时目录，返回 (ui 图片列表, 本次写入字节数, 命中数)
+
+    未变化的视角直接引用缓存中的旧文件（见 _encode_unique_views）。
+    owner 是节点 id，有 id 时写入该节点固定的子目录（文件名带内容摘要，避免浏览器缓存旧图）。
+    缓存中的文件在其他子目录时链接到本次的子目录：每个节点只引用自己目录中的文件，
+    其他节点清理自己的目录时不会删掉它正在显示的图片。
+    """
+    subfolder, full_output_folder = PREVIEW_STORE.acquire(subfolder_prefix, owner)
+    
+    def lookup(key):
+        entry = PREVIEW_CACHE.get(key)
+        if entry is not None and entry["subfolder"] != subfolder:
+            entry = _adopt_cached(key, entry, subfolder, full_output_folder)
+        if entry is None:
+            return None
+        return {"filename": entry["filename"], "subfolder": subfolder, "type": "temp"}
+    
+    def target(key, idx, digest):
+        return os.path.join(full_output_folder, f"{name_prefix}_{idx:02d}_{digest[:8]}{ext}")
+    
+    def store(key, path):
+        size = os.path.getsize(path)
+        name = os.path.basename(path)
+        PREVIEW_CACHE.put(key, {
+            "filename": name,
+            "subfolder": subfolder,
+            "type": "temp",
+            "path": path,
+            "size": size,
+        })
+        return {"filename": name, "subfolder": subfolder, "type": "temp"}, size
+    
+    image_files, bytes_written, hits = _encode_unique_views(views_np, save_options, lookup, target, store, on_view)
+    
+    # 记录本次引用的文件，清理过期文件并限制临时目录总占用
+    PREVIEW_STORE.commit(image_files, subfolder)
+    return image_files, bytes_written, hits
+
+
+def _memory_previews(nbytes):
+    """3D 预览的视角是否放在内存中由插件路由提供
+
+    需要在 ComfyUI 中运行（路由已注册），并且未压缩的像素数据不超过内存预算，
+    否则同一次预览的视角可能在浏览器请求之前就被淘汰。
+    """
+    return getattr(PromptServer, "instance", None) is not None and 0 < nbytes <= VIEW_STORE.max_bytes
+
+
+def _store_views(views_np, save_options, on_view=None):
+    """把视角编码到内存存储，返回 (ui 视角列表, 本次编码字节数, 命中数)
+
+    未变化的视角直接复用（见 _encode_unique_views）。
+    ui 中每一项是 {"view_id"}，前端从 /multiview3d/view/{view_id} 读取。
+    """
+    mime = MIME_TYPES[save_options["format"]]
+    
+    def lookup(key):
+        id_ = view_id(key)
+        return {"view_id": id_} if VIEW_STORE.get(id_) is not None else None
+    
+    def target(key, idx, digest):
+        return io.BytesIO()
+    
+    def store(key, buffer):
+        # 先放进存储再通知前端，浏览器收到消息时一定能取到
+        data = buffer.getvalue()
+        id_ = view_id(key)
+        VIEW_STORE.put(id_, data, mime)
+        return {"view_id": id_}, len(data)
+    
+    return _encode_unique_views(views_np, save_options, lookup, target, store, on_view)
+
+
+def _adopt_cached(key, entry, subfolder, folder):
+    """把缓存中其他子目录的文件链接到 subfolder，返回新的缓存条目；源文件已被删除时返回 None"""
+    path = os.path.join(folder, entry["filename"])
+    try:
+        link_file(entry["path"], path)
+    except FileNotFoundError:
+        return None
+    entry = {**entry, "subfolder": subfolder, "path": path}
+    PREVIEW_CACHE.put(key, entry)
+    return entry
+
 
 class MultiViewImageBatch:
     """多视角图片批量输入节点（接受图片列表）"""
@@ -20,6 +239,10 @@ class MultiViewImageBatch:
         return {
             "required": {
                 "images": ("IMAGE",),  # 接受批量图片
+            },
+            "optional": {
+                # 大批量时写入临时目录的 uint8 内存映射文件，下游节点按需读取
+                "memory_mapped": ("BOOLEAN", {"default": False}),
             }
         }
     
@@ -28,7 +251,7 @@ class MultiViewImageBatch:
     FUNCTION = "process_batch"
     CATEGORY = "image/3D"
     
-    def process_batch(self, images):
+    def process_batch(self, images, memory_mapped=False):
         """处理批量图片输入"""
         # images 的形状是 [batch, height, width, channels]
         batch_size = images.shape[0]
@@ -36,32 +259,29 @@ class MultiViewImageBatch:
         if batch_size == 0:
             raise ValueError("图片列表不能为空")
         
-        # 将批量图片拆分为单独的图片
-        image_list = []
-        for i in range(batch_size):
-            # 保持维度，每个图片仍然是 [1, height, width, channels]
-            img = images[i:i+1]
-            image_list.append(img)
+        if memory_mapped:
+            # 每次只转换几个视角，下游拿到的是映射文件上的 uint8 张量
+            mapped = map_views(images, os.path.join(folder_paths.get_temp_directory(), MAPPED_SUBFOLDER))
+            return (MultiViewImages(mapped),)
         
-        return ({"images": image_list},)
+        # 直接引用原批量张量，不拆分为单张图片
+        return (MultiViewImages(images),)
 
 
 class MultiViewImageInput:
     """多视角图片输入节点（单个图片输入）"""
     
+    # 前端会随连线动态增减 image_N 输入，这里声明可接受的最大数量
+    MAX_INPUTS = 64
+    
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {},
             "optional": {
-                "image_1": ("IMAGE",),
-                "image_2": ("IMAGE",),
-                "image_3": ("IMAGE",),
-                "image_4": ("IMAGE",),
-                "image_5": ("IMAGE",),
-                "image_6": ("IMAGE",),
-                "image_7": ("IMAGE",),
-                "image_8": ("IMAGE",),
+                # 可选，缺少该输入的旧工作流按默认的 fit 处理
+                "resize_mode": (NORMALIZE_MODES,),
+                **{f"image_{i}": ("IMAGE",) for i in range(1, cls.MAX_INPUTS + 1)},
             }
         }
     
@@ -70,18 +290,100 @@ class MultiViewImageInput:
     FUNCTION = "process_images"
     CATEGORY = "image/3D"
     
-    def process_images(self, **kwargs):
+    def process_images(self, resize_mode="fit", **kwargs):
         """处理多个输入图片"""
-        images = []
-        for i in range(1, 9):
-            key = f"image_{i}"
-            if key in kwargs and kwargs[key] is not None:
-                images.append(kwargs[key])
+        keys = sorted(
+            (key for key in kwargs if key.startswith("image_") and key[6:].isdigit()),
+            key=lambda key: int(key[6:]),
+        )
+        images = [kwargs[key] for key in keys if kwargs[key] is not None]
         
         if len(images) == 0:
             raise ValueError("至少需要一张图片")
         
-        return ({"images": images},)
+        # 尺寸、通道数不同的图片统一为一个连续批量，后续可以一次性编码
+        return (MultiViewImages(normalize_views(images, resize_mode)),)
+
+
+class LoadMultiViewImages:
+    """从目录、zip/tar 压缩包或导出的 3D 预览目录读取多视角图片"""
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                # 相对路径基于 ComfyUI 的输出目录
+                "path": ("STRING", {"default": ""}),
+                "pattern": ("STRING", {"default": "*"}),
+                "max_size": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 8192,
+                    "step": 64
+                }),
+                "prefetch": ("INT", {
+                    "default": 8,
+                    "min": 1,
+                    "max": 64,
+                    "step": 1
+                }),
+            }
+        }
+    
+    RETURN_TYPES = ("MULTI_VIEW_IMAGES",)
+    RETURN_NAMES = ("multi_view_images",)
+    FUNCTION = "load_images"
+    CATEGORY = "image/3D"
+    
+    @staticmethod
+    def _resolve_path(path):
+        path = os.path.expanduser(path.strip())
+        if not os.path.isabs(path):
+            path = os.path.join(folder_paths.get_output_directory(), path)
+        return path
+    
+    @classmethod
+    def IS_CHANGED(cls, path, pattern="*", **kwargs):
+        return source_fingerprint(cls._resolve_path(path), pattern)
+    
+    def load_images(self, path, pattern="*", max_size=0, prefetch=8):
+        """按顺序读取，解码并行进行，max_size 大于 0 时按缩小的尺寸解码"""
+        if not path.strip():
+            raise ValueError("请填写图片目录或压缩包路径")
+        images = load_views(self._resolve_path(path), pattern, max_size, prefetch)
+        return (MultiViewImages(images),)
+
+
+class MultiViewFrameInterpolation:
+    """在相邻视角之间补帧，少量视角也能得到流畅的转台"""
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "multi_view_images": ("MULTI_VIEW_IMAGES",),
+                "inbetween_frames": ("INT", {
+                    "default": 3,
+                    "min": 0,
+                    "max": 32,
+                    "step": 1
+                }),
+                "method": (FRAME_INTERPOLATION_METHODS,),
+                "loop": ("BOOLEAN", {"default": True}),
+            }
+        }
+    
+    RETURN_TYPES = ("MULTI_VIEW_IMAGES",)
+    RETURN_NAMES = ("multi_view_images",)
+    FUNCTION = "interpolate"
+    CATEGORY = "image/3D"
+    
+    def interpolate(self, multi_view_images, inbetween_frames, method="shift_blend", loop=True):
+        """所有相邻视角对一次批量插值"""
+        if not isinstance(multi_view_images, MultiViewImages):
+            # 旧格式的图片列表先统一成一个批量
+            multi_view_images = MultiViewImages(normalize_views(get_view_images(multi_view_images)))
+        return (interpolate_views(multi_view_images, inbetween_frames, method, loop),)
 
 
 class MultiView3DPreview:
@@ -92,7 +394,7 @@ class MultiView3DPreview:
         return {
             "required": {
                 "multi_view_images": ("MULTI_VIEW_IMAGES",),
-                "preview_mode": (["carousel", "sphere", "cube"],),
+                "preview_mode": (LAYOUT_MODES,),
                 "rotation_speed": ("FLOAT", {
                     "default": 1.0,
                     "min": 0.1,
@@ -100,6 +402,33 @@ class MultiView3DPreview:
                     "step": 0.1
                 }),
                 "auto_rotate": ("BOOLEAN", {"default": True}),
+            },
+            "optional": {
+                "preview_format": (PREVIEW_FORMATS,),
+                "quality": ("INT", {
+                    "default": 90,
+                    "min": 1,
+                    "max": 100,
+                    "step": 1
+                }),
+                "png_compress_level": ("INT", {
+                    "default": 6,
+                    "min": 0,
+                    "max": 9,
+                    "step": 1
+                }),
+                "max_preview_size": ("INT", {
+                    "default": 1024,
+                    "min": 0,
+                    "max": 8192,
+                    "step": 64
+                }),
+                "power_of_two": ("BOOLEAN", {"default": False}),
+                "atlas": ("BOOLEAN", {"default": False}),
+                "stream_views": ("BOOLEAN", {"default": True}),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
             }
         }
     
@@ -108,57 +437,103 @@ class MultiView3DPreview:
     FUNCTION = "preview_3d"
     CATEGORY = "image/3D"
     
-    def preview_3d(self, multi_view_images, preview_mode, rotation_speed, auto_rotate):
+    def preview_3d(self, multi_view_images, preview_mode, rotation_speed, auto_rotate,
+                   preview_format="png", quality=90, png_compress_level=6,
+                   max_preview_size=1024, power_of_two=False, atlas=False, stream_views=True,
+                   unique_id=None):
         """生成3D预览"""
-        images = multi_view_images["images"]
-        
-        # 保存图片到临时目录（避免 base64 数据过大导致 HTTP 错误）
-        import tempfile
-        import uuid
-        from pathlib import Path
-        
-        # 获取 ComfyUI 的临时目录
-        temp_dir = folder_paths.get_temp_directory()
-        session_id = str(uuid.uuid4())[:8]
-        
-        image_files = []
-        subfolder = f"multiview_{session_id}"
-        full_output_folder = os.path.join(temp_dir, subfolder)
-        os.makedirs(full_output_folder, exist_ok=True)
-        
-        for idx, img_tensor in enumerate(images):
-            # ComfyUI的图片格式是 [batch, height, width, channels]
-            # 取第一个batch
-            img_np = img_tensor[0].cpu().numpy()
-            
-            # 转换为0-255范围
-            img_np = (img_np * 255).astype(np.uint8)
-            
-            # 转换为PIL Image
-            pil_img = Image.fromarray(img_np)
-            
-            # 保存到临时文件
-            filename = f"view_{idx:02d}.png"
-            filepath = os.path.join(full_output_folder, filename)
-            pil_img.save(filepath, format="PNG")
+        images = get_view_images(multi_view_images)
+        
+        # 每个视角的摆放位置在这里统一计算，前端直接应用变换矩阵
+        with stage("layout"):
+            layout = layout_to_json(compute_layout(preview_mode, len(images), *get_view_angles(multi_view_images)))
+        
+        # 预览画布只有几百像素，先批量缩小到预览尺寸（max_preview_size 为 0 时保持原尺寸）
+        preview_images = resize_views(images, max_preview_size, power_of_two)
+        
+        # 批量转换为 0-255 的 uint8 数据（只做一次设备到主机的拷贝）
+        views_np = tensors_to_uint8(preview_images)
+        
+        # 编码后放在内存中由插件路由提供；不在 ComfyUI 中运行或超出内存预算时保存到临时目录
+        # （避免 base64 数据过大导致 HTTP 错误），未变化的视角都会复用之前的编码结果
+        save_options, ext = get_save_options(preview_format, quality, png_compress_level)
+        preview_bytes = sum(img_np.nbytes for img_np in views_np)
+        in_memory = _memory_previews(preview_bytes)
+        
+        def save_views(views, name_prefix="view", on_view=None):
+            if in_memory:
+                return _store_views(views, save_options, on_view=on_view)
+            return _save_temp_views(views, "multiview", save_options, ext, owner=unique_id,
+                                    name_prefix=name_prefix, on_view=on_view)
+        
+        atlas_rects = None
+        on_view = None
+        if atlas and isinstance(views_np, np.ndarray):
+            # 图集模式：所有视角拼成一张（或几张）大图，浏览器只需一次请求和一次纹理上传
+            atlas_pages, atlas_rects = pack_atlas(views_np)
+            image_files, bytes_written, cache_hits = save_views(atlas_pages, name_prefix="atlas")
+            cache_misses = len(atlas_pages) - cache_hits
+        else:
+            if stream_views and unique_id is not None:
+                # 流式预览：每个视角写完就推送给前端，不必等所有视角编码完成
+                stream_id = str(uuid.uuid4())[:8]
+                stream_info = {
+                    "node": unique_id,
+                    "stream_id": stream_id,
+                    "total": len(views_np),
+                    "preview_mode": preview_mode,
+                    "rotation_speed": rotation_speed,
+                    "auto_rotate": auto_rotate,
+                }
+                # 每个视角一条消息，按视角顺序发出：缓存命中的视角立即可用，
+                # 编码线程先写完的视角等前面的视角就绪后再发
+                ready = {}
+                next_index = 0
+                send_lock = threading.Lock()
+                
+                def on_view(indices, image):
+                    nonlocal next_index
+                    with send_lock:
+                        for idx in indices:
+                            ready[idx] = image
+                        while next_index in ready:
+                            _send_to_client("multiview3d.view", {
+                                **stream_info,
+                                "indices": [next_index],
+                                "matrices": [layout[next_index]],
+                                "image": ready.pop(next_index),
+                            })
+                            next_index += 1
             
-            # 记录文件信息（使用 ComfyUI 的标准格式）
-            image_files.append({
-                "filename": filename,
-                "subfolder": subfolder,
-                "type": "temp"
-            })
+            image_files, bytes_written, cache_hits = save_views(views_np, on_view=on_view)
+            cache_misses = len(views_np) - cache_hits
+        
+        # 统计缩小后节省的纹理字节数（未压缩的 uint8 像素数据）
+        full_bytes = uint8_nbytes(images)
         
         # 返回预览数据（使用文件路径而不是 base64）
-        return {
+        result = {
             "ui": {
-                "images": image_files,
+                # 内存中的视角不能经 /view 读取，换一个键，避免 ComfyUI 按普通图片显示
+                ("views" if in_memory else "images"): image_files,
                 "image_count": [len(images)],
                 "preview_mode": [preview_mode],
                 "rotation_speed": [rotation_speed],
                 "auto_rotate": [auto_rotate],
+                "preview_size": [list(views_np[0].shape[1::-1])],
+                "layout": [layout],
+                # 内存模式下为编码后放入内存的字节数
+                "bytes_written": [bytes_written],
+                "bytes_saved": [full_bytes - preview_bytes],
+                "cache_hits": [cache_hits],
+                "cache_misses": [cache_misses],
             }
         }
+        if atlas_rects is not None:
+            result["ui"]["atlas_rects"] = [atlas_rects]
+        if on_view is not None:
+            result["ui"]["stream_id"] = [stream_id]
+        return result
 
 
 class MultiViewImagePreview:
@@ -169,6 +544,24 @@ class MultiViewImagePreview:
         return {
             "required": {
                 "multi_view_images": ("MULTI_VIEW_IMAGES",),
+            },
+            "optional": {
+                "preview_format": (PREVIEW_FORMATS,),
+                "quality": ("INT", {
+                    "default": 90,
+                    "min": 1,
+                    "max": 100,
+                    "step": 1
+                }),
+                "png_compress_level": ("INT", {
+                    "default": 4,
+                    "min": 0,
+                    "max": 9,
+                    "step": 1
+                }),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
             }
         }
     
@@ -177,36 +570,19 @@ class MultiViewImagePreview:
     FUNCTION = "preview_images"
     CATEGORY = "image/3D"
     
-    def preview_images(self, multi_view_images):
+    def preview_images(self, multi_view_images, preview_format="png", quality=90,
+                       png_compress_level=4, unique_id=None):
         """使用 ComfyUI 标准方式预览图片"""
-        images = multi_view_images["images"]
-        
-        # 保存图片到临时目录
-        import uuid
-        temp_dir = folder_paths.get_temp_directory()
-        session_id = str(uuid.uuid4())[:8]
-        
-        results = []
-        subfolder = f"multiview_preview_{session_id}"
-        full_output_folder = os.path.join(temp_dir, subfolder)
-        os.makedirs(full_output_folder, exist_ok=True)
-        
-        for idx, img_tensor in enumerate(images):
-            # 转换图片
-            img_np = img_tensor[0].cpu().numpy()
-            img_np = (img_np * 255).astype(np.uint8)
-            pil_img = Image.fromarray(img_np)
-            
-            # 保存文件
-            filename = f"view_{idx:02d}.png"
-            filepath = os.path.join(full_output_folder, filename)
-            pil_img.save(filepath, format="PNG", compress_level=4)
-            
-            results.append({
-                "filename": filename,
-                "subfolder": subfolder,
-                "type": "temp"
-            })
+        images = get_view_images(multi_view_images)
+        
+        # 批量转换图片
+        views_np = tensors_to_uint8(images)
+        
+        # 并行保存到临时目录，未变化的视角复用缓存
+        save_options, ext = get_save_options(preview_format, quality, png_compress_level)
+        results, _, _ = _save_temp_views(
+            views_np, "multiview_preview", save_options, ext, owner=unique_id
+        )
         
         return {
             "ui": {
@@ -223,52 +599,30 @@ class TextListMerge:
         return {
             "required": {},
             "optional": {
-                "list_1": ("STRING", {"forceInput": True}),
-                "list_2": ("STRING", {"forceInput": True}),
-                "list_3": ("STRING", {"forceInput": True}),
-                "list_4": ("STRING", {"forceInput": True}),
-                "list_5": ("STRING", {"forceInput": True}),
+                # 接受 TEXT_LIST，也兼容旧工作流中的 JSON/逗号分隔 STRING
+                "list_1": ("*", {"forceInput": True}),
+                "list_2": ("*", {"forceInput": True}),
+                "list_3": ("*", {"forceInput": True}),
+                "list_4": ("*", {"forceInput": True}),
+                "list_5": ("*", {"forceInput": True}),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("TEXT_LIST",)
     RETURN_NAMES = ("merged_list",)
     FUNCTION = "merge_lists"
     CATEGORY = "utils/text"
     
     def merge_lists(self, **kwargs):
         """合并多个文本列表"""
-        result = []
+        merged = merge_text_lists(
+            parse_text_list(kwargs[f"list_{i}"]) if kwargs.get(f"list_{i}") is not None else None
+            for i in range(1, 6)
+        )
+        if merged is None:
+            merged = TextList()
         
-        # 遍历所有输入的列表
-        for i in range(1, 6):
-            key = f"list_{i}"
-            if key in kwargs and kwargs[key] is not None:
-                list_data = kwargs[key]
-                
-                # 如果输入是字符串,尝试解析为列表
-                if isinstance(list_data, str):
-                    # 尝试解析 JSON 格式
-                    try:
-                        parsed = json.loads(list_data)
-                        if isinstance(parsed, list):
-                            result.extend(parsed)
-                        else:
-                            result.append(str(parsed))
-                    except json.JSONDecodeError:
-                        # 如果不是JSON,按逗号分割
-                        if ',' in list_data:
-                            items = [item.strip() for item in list_data.split(',')]
-                            result.extend(items)
-                        else:
-                            result.append(list_data)
-                elif isinstance(list_data, list):
-                    result.extend(list_data)
-                else:
-                    result.append(str(list_data))
-        
-        # 返回JSON格式的字符串
-        return (json.dumps(result, ensure_ascii=False),)
+        return (merged,)
 
 
 class TextListCreate:
@@ -290,22 +644,20 @@ class TextListCreate:
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("TEXT_LIST",)
     RETURN_NAMES = ("text_list",)
     FUNCTION = "create_list"
     CATEGORY = "utils/text"
     
     def create_list(self, **kwargs):
         """创建文本列表"""
-        result = []
-        
-        for i in range(1, 9):
-            key = f"text_{i}"
-            if key in kwargs and kwargs[key] is not None and kwargs[key].strip() != "":
-                result.append(kwargs[key].strip())
+        result = TextList(
+            kwargs[key].strip()
+            for key in (f"text_{i}" for i in range(1, 9))
+            if kwargs.get(key) is not None and kwargs[key].strip() != ""
+        )
         
-        # 返回JSON格式的字符串
-        return (json.dumps(result, ensure_ascii=False),)
+        return (result,)
 
 
 class TextListDisplay:
@@ -315,34 +667,81 @@ class TextListDisplay:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "text_list": ("STRING", {"forceInput": True}),
+                "text_list": ("*", {"forceInput": True}),
+            },
+            "optional": {
+                # paged 只把摘要和第一页发给界面，其余页按需请求；full 为旧行为，发送整个列表
+                "display_mode": (TEXT_DISPLAY_MODES,),
+                "page_size": ("INT", {
+                    "default": 50,
+                    "min": 1,
+                    "max": MAX_PAGE_SIZE,
+                    "step": 1
+                }),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("TEXT_LIST",)
     RETURN_NAMES = ("text_list",)
     OUTPUT_NODE = True
     FUNCTION = "display_list"
     CATEGORY = "utils/text"
     
-    def display_list(self, text_list):
+    def display_list(self, text_list, display_mode="paged", page_size=50):
         """显示文本列表"""
-        try:
-            parsed = json.loads(text_list)
+        display_text = None
+        if isinstance(text_list, str):
+            # 旧工作流传入的字符串
+            try:
+                parsed = json.loads(text_list)
+            except json.JSONDecodeError:
+                parsed = text_list
             if isinstance(parsed, list):
-                display_text = "\n".join([f"{i+1}. {item}" for i, item in enumerate(parsed)])
+                items = TextList(parsed)
             else:
+                items = TextList((text_list,))
                 display_text = str(parsed)
-        except json.JSONDecodeError:
-            display_text = text_list
+        else:
+            items = parse_text_list(text_list)
         
+        if display_mode == "paged":
+            # 界面消息的大小与列表长度无关
+            summary = summarize_text_list(items, page_size, TEXT_LIST_STORE.put(items))
+            if display_text is None:
+                display_text = "\n".join(f"{i+1}. {item}" for i, item in enumerate(summary["head"]))
+                if summary["pages"] > 1:
+                    display_text += f"\n… 共 {summary['count']} 项（第 1/{summary['pages']} 页）"
+            ui = {"text": [display_text], "summary": [summary]}
+        else:
+            if display_text is None:
+                display_text = "\n".join(f"{i+1}. {item}" for i, item in enumerate(items))
+            ui = {"text": [display_text], "list": [items.to_json()]}
+        
+        return {"ui": ui, "result": (items,)}
+
+
+class TextListToString:
+    """把文本列表转换为 JSON 字符串，接到需要 STRING 输入的节点
+
+    文本列表节点之间只传递 TEXT_LIST，整个列表只在链的末端序列化一次。
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
         return {
-            "ui": {
-                "text": [display_text],
-                "list": [text_list],
-            },
-            "result": (text_list,)
+            "required": {
+                # 接受 TEXT_LIST，也兼容旧工作流中的 JSON/逗号分隔 STRING
+                "text_list": ("*", {"forceInput": True}),
+            }
         }
+    
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("json",)
+    FUNCTION = "to_string"
+    CATEGORY = "utils/text"
+    
+    def to_string(self, text_list):
+        return (parse_text_list(text_list).to_json(),)
 
 
 class SaveMultiView3D:
@@ -353,7 +752,7 @@ class SaveMultiView3D:
         return {
             "required": {
                 "multi_view_images": ("MULTI_VIEW_IMAGES",),
-                "preview_mode": (["carousel", "sphere", "cube"],),
+                "preview_mode": (LAYOUT_MODES,),
                 "rotation_speed": ("FLOAT", {
                     "default": 1.0,
                     "min": 0.1,
@@ -362,6 +761,12 @@ class SaveMultiView3D:
                 }),
                 "auto_rotate": ("BOOLEAN", {"default": True}),
                 "filename": ("STRING", {"default": "3d_preview.html"}),
+            },
+            "optional": {
+                "image_format": (ARCHIVE_FORMATS,),
+                "export_mode": (EXPORT_MODES,),
+                # 编码和写盘放到后台，不阻塞后续节点执行；返回的路径稍后才写完
+                "background_write": ("BOOLEAN", {"default": False}),
             }
         }
     
@@ -371,41 +776,142 @@ class SaveMultiView3D:
     FUNCTION = "save_html"
     CATEGORY = "image/3D"
     
-    def save_html(self, multi_view_images, preview_mode, rotation_speed, auto_rotate, filename):
-        """保存为独立的HTML文件"""
-        images = multi_view_images["images"]
+    def save_html(self, multi_view_images, preview_mode, rotation_speed, auto_rotate, filename,
+                  image_format="png", export_mode="bundle", background_write=False):
+        """保存为独立的HTML文件
+
+        background_write 时路径确定后立即返回，编码和写盘交给后台写入队列；
+        bundle 目录中 manifest.json 出现即表示写入完成。
+        """
+        images = get_view_images(multi_view_images)
         
         # 确保输出目录存在
         output_dir = folder_paths.get_output_directory()
         
-        # 保存图片文件
-        image_paths = []
-        for idx, img_tensor in enumerate(images):
-            img_np = img_tensor[0].cpu().numpy()
-            img_np = (img_np * 255).astype(np.uint8)
-            pil_img = Image.fromarray(img_np)
-            
-            img_filename = f"view_{idx}.png"
-            img_path = os.path.join(output_dir, img_filename)
-            pil_img.save(img_path)
-            image_paths.append(img_filename)
+        if not filename.endswith('.html'):
+            filename += '.html'
         
-        # 生成HTML内容
-        html_content = self._generate_html(image_paths, preview_mode, rotation_speed, auto_rotate)
+        # 后台写入时节点已经返回，上游可能复用输入张量，需要独立的一份数据
+        views_np = tensors_to_uint8(images, copy=background_write)
+        save_options, ext = get_save_options(image_format)
+        layout = layout_to_json(compute_layout(preview_mode, len(views_np), *get_view_angles(multi_view_images)))
+        
+        settings = {
+            "preview_mode": preview_mode,
+            "rotation_speed": rotation_speed,
+            "auto_rotate": auto_rotate,
+            "image_format": image_format,
+        }
+        directory = os.path.join(output_dir, os.path.dirname(filename))
+        stem = os.path.basename(filename)[:-len('.html')]
+        
+        if export_mode == "shared_folder":
+            html_path = os.path.join(output_dir, filename)
+            job = functools.partial(self._save_shared_folder, views_np, output_dir, filename, save_options, ext,
+                                    preview_mode, rotation_speed, auto_rotate, layout)
+        elif export_mode == "single_file":
+            three_script = threejs_script_tag(inline=True)
+            html_path = reserve_path(directory, stem, ".html")
+            job = functools.partial(self._save_single_file, views_np, html_path, save_options, settings, layout,
+                                    three_script)
+        else:
+            # 每次保存写入独立的目录，并发或连续保存不会互相覆盖
+            bundle_dir = reserve_path(directory, stem, is_dir=True)
+            html_path = os.path.join(bundle_dir, f"{stem}.html")
+            job = functools.partial(self._save_bundle, views_np, html_path, save_options, ext, settings, layout)
+        
+        if not background_write:
+            job()
+            return (html_path,)
+        
+        # 排队的数据超过内存预算时在这里等待
+        with stage("enqueue"):
+            WRITE_QUEUE.submit(job, nbytes=sum(view.nbytes for view in views_np), description=html_path)
+        return (html_path,)
+    
+    def _save_single_file(self, views_np, html_path, save_options, settings, layout, three_script):
+        """图片以 data URI 嵌入，three.js 内联，整个预览只有一个文件"""
+        image_data = encode_views_to_bytes(views_np, save_options)
+        mime = MIME_TYPES[save_options["format"]]
+        image_uris = [
+            f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+            for data in image_data
+        ]
+        manifest = build_manifest(views_np, [None] * len(image_data), image_data,
+                                  os.path.basename(html_path), settings)
+        html_content = self._generate_html(image_uris, settings["preview_mode"], settings["rotation_speed"],
+                                           settings["auto_rotate"], three_script=three_script,
+                                           manifest=manifest, layout=layout)
+        write_atomic(html_path, html_content)
+    
+    def _save_bundle(self, views_np, html_path, save_options, ext, settings, layout):
+        """图片、HTML 和清单写入 html_path 所在的独立目录"""
+        bundle_dir = os.path.dirname(html_path)
+        # 并行编码到内存，清单中的校验和也从这里计算
+        image_data = encode_views_to_bytes(views_np, save_options)
+        image_files = [f"view_{idx:02d}{ext}" for idx in range(len(image_data))]
+        profile = current_profile()
+        list(get_encode_pool().map(
+            lambda item: write_atomic(os.path.join(bundle_dir, item[0]), item[1], profile),
+            zip(image_files, image_data),
+        ))
+        
+        # 本地 three.js 一起放进目录，离线也能打开
+        write_atomic(os.path.join(bundle_dir, THREEJS_FILENAME), load_threejs_source())
+        write_atomic(html_path, self._generate_html(image_files, settings["preview_mode"], settings["rotation_speed"],
+                                                    settings["auto_rotate"], layout=layout))
+        
+        # 清单最后写入，存在即表示导出完整
+        manifest = build_manifest(views_np, image_files, image_data, os.path.basename(html_path), settings)
+        write_atomic(os.path.join(bundle_dir, MANIFEST_NAME), manifest)
+    
+    def _save_shared_folder(self, views_np, output_dir, filename, save_options, ext,
+                            preview_mode, rotation_speed, auto_rotate, layout=None):
+        """旧的保存方式：图片和 HTML 直接写在输出目录"""
+        # 并行保存图片文件
+        image_paths = [f"view_{idx}{ext}" for idx in range(len(views_np))]
+        encode_views(
+            views_np,
+            [os.path.join(output_dir, name) for name in image_paths],
+            save_options,
+        )
+        
+        # 生成HTML内容，three.js 放在同一目录
+        write_atomic(os.path.join(output_dir, THREEJS_FILENAME), load_threejs_source())
+        html_content = self._generate_html(image_paths, preview_mode, rotation_speed, auto_rotate, layout=layout)
         
         # 保存HTML文件
-        if not filename.endswith('.html'):
-            filename += '.html'
         html_path = os.path.join(output_dir, filename)
         
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        with stage("write"):
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+        add_bytes(os.path.getsize(html_path))
         
-        return (html_path,)
+        return html_path
     
-    def _generate_html(self, image_paths, preview_mode, rotation_speed, auto_rotate):
-        """生成HTML内容"""
+    def _generate_html(self, image_paths, preview_mode, rotation_speed, auto_rotate,
+                       three_script=None, manifest=None, layout=None):
+        """生成HTML内容
+
+        three_script 为加载 three.js 的 script 标签（默认引用同目录的 three.min.js），
+        manifest 不为空时以 JSON 形式嵌入页面。
+        layout 为每个视角的变换矩阵，为空时按预览模式和默认角度计算。
+        """
         images_json = json.dumps(image_paths)
+        if layout is None:
+            layout = layout_to_json(compute_layout(preview_mode, len(image_paths)))
+        layout_json = json.dumps(layout)
+        if three_script is None:
+            three_script = threejs_script_tag()
+        manifest_script = ""
+        if manifest is not None:
+            # 转义 "</"，避免 JSON 中的内容提前结束 script 标签
+            manifest_script = (
+                '<script type="application/json" id="manifest">'
+                + manifest.replace("</", "<\\/")
+                + "</script>"
+            )
         
         html = f"""<!DOCTYPE html>
 <html lang="zh-CN">
@@ -457,10 +963,12 @@ class SaveMultiView3D:
         <button id="resetView">重置视角</button>
     </div>
     
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
+    {manifest_script}
+    {three_script}
     <script>
         const imagePaths = {images_json};
         const previewMode = "{preview_mode}";
+        const layout = {layout_json};
         const rotationSpeed = {rotation_speed};
         let autoRotate = {str(auto_rotate).lower()};
         
@@ -555,83 +1063,23 @@ class SaveMultiView3D:
         
         function loadImages() {{
             const textureLoader = new THREE.TextureLoader();
-            const imageCount = imagePaths.length;
             
-            if (previewMode === 'carousel') {{
-                // 环形排列
-                const radius = 3;
-                imagePaths.forEach((path, index) => {{
-                    textureLoader.load(path, (texture) => {{
-                        const geometry = new THREE.PlaneGeometry(2, 2);
-                        const material = new THREE.MeshBasicMaterial({{
-                            map: texture,
-                            side: THREE.DoubleSide
-                        }});
-                        const plane = new THREE.Mesh(geometry, material);
-                        
-                        const angle = (index / imageCount) * Math.PI * 2;
-                        plane.position.x = Math.cos(angle) * radius;
-                        plane.position.z = Math.sin(angle) * radius;
-                        plane.rotation.y = -angle;
-                        
-                        group.add(plane);
+            // 每个视角的变换矩阵由插件预先计算（layout.py），与 ComfyUI 中的预览一致
+            imagePaths.forEach((path, index) => {{
+                textureLoader.load(path, (texture) => {{
+                    const geometry = new THREE.PlaneGeometry(2, 2);
+                    const material = new THREE.MeshBasicMaterial({{
+                        map: texture,
+                        side: THREE.DoubleSide
                     }});
-                }});
-            }} else if (previewMode === 'sphere') {{
-                // 球形排列
-                const radius = 3;
-                imagePaths.forEach((path, index) => {{
-                    textureLoader.load(path, (texture) => {{
-                        const geometry = new THREE.PlaneGeometry(1.5, 1.5);
-                        const material = new THREE.MeshBasicMaterial({{
-                            map: texture,
-                            side: THREE.DoubleSide
-                        }});
-                        const plane = new THREE.Mesh(geometry, material);
-                        
-                        // 球面坐标
-                        const phi = Math.acos(-1 + (2 * index) / imageCount);
-                        const theta = Math.sqrt(imageCount * Math.PI) * phi;
-                        
-                        plane.position.x = radius * Math.cos(theta) * Math.sin(phi);
-                        plane.position.y = radius * Math.sin(theta) * Math.sin(phi);
-                        plane.position.z = radius * Math.cos(phi);
-                        
-                        plane.lookAt(0, 0, 0);
-                        
-                        group.add(plane);
-                    }});
-                }});
-            }} else if (previewMode === 'cube') {{
-                // 立方体排列
-                const positions = [
-                    {{ x: 0, y: 0, z: 2, rx: 0, ry: 0 }},      // 前
-                    {{ x: 0, y: 0, z: -2, rx: 0, ry: Math.PI }}, // 后
-                    {{ x: -2, y: 0, z: 0, rx: 0, ry: -Math.PI/2 }}, // 左
-                    {{ x: 2, y: 0, z: 0, rx: 0, ry: Math.PI/2 }},  // 右
-                    {{ x: 0, y: 2, z: 0, rx: -Math.PI/2, ry: 0 }}, // 上
-                    {{ x: 0, y: -2, z: 0, rx: Math.PI/2, ry: 0 }}  // 下
-                ];
-                
-                imagePaths.forEach((path, index) => {{
-                    if (index >= positions.length) return;
+                    const plane = new THREE.Mesh(geometry, material);
                     
-                    textureLoader.load(path, (texture) => {{
-                        const geometry = new THREE.PlaneGeometry(2, 2);
-                        const material = new THREE.MeshBasicMaterial({{
-                            map: texture,
-                            side: THREE.DoubleSide
-                        }});
-                        const plane = new THREE.Mesh(geometry, material);
-                        
-                        const pos = positions[index];
-                        plane.position.set(pos.x, pos.y, pos.z);
-                        plane.rotation.set(pos.rx, pos.ry, 0);
-                        
-                        group.add(plane);
-                    }});
+                    plane.matrix.fromArray(layout[index]);
+                    plane.matrix.decompose(plane.position, plane.quaternion, plane.scale);
+                    
+                    group.add(plane);
                 }});
-            }}
+            }});
         }}
         
         function animate() {{
@@ -649,25 +1097,119 @@ class SaveMultiView3D:
         return html
 
 
+class SaveMultiViewTurntable:
+    """把多视角图片保存为转台动画（WebP/GIF，有 ffmpeg 时可选 MP4）"""
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "multi_view_images": ("MULTI_VIEW_IMAGES",),
+                "filename": ("STRING", {"default": "turntable"}),
+                "video_format": (TURNTABLE_FORMATS,),
+                "fps": ("FLOAT", {
+                    "default": 12.0,
+                    "min": 1.0,
+                    "max": 60.0,
+                    "step": 1.0
+                }),
+                "interpolation": (INTERPOLATION_MODES,),
+                "inbetween_frames": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 30,
+                    "step": 1
+                }),
+                "loop": ("BOOLEAN", {"default": True}),
+                "max_size": ("INT", {
+                    "default": 512,
+                    "min": 0,
+                    "max": 8192,
+                    "step": 64
+                }),
+                "quality": ("INT", {
+                    "default": 90,
+                    "min": 1,
+                    "max": 100,
+                    "step": 1
+                }),
+            }
+        }
+    
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("file_path",)
+    OUTPUT_NODE = True
+    FUNCTION = "save_turntable"
+    CATEGORY = "image/3D"
+    
+    def save_turntable(self, multi_view_images, filename, video_format, fps, interpolation="blend",
+                       inbetween_frames=0, loop=True, max_size=512, quality=90):
+        """逐帧编码转台动画，帧按需生成，不会同时保留所有帧"""
+        # 有方位角信息时按方位角顺序播放
+        if isinstance(multi_view_images, MultiViewImages):
+            order = np.argsort(multi_view_images.azimuths, kind="stable")
+            if not np.array_equal(order, np.arange(len(order))):
+                multi_view_images = multi_view_images.select(order)
+        
+        images = get_view_images(multi_view_images)
+        if not isinstance(images, torch.Tensor):
+            # 旧格式的图片列表尺寸可能不一致，先统一成一个批量
+            images = normalize_views(images)
+        
+        frames = TurntableFrames(images, inbetween_frames, interpolation, loop, max_size)
+        
+        output_dir = folder_paths.get_output_directory()
+        ext = FORMAT_EXTENSIONS[video_format]
+        if filename.endswith(ext):
+            filename = filename[:-len(ext)]
+        subfolder = os.path.dirname(filename)
+        path = reserve_path(os.path.join(output_dir, subfolder), os.path.basename(filename), ext)
+        # 帧逐个生成并送入编码器，生成、编码和写入无法分开计时
+        with stage("encode"):
+            write_turntable(frames, path, video_format, fps, quality)
+        add_bytes(os.path.getsize(path))
+        
+        result = {"result": (path,)}
+        if video_format != "mp4":
+            # 动画 WebP/GIF 可以直接在节点上显示
+            result["ui"] = {
+                "images": [{"filename": os.path.basename(path), "subfolder": subfolder, "type": "output"}],
+                "animated": [True],
+            }
+        return result
+
+
 # 注册节点
 NODE_CLASS_MAPPINGS = {
     "MultiViewImageBatch": MultiViewImageBatch,
     "MultiViewImageInput": MultiViewImageInput,
+    "LoadMultiViewImages": LoadMultiViewImages,
+    "MultiViewFrameInterpolation": MultiViewFrameInterpolation,
     "MultiViewImagePreview": MultiViewImagePreview,
     "MultiView3DPreview": MultiView3DPreview,
     "SaveMultiView3D": SaveMultiView3D,
+    "SaveMultiViewTurntable": SaveMultiViewTurntable,
     "TextListMerge": TextListMerge,
     "TextListCreate": TextListCreate,
     "TextListDisplay": TextListDisplay,
+    "TextListToString": TextListToString,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "MultiViewImageBatch": "多视角图片批量输入 📦",
     "MultiViewImageInput": "多视角图片输入（单个）",
+    "LoadMultiViewImages": "加载多视角图片 📂",
+    "MultiViewFrameInterpolation": "多视角补帧 ✨",
     "MultiViewImagePreview": "多视角图片预览 🖼️",
     "MultiView3DPreview": "3D预览 🎬",
     "SaveMultiView3D": "保存3D预览HTML 💾",
+    "SaveMultiViewTurntable": "保存转台动画 🎞️",
     "TextListMerge": "文本列表合并 🔗",
     "TextListCreate": "创建文本列表 📝",
     "TextListDisplay": "显示文本列表 👁️",
+    "TextListToString": "文本列表转字符串 🔤",
 }
+
+# 开启 MULTIVIEW_PROFILE 时记录每个节点的各阶段耗时和内存（见 instrumentation.py）
+for _node_class in NODE_CLASS_MAPPINGS.values():
+    instrument_node(_node_class)
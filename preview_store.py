@@ -0,0 +1,157 @@
+"""
+预览临时目录的生命周期管理
+"""
+
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+
+
+def _env_int(name, default):
+    """读取正整数环境变量，无效时使用默认值"""
+    try:
+        value = int(os.environ.get(name, ""))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _folder_size(path):
+    """统计目录下文件的总字节数（预览目录只有一层）"""
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    except FileNotFoundError:
+        pass
+    return total
+
+
+def link_file(source, target):
+    """让 target 指向与 source 相同的内容：优先硬链接（不占额外空间），不支持时复制
+
+    target 已是同一个文件时什么也不做；source 已被删除时抛出 FileNotFoundError。
+    """
+    try:
+        if os.path.samefile(source, target):
+            return
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        os.link(source, tmp_path)
+    except FileNotFoundError:
+        # 源文件已被删除，不能退回复制
+        raise
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+class PreviewStore:
+    """跟踪预览节点创建的临时子目录，并限制其磁盘占用
+
+    - 有节点 id 时每个节点复用固定的子目录，并在每次运行后清理本次未引用的旧文件
+    - 没有节点 id 时每次运行创建一次性的子目录
+    - 子目录总字节数或数量超过上限时，按最久未使用的顺序删除整个子目录
+
+    只管理自己创建的子目录，不会触碰临时目录中的其他内容。
+    """
+
+    def __init__(self, get_root, max_bytes=None, max_folders=None):
+        self._get_root = get_root
+        self.max_bytes = max_bytes or _env_int("MULTIVIEW_PREVIEW_MAX_BYTES", 1024 ** 3)
+        self.max_folders = max_folders or _env_int("MULTIVIEW_PREVIEW_MAX_FOLDERS", 64)
+        # subfolder -> {"bytes": 已占用字节, "stable": 是否为节点固定目录}
+        self._folders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, subfolder):
+        return os.path.join(self._get_root(), subfolder)
+
+    def acquire(self, prefix, owner=None):
+        """返回本次运行写入的 (subfolder, 完整路径)，目录不存在时创建"""
+        if owner is not None:
+            subfolder = f"{prefix}_node_{re.sub(r'[^0-9A-Za-z_-]', '_', str(owner))}"
+        else:
+            subfolder = f"{prefix}_{str(uuid.uuid4())[:8]}"
+
+        path = self._path(subfolder)
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            self._folders.setdefault(subfolder, {"bytes": 0, "stable": owner is not None})
+            self._folders.move_to_end(subfolder)
+        return subfolder, path
+
+    def commit(self, image_files, subfolder=None):
+        """记录一次运行引用的文件，清理旧文件并按上限淘汰子目录
+
+        image_files 是 ui 中的图片列表；subfolder 是本次 acquire 得到的目录。
+        本次引用到的子目录都会被标记为最近使用，且不会在这次淘汰中被删除。
+        """
+        referenced = OrderedDict()
+        for image in image_files:
+            referenced.setdefault(image["subfolder"], set()).add(image["filename"])
+
+        if subfolder is not None:
+            referenced.setdefault(subfolder, set())
+
+        with self._lock:
+            stale_files = []
+            for name, keep in referenced.items():
+                entry = self._folders.get(name)
+                if entry is None:
+                    continue
+                self._folders.move_to_end(name)
+                if name == subfolder and entry["stable"]:
+                    stale_files.extend(
+                        os.path.join(self._path(name), filename)
+                        for filename in self._list_files(name)
+                        if filename not in keep
+                    )
+
+        for path in stale_files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            if subfolder in self._folders:
+                self._folders[subfolder]["bytes"] = _folder_size(self._path(subfolder))
+            evicted = self._evict(protected=set(referenced))
+
+        for name in evicted:
+            shutil.rmtree(self._path(name), ignore_errors=True)
+
+    def _list_files(self, subfolder):
+        try:
+            return os.listdir(self._path(subfolder))
+        except FileNotFoundError:
+            return []
+
+    def _evict(self, protected):
+        """从最久未使用的子目录开始淘汰，返回需要删除的子目录"""
+        evicted = []
+        total = sum(entry["bytes"] for entry in self._folders.values())
+        for name in list(self._folders):
+            if total <= self.max_bytes and len(self._folders) <= self.max_folders:
+                break
+            if name in protected:
+                continue
+            total -= self._folders.pop(name)["bytes"]
+            evicted.append(name)
+        return evicted
+
+    def usage(self):
+        """返回当前管理的子目录数量和总字节数"""
+        with self._lock:
+            return {
+                "folders": len(self._folders),
+                "bytes": sum(entry["bytes"] for entry in self._folders.values()),
+            }
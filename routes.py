@@ -0,0 +1,75 @@
+"""
+插件注册到 ComfyUI 服务器的 HTTP 路由
+"""
+
+import os
+
+from .text_list import TEXT_LIST_STORE, text_list_page
+from .threejs import THREEJS_PATH
+from .view_store import VIEW_STORE
+
+try:
+    from aiohttp import web
+    from server import PromptServer
+except ImportError:
+    # 不在 ComfyUI 中运行（例如测试）时不注册路由
+    PromptServer = None
+
+# three.js 版本固定，浏览器可以长期缓存
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+async def get_threejs(request):
+    """提供插件自带的 three.js；本地副本缺失（安装不完整）时返回 404，前端会退回 CDN"""
+    if not os.path.isfile(THREEJS_PATH):
+        raise web.HTTPNotFound(text="three.js is missing from vendor/, reinstall the plugin or run `python threejs.py`")
+    return web.FileResponse(
+        THREEJS_PATH,
+        headers={
+            "Content-Type": "application/javascript",
+            "Cache-Control": IMMUTABLE_CACHE,
+        },
+    )
+
+
+async def get_text_list_page(request):
+    """TextListDisplay 分页显示时，前端按需请求其余页：?page=N&page_size=M"""
+    items = TEXT_LIST_STORE.get(request.match_info["list_id"])
+    if items is None:
+        raise web.HTTPNotFound(text="text list expired, run the workflow again")
+    try:
+        page = int(request.query.get("page", 0))
+        page_size = int(request.query.get("page_size", 50))
+    except ValueError:
+        raise web.HTTPBadRequest(text="page and page_size must be integers")
+    # 同一个 id 的列表内容不会变化
+    return web.json_response(
+        text_list_page(items, page, page_size),
+        headers={"Cache-Control": "private, max-age=3600"},
+    )
+
+
+async def get_view(request):
+    """3D 预览的视角（内存中的编码结果）；id 由内容决定，同一个 id 的内容不会变化"""
+    view_id = request.match_info["view_id"]
+    etag = f'"{view_id}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+    # 浏览器带着 ETag 重新验证时内容一定相同，即使已被淘汰也可以直接返回 304
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return web.Response(status=304, headers=headers)
+    entry = VIEW_STORE.get(view_id)
+    if entry is None:
+        raise web.HTTPNotFound(text="view expired, run the workflow again")
+    return web.Response(body=entry["data"], content_type=entry["mime"], headers=headers)
+
+
+def register_routes(routes):
+    """把插件的路由添加到 aiohttp 路由表"""
+    routes.get("/multiview3d/three.min.js")(get_threejs)
+    routes.get("/multiview3d/text_list/{list_id}")(get_text_list_page)
+    routes.get("/multiview3d/view/{view_id}")(get_view)
+
+
+if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+    register_routes(PromptServer.instance.routes)
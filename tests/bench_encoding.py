@@ -0,0 +1,54 @@
+"""
+并行编码基准：不同视角数量和线程数下的耗时
+
+用法: python tests/bench_encoding.py [--size 1024] [--views 8 36 72] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import torch
+
+from bench_utils import make_views
+from plugin_loader import load_plugin
+
+
+def bench(encode_views, views_np, workers, repeat):
+    """返回多次运行中的最短耗时（秒）"""
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as out_dir:
+        paths = [os.path.join(out_dir, f"view_{i:02d}.png") for i in range(len(views_np))]
+        for _ in range(repeat):
+            start = time.perf_counter()
+            encode_views(views_np, paths, {"format": "PNG"}, workers=workers)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--views", type=int, nargs="+", default=[8, 36, 72])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    load_plugin()
+    from multiview3d_plugin.encoding import encode_views
+
+    print(f"分辨率 {args.size}x{args.size}, 重复 {args.repeat} 次取最快")
+    header = "views".rjust(6) + "".join(f"{f'w={w}':>12}" for w in args.workers)
+    print(header)
+    for count in args.views:
+        views_np = (make_views(count, args.size) * 255).to(torch.uint8).numpy()
+        row = f"{count:>6}"
+        for workers in args.workers:
+            row += f"{bench(encode_views, views_np, workers, args.repeat):>11.3f}s"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+节点基准与回归检查：在 ComfyUI 之外直接运行 nodes.py 中的节点
+
+folder_paths 指向临时目录，每个场景报告吞吐量、延迟分位数、写入字节数和峰值内存
+（后两项来自 MULTIVIEW_PROFILE 的统计）。结果可以保存为基线，之后与基线对比，
+延迟、写入字节数或峰值内存超出容差时报告回归并以非零状态退出。
+
+用法:
+  python tests/bench_nodes.py [--views 4 36 144] [--sizes 256 1024 2048] [--repeat 5]
+  python tests/bench_nodes.py --quick --save-baseline    # 写入 tests/baselines/bench_nodes.json
+  python tests/bench_nodes.py --quick --compare          # 与基线对比
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from bench_utils import make_views
+from plugin_loader import install_folder_paths, load_plugin
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "bench_nodes.json")
+
+NODE_NAMES = ["preview_3d", "preview_images", "save_html", "text_list"]
+QUICK = {"views": [4, 36], "sizes": [256], "repeat": 3, "text_sizes": [10000]}
+
+# 超过容差即视为回归：按比例再加一个绝对余量（避免很小的数值因抖动误报）
+DEFAULT_TOLERANCE = 0.25
+LATENCY_SLACK_MS = 5.0
+BYTES_SLACK = 64 * 1024
+MEMORY_SLACK_MB = 32.0
+
+
+def scenarios(nodes, args):
+    """生成 (名称, 视角数, 每次运行前的准备, 运行一次的函数)"""
+    from multiview3d_plugin.multi_view import MultiViewImages
+    from multiview3d_plugin.text_list import TextList
+
+    for node_name in args.nodes:
+        if node_name == "text_list":
+            for size in args.text_sizes:
+                items = TextList(f"a photo of object {i}, studio lighting" for i in range(size))
+                extra = TextList(f"extra prompt {i}" for i in range(8))
+
+                def run(items=items, extra=extra):
+                    (merged,) = nodes.TextListMerge().merge_lists(list_1=items, list_2=extra)["result"]
+                    return nodes.TextListDisplay().display_list(merged, "paged", 50)
+
+                yield f"text_list items={size}", size, None, run
+            continue
+
+        for size in args.sizes:
+            for count in args.views:
+                megapixels = count * size * size / 1e6
+                if megapixels > args.max_megapixels:
+                    print(f"  跳过 {node_name} views={count} size={size}（{megapixels:.0f} MP 超过 --max-megapixels）")
+                    continue
+                views = MultiViewImages(make_views(count, size))
+                name = f"{node_name} views={count} size={size}"
+
+                if node_name == "preview_3d":
+                    def run(views=views):
+                        return nodes.MultiView3DPreview().preview_3d(
+                            views, "sphere", 1.0, True, preview_format="jpeg", max_preview_size=1024,
+                            stream_views=False, unique_id="bench",
+                        )
+                elif node_name == "preview_images":
+                    def run(views=views):
+                        return nodes.MultiViewImagePreview().preview_images(
+                            views, preview_format="jpeg", unique_id="bench"
+                        )
+                else:
+                    def run(views=views):
+                        return nodes.SaveMultiView3D().save_html(views, "carousel", 1.0, True, "bench")
+
+                # 每次运行前清空编码缓存和输出目录，测的是完整的编码和写盘
+                yield name, count, nodes.PREVIEW_CACHE.clear, run
+
+
+def percentile(values, q):
+    return float(np.percentile(np.asarray(values), q))
+
+
+def measure(prepare, run, repeat, output_dir):
+    latencies = []
+    profiles = []
+    for index in range(repeat + 1):
+        if prepare is not None:
+            prepare()
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(output_dir, exist_ok=True)
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        if index == 0:
+            # 第一次运行包含导入、线程池创建等一次性开销，不计入
+            continue
+        latencies.append(elapsed)
+        profiles.append(result["ui"]["profile"][0])
+    return latencies, profiles
+
+
+def run_suite(args):
+    base_dir = tempfile.mkdtemp(prefix="multiview3d_bench_")
+    previous = os.environ.get("MULTIVIEW_PROFILE")
+    os.environ["MULTIVIEW_PROFILE"] = "1"
+    try:
+        load_plugin(base_dir)
+        folder_paths = install_folder_paths(base_dir)
+        from multiview3d_plugin import nodes
+
+        results = {}
+        for name, count, prepare, run in scenarios(nodes, args):
+            latencies, profiles = measure(prepare, run, args.repeat, folder_paths.get_output_directory())
+            p50 = percentile(latencies, 50)
+            results[name] = {
+                "count": count,
+                "p50_ms": round(p50 * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "throughput": round(count / p50, 1),
+                "bytes_written": max(profile["bytes_written"] for profile in profiles),
+                "peak_rss_growth_mb": max(profile.get("peak_rss_growth_mb", 0.0) for profile in profiles),
+            }
+            print(format_row(name, results[name]))
+        return results
+    finally:
+        if previous is None:
+            os.environ.pop("MULTIVIEW_PROFILE", None)
+        else:
+            os.environ["MULTIVIEW_PROFILE"] = previous
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def format_row(name, result):
+    return (
+        f"{name:<36}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+        f"{result['throughput']:>12.1f}{result['bytes_written'] / 2**20:>10.2f}{result['peak_rss_growth_mb']:>10.1f}"
+    )
+
+
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """与基线对比，返回回归描述列表（空列表表示没有回归）"""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["p50_ms"] > expected["p50_ms"] * (1 + tolerance) + LATENCY_SLACK_MS:
+            regressions.append(f"{name}: p50 {expected['p50_ms']}ms -> {result['p50_ms']}ms")
+        if result["bytes_written"] > expected["bytes_written"] * (1 + tolerance) + BYTES_SLACK:
+            regressions.append(f"{name}: 写入 {expected['bytes_written']} -> {result['bytes_written']} 字节")
+        if result["peak_rss_growth_mb"] > expected["peak_rss_growth_mb"] * (1 + tolerance) + MEMORY_SLACK_MB:
+            regressions.append(
+                f"{name}: 峰值内存增长 {expected['peak_rss_growth_mb']} -> {result['peak_rss_growth_mb']} MB"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", nargs="+", choices=NODE_NAMES, default=NODE_NAMES)
+    parser.add_argument("--views", type=int, nargs="+", default=[4, 36, 144])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 2048])
+    parser.add_argument("--text-sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-megapixels", type=float, default=160.0,
+                        help="跳过视角数 × 像素数超过此值的场景（输入本身就要占用约 12 字节/像素）")
+    parser.add_argument("--quick", action="store_true", help="少量场景，适合提交前检查")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+    if args.quick:
+        for key, value in QUICK.items():
+            setattr(args, key, value)
+
+    print(f"重复 {args.repeat} 次（另有一次预热）")
+    print(f"{'scenario':<36}{'p50 ms':>10}{'p95 ms':>10}{'items/s':>12}{'MiB':>10}{'+peak MB':>10}")
+    results = run_suite(args)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine_info(), "results": results}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"基线已保存: {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != machine_info():
+            print("注意: 基线来自不同的机器或环境，延迟对比仅供参考")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"回归 {regression}")
+        if regressions:
+            return 1
+        print("没有发现回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+文本列表合并链基准：旧的 JSON 字符串传递与 TEXT_LIST 按引用传递
+
+每条链从一个 size 项的列表开始，经过 length 个合并节点，每个节点再并入一个 8 项的小列表。
+用法: python tests/bench_text_list.py [--sizes 1000 10000 50000] [--lengths 1 4 16 32]
+"""
+
+import argparse
+import json
+import time
+
+from plugin_loader import load_plugin
+
+
+def legacy_merge(*lists):
+    """旧实现的每一跳：逐个输入 json.loads，合并后再 json.dumps"""
+    result = []
+    for list_data in lists:
+        result.extend(json.loads(list_data))
+    return json.dumps(result, ensure_ascii=False)
+
+
+def run_legacy(base, extra, length):
+    text = json.dumps(base, ensure_ascii=False)
+    extra_text = json.dumps(extra, ensure_ascii=False)
+    for _ in range(length):
+        text = legacy_merge(text, extra_text)
+    return len(json.loads(text))
+
+
+def run_native(nodes, base, extra, length):
+    # 链中的节点通过 TEXT_LIST 相连，只在末端由 TextListToString 生成一次 JSON
+    merge = nodes.TextListMerge()
+    (items,) = merge.merge_lists(list_1=base)
+    (extra_items,) = merge.merge_lists(list_1=extra)
+    for _ in range(length):
+        (items,) = merge.merge_lists(list_1=items, list_2=extra_items)
+    (text,) = nodes.TextListToString().to_string(items)
+    return len(json.loads(text))
+
+
+def best_of(repeat, function, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    load_plugin()
+    from multiview3d_plugin import nodes
+
+    extra = [f"额外提示词 {i}, 细节" for i in range(8)]
+    print(f"重复 {args.repeat} 次取最快 (毫秒)")
+    print("size".rjust(8) + "length".rjust(8) + "json".rjust(12) + "native".rjust(12) + "speedup".rjust(10))
+    for size in args.sizes:
+        base = [f"a photo of object {i}, studio lighting" for i in range(size)]
+        for length in args.lengths:
+            assert run_legacy(base, extra, length) == run_native(nodes, base, extra, length)
+            legacy = best_of(args.repeat, run_legacy, base, extra, length)
+            native = best_of(args.repeat, run_native, nodes, base, extra, length)
+            print(f"{size:>8}{length:>8}{legacy * 1000:>12.2f}{native * 1000:>12.2f}{legacy / native:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+基准脚本共用的测试数据
+"""
+
+import torch
+
+
+def make_views(count, size, seed=0):
+    """[count, size, size, 3] 的 0-1 浮点视角：平滑渐变加少量噪声，压缩难度接近真实生成图"""
+    generator = torch.Generator().manual_seed(seed)
+    ramp = torch.linspace(0, 1, size)
+    base = ((ramp[None, :] + ramp[:, None]) / 2)[None, :, :, None]
+    noise = torch.rand(count, size, size, 3, generator=generator) * 0.06
+    return (base + noise).clamp_(0, 1)
@@ -0,0 +1,12 @@
+import pytest
+
+from plugin_loader import install_folder_paths, load_plugin
+
+load_plugin()
+
+
+@pytest.fixture
+def folder_paths(tmp_path):
+    """把 folder_paths 的 temp/output 目录指向本次测试的临时目录"""
+    return install_folder_paths(str(tmp_path))
+
@@ -0,0 +1,45 @@
+"""
+在 ComfyUI 之外加载插件：用临时目录替代 folder_paths
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import types
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_NAME = "multiview3d_plugin"
+
+
+def install_folder_paths(base_dir=None):
+    """注册一个把 temp/output 目录指向 base_dir 的 folder_paths 替身"""
+    if base_dir is None:
+        base_dir = tempfile.mkdtemp(prefix="multiview3d_")
+
+    module = sys.modules.get("folder_paths") or types.ModuleType("folder_paths")
+    module.base_dir = base_dir
+    module.get_temp_directory = lambda: os.path.join(module.base_dir, "temp")
+    module.get_output_directory = lambda: os.path.join(module.base_dir, "output")
+    os.makedirs(module.get_temp_directory(), exist_ok=True)
+    os.makedirs(module.get_output_directory(), exist_ok=True)
+
+    sys.modules["folder_paths"] = module
+    return module
+
+
+def load_plugin(base_dir=None):
+    """以包的形式导入插件（插件目录名不一定是合法的模块名）"""
+    install_folder_paths(base_dir)
+    if PLUGIN_NAME in sys.modules:
+        return sys.modules[PLUGIN_NAME]
+
+    spec = importlib.util.spec_from_file_location(
+        PLUGIN_NAME,
+        os.path.join(PLUGIN_DIR, "__init__.py"),
+        submodule_search_locations=[PLUGIN_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PLUGIN_NAME] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,69 @@
+"""
+在浏览器中打开 test_preview.html：以插件目录为根启动一个本地 HTTP 服务
+
+页面以 ES 模块的形式加载 web/js 中与节点预览共用的代码，直接打开文件（file://）时浏览器不允许加载模块。
+视角的摆放通过 /layout?mode=<模式>&count=<视角数> 向这里请求，由 layout.py 计算，与节点预览和导出的 HTML 一致。
+
+用法: python tests/serve_preview.py [--port 8189]
+"""
+
+import argparse
+import functools
+import json
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from plugin_loader import PLUGIN_DIR, load_plugin
+
+MAX_LAYOUT_VIEWS = 4096
+
+
+def layout_response(query):
+    """/layout 的响应：(状态码, JSON 数据)"""
+    from multiview3d_plugin.layout import LAYOUT_MODES, compute_layout, layout_to_json
+
+    params = parse_qs(query)
+    mode = params.get("mode", ["carousel"])[0]
+    try:
+        count = int(params.get("count", ["0"])[0])
+    except ValueError:
+        return 400, {"error": "count must be an integer"}
+    if mode not in LAYOUT_MODES or not 0 <= count <= MAX_LAYOUT_VIEWS:
+        return 400, {"error": f"mode must be one of {LAYOUT_MODES}, count 0-{MAX_LAYOUT_VIEWS}"}
+    return 200, layout_to_json(compute_layout(mode, count))
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, ".js": "application/javascript"}
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/layout":
+            return super().do_GET()
+        status, data = layout_response(url.query)
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8189)
+    args = parser.parse_args(argv)
+
+    load_plugin()
+    handler = functools.partial(PreviewHandler, directory=PLUGIN_DIR)
+    with ThreadingHTTPServer((args.host, args.port), handler) as server:
+        print(f"http://{args.host}:{args.port}/test_preview.html")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
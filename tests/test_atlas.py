@@ -0,0 +1,87 @@
+"""
+测试图集模式：视角拼成网格图集，超出页尺寸时分页，ui 中的区域与视角一一对应
+"""
+
+import numpy as np
+import pytest
+import torch
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.image_utils import pack_atlas
+from multiview3d_plugin.multi_view import MultiViewImages
+
+
+def make_views(count, height, width, channels=3):
+    # 每个视角的像素各不相同，区域对错一眼可见
+    rng = np.random.default_rng(count)
+    return rng.integers(0, 256, (count, height, width, channels), dtype=np.uint8)
+
+
+def crop(pages, rect):
+    page_index, x, y, w, h = rect
+    page = pages[page_index]
+    page_h, page_w = page.shape[:2]
+    left, top = round(x * page_w), round(y * page_h)
+    return page[top:top + round(h * page_h), left:left + round(w * page_w)]
+
+
+def pixel_boxes(pages, rects):
+    return [
+        (rect[0], round(rect[1] * pages[rect[0]].shape[1]), round(rect[2] * pages[rect[0]].shape[0]),
+         round(rect[3] * pages[rect[0]].shape[1]), round(rect[4] * pages[rect[0]].shape[0]))
+        for rect in rects
+    ]
+
+
+@pytest.mark.parametrize("count, height, width", [(1, 16, 16), (7, 16, 24), (16, 8, 8)])
+def test_rects_crop_back_to_their_views(count, height, width):
+    views = make_views(count, height, width)
+    pages, rects = pack_atlas(views)
+    assert len(pages) == 1 and len(rects) == count
+    for view, rect in zip(views, rects):
+        assert np.array_equal(crop(pages, rect), view)
+
+
+def test_pages_split_when_over_max_size():
+    views = make_views(10, 16, 16, channels=4)
+    pages, rects = pack_atlas(views, max_atlas_size=32)
+    # 每页 2 × 2 个视角，10 个视角分成 4 + 4 + 2
+    assert [page.shape for page in pages] == [(32, 32, 4), (32, 32, 4), (16, 32, 4)]
+    assert [rect[0] for rect in rects] == [0] * 4 + [1] * 4 + [2] * 2
+    assert all(page.shape[0] <= 32 and page.shape[1] <= 32 for page in pages)
+    for view, rect in zip(views, rects):
+        assert np.array_equal(crop(pages, rect), view)
+
+
+def test_rects_do_not_overlap():
+    views = make_views(23, 12, 20)
+    pages, rects = pack_atlas(views, max_atlas_size=64)
+    assert len(pages) > 1
+    boxes = pixel_boxes(pages, rects)
+    for i, (page_a, xa, ya, wa, ha) in enumerate(boxes):
+        assert xa + wa <= pages[page_a].shape[1] and ya + ha <= pages[page_a].shape[0]
+        for page_b, xb, yb, wb, hb in boxes[i + 1:]:
+            if page_a == page_b:
+                assert xa + wa <= xb or xb + wb <= xa or ya + ha <= yb or yb + hb <= ya
+
+
+def test_view_larger_than_page_gets_its_own_page():
+    # 单个视角超过页尺寸时不缩小也不裁剪，每页放一个视角
+    views = make_views(3, 48, 40)
+    pages, rects = pack_atlas(views, max_atlas_size=32)
+    assert [page.shape for page in pages] == [(48, 40, 3)] * 3
+    assert rects == [[page, 0.0, 0.0, 1.0, 1.0] for page in range(3)]
+    for view, page in zip(views, pages):
+        assert np.array_equal(page, view)
+
+
+def test_preview_reports_atlas_rects(folder_paths):
+    views = torch.rand(5, 16, 16, 3)
+    ui = nodes.MultiView3DPreview().preview_3d(
+        MultiViewImages(views), "carousel", 1.0, True, atlas=True,
+    )["ui"]
+    (rects,) = ui["atlas_rects"]
+    assert len(rects) == 5 and len(ui["images"]) == 1
+    assert all(image["filename"].startswith("atlas_") for image in ui["images"])
+    _, expected = pack_atlas(np.ascontiguousarray((views.clamp(0, 1) * 255).to(torch.uint8).numpy()))
+    assert rects == expected
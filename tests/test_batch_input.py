@@ -3,28 +3,12 @@
 """
 
 import torch
-import numpy as np
 
+from plugin_loader import load_plugin
 
-class MultiViewImageBatch:
-    """多视角图片批量输入节点（接受图片列表）"""
-    
-    def process_batch(self, images):
-        """处理批量图片输入"""
-        # images 的形状是 [batch, height, width, channels]
-        batch_size = images.shape[0]
-        
-        if batch_size == 0:
-            raise ValueError("图片列表不能为空")
-        
-        # 将批量图片拆分为单独的图片
-        image_list = []
-        for i in range(batch_size):
-            # 保持维度，每个图片仍然是 [1, height, width, channels]
-            img = images[i:i+1]
-            image_list.append(img)
-        
-        return ({"images": image_list},)
+# 使用 nodes.py 中真实的节点（folder_paths 由 plugin_loader 替换为临时目录）
+load_plugin()
+from multiview3d_plugin.nodes import MultiViewImageBatch
 
 
 def test_batch_input():
@@ -0,0 +1,41 @@
+"""
+测试节点基准：所有节点都能在 folder_paths 替身下运行，与基线对比能发现回归
+"""
+
+import json
+
+import bench_nodes
+
+
+def test_suite_saves_and_compares_baseline(tmp_path, folder_paths):
+    baseline_path = tmp_path / "baseline.json"
+    argv = ["--views", "2", "--sizes", "256", "--text-sizes", "100", "--repeat", "1",
+            "--baseline", str(baseline_path)]
+    assert bench_nodes.main(argv + ["--save-baseline"]) == 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    assert sorted(baseline["results"]) == [
+        "preview_3d views=2 size=256",
+        "preview_images views=2 size=256",
+        "save_html views=2 size=256",
+        "text_list items=100",
+    ]
+    for result in baseline["results"].values():
+        assert {"p50_ms", "p95_ms", "throughput", "bytes_written", "peak_rss_growth_mb"} <= set(result)
+    assert baseline["results"]["save_html views=2 size=256"]["bytes_written"] > 0
+
+    # 基线中的写入字节数明显更小时报告回归
+    results = baseline["results"]
+    results["save_html views=2 size=256"]["bytes_written"] //= 10
+    baseline_path.write_text(json.dumps(baseline), encoding="utf-8")
+    assert bench_nodes.main(argv + ["--nodes", "save_html", "--compare"]) == 1
+
+
+def test_compare_tolerance():
+    baseline = {"a": {"p50_ms": 100.0, "bytes_written": 10**6, "peak_rss_growth_mb": 100.0}}
+    assert bench_nodes.compare({"a": {"p50_ms": 120.0, "bytes_written": 10**6, "peak_rss_growth_mb": 100.0}},
+                               baseline) == []
+    regressions = bench_nodes.compare(
+        {"a": {"p50_ms": 200.0, "bytes_written": 2 * 10**6, "peak_rss_growth_mb": 300.0}}, baseline
+    )
+    assert len(regressions) == 3
@@ -0,0 +1,60 @@
+"""
+测试预览/保存格式到 PIL 保存参数和扩展名的映射，以及编码结果确实是所选格式
+"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from multiview3d_plugin.encoding import (
+    ARCHIVE_FORMATS,
+    MIME_TYPES,
+    PREVIEW_FORMATS,
+    encode_views_to_bytes,
+    get_save_options,
+)
+
+
+@pytest.mark.parametrize("image_format, options, ext", [
+    ("png", {"format": "PNG", "compress_level": 6}, ".png"),
+    ("jpeg", {"format": "JPEG", "quality": 90}, ".jpg"),
+    ("webp", {"format": "WEBP", "quality": 90, "method": 4}, ".webp"),
+    ("webp_lossless", {"format": "WEBP", "lossless": True, "quality": 90, "exact": True}, ".webp"),
+])
+def test_format_maps_to_options_and_extension(image_format, options, ext):
+    assert get_save_options(image_format) == (options, ext)
+    assert options["format"] in MIME_TYPES
+
+
+def test_quality_and_compress_level_go_to_their_formats():
+    assert get_save_options("jpeg", quality=55)[0]["quality"] == 55
+    assert get_save_options("webp", quality=55)[0]["quality"] == 55
+    # webp_lossless 的 quality 是压缩力度
+    assert get_save_options("webp_lossless", quality=20)[0]["quality"] == 20
+    # compress_level 只用于 png
+    assert get_save_options("png", 90, 1)[0] == {"format": "PNG", "compress_level": 1}
+    assert "compress_level" not in get_save_options("jpeg", 90, 1)[0]
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="bmp"):
+        get_save_options("bmp")
+
+
+def test_every_format_encodes_as_declared():
+    assert set(ARCHIVE_FORMATS) <= set(PREVIEW_FORMATS)
+    rng = np.random.default_rng(0)
+    views = rng.integers(0, 256, (2, 16, 16, 4), dtype=np.uint8)
+    # 完全透明的像素也要保留 RGB
+    views[:, 0, 0, 3] = 0
+    for image_format in PREVIEW_FORMATS:
+        options, _ = get_save_options(image_format)
+        for view, data in zip(views, encode_views_to_bytes(views, options)):
+            image = Image.open(io.BytesIO(data))
+            assert image.format == options["format"]
+            assert Image.MIME[image.format] == MIME_TYPES[options["format"]]
+            if image_format in ARCHIVE_FORMATS:
+                # 保存只允许无损格式，像素（含透明通道）原样保留
+                assert np.array_equal(np.asarray(image.convert("RGBA")), view)
@@ -0,0 +1,93 @@
+"""
+测试 SaveMultiView3D 的导出：不重名的路径、确定的清单、原子写入和单文件的 three.js 内联
+"""
+
+import os
+
+import pytest
+import torch
+
+from multiview3d_plugin import nodes, threejs
+from multiview3d_plugin.export import MANIFEST_NAME, write_atomic
+from multiview3d_plugin.multi_view import MultiViewImages
+
+
+def save(export_mode="bundle", filename="preview", seed=0):
+    views = torch.rand(3, 16, 16, 3, generator=torch.Generator().manual_seed(seed))
+    (html_path,) = nodes.SaveMultiView3D().save_html(
+        MultiViewImages(views), "carousel", 1.0, True, filename, export_mode=export_mode,
+    )
+    return html_path
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_same_name_saves_get_numbered_paths(folder_paths):
+    output_dir = folder_paths.get_output_directory()
+    first, second = save(), save()
+    assert os.path.relpath(first, output_dir) == os.path.join("preview_00001", "preview.html")
+    assert os.path.relpath(second, output_dir) == os.path.join("preview_00002", "preview.html")
+
+    single = [save("single_file"), save("single_file")]
+    assert [os.path.basename(path) for path in single] == ["preview_00001.html", "preview_00002.html"]
+    with open(single[0], encoding="utf-8") as f:
+        html = f.read()
+    assert threejs.load_threejs_source() in html and "cdnjs" not in html
+
+
+def test_identical_inputs_give_identical_manifests(folder_paths):
+    first, second = save(), save()
+    manifests = [read_bytes(os.path.join(os.path.dirname(path), MANIFEST_NAME)) for path in (first, second)]
+    assert manifests[0] == manifests[1]
+    assert read_bytes(os.path.join(os.path.dirname(save(seed=1)), MANIFEST_NAME)) != manifests[0]
+
+
+def test_failed_write_leaves_no_temp_files(tmp_path):
+    # 写入失败（数据类型错误）和重命名失败（目标是目录）都不留下 .tmp 文件
+    with pytest.raises(TypeError):
+        write_atomic(str(tmp_path / "view.png"), 12345)
+    (tmp_path / "taken").mkdir()
+    with pytest.raises(OSError):
+        write_atomic(str(tmp_path / "taken"), b"data")
+    assert sorted(os.listdir(tmp_path)) == ["taken"]
+
+
+@pytest.mark.parametrize("export_mode", ["bundle", "shared_folder"])
+def test_exports_load_local_threejs(folder_paths, export_mode):
+    html_path = save(export_mode)
+    with open(html_path, encoding="utf-8") as f:
+        html = f.read()
+    assert '<script src="three.min.js"></script>' in html and "cdnjs" not in html
+    copied = os.path.join(os.path.dirname(html_path), "three.min.js")
+    assert read_bytes(copied) == read_bytes(threejs.THREEJS_PATH)
+
+
+def test_single_file_requires_local_threejs(folder_paths, monkeypatch):
+    monkeypatch.setattr(threejs, "_source", None)
+    monkeypatch.setattr(threejs, "THREEJS_PATH", str(folder_paths.get_output_directory()) + "/missing.js")
+    with pytest.raises(FileNotFoundError, match="three.js"):
+        save("single_file")
+    # 报错发生在占用文件名之前，不留下空文件
+    assert not any(name.endswith(".html") for name in os.listdir(folder_paths.get_output_directory()))
+
+
+# 最初版本各节点的必填输入；新加的参数只能放在 optional 中，否则旧的 API 格式工作流无法通过校验
+ORIGINAL_REQUIRED_INPUTS = {
+    "MultiViewImageBatch": {"images"},
+    "MultiViewImageInput": set(),
+    "MultiView3DPreview": {"multi_view_images", "preview_mode", "rotation_speed", "auto_rotate"},
+    "MultiViewImagePreview": {"multi_view_images"},
+    "TextListMerge": set(),
+    "TextListCreate": set(),
+    "TextListDisplay": {"text_list"},
+    "SaveMultiView3D": {"multi_view_images", "preview_mode", "rotation_speed", "auto_rotate", "filename"},
+}
+
+
+@pytest.mark.parametrize("name", sorted(ORIGINAL_REQUIRED_INPUTS))
+def test_original_nodes_keep_their_required_inputs(name):
+    required = getattr(nodes, name).INPUT_TYPES().get("required", {})
+    assert set(required) == ORIGINAL_REQUIRED_INPUTS[name]
@@ -0,0 +1,57 @@
+"""
+测试相邻视角之间的补帧
+"""
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.frame_interpolation import _translate, estimate_shifts, interpolate_views
+from multiview3d_plugin.multi_view import MultiViewImages
+
+
+def smooth_image(height=96, width=128, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    noise = torch.rand(1, 3, height, width, generator=generator)
+    return F.avg_pool2d(noise, 5, 1, 2).permute(0, 2, 3, 1).contiguous()
+
+
+def test_estimate_shifts_recovers_translation():
+    base = smooth_image()
+    shifted = _translate(base, torch.tensor([12.0]), torch.tensor([-4.0]))
+    dx, dy = estimate_shifts(base, shifted)
+    assert dx.item() == 12.0
+    assert dy.item() == -4.0
+
+
+def test_shift_blend_lands_halfway():
+    base = smooth_image()
+    shifted = _translate(base, torch.tensor([12.0]), torch.tensor([0.0]))
+    views = MultiViewImages(torch.cat([base, shifted]))
+
+    result = interpolate_views(views, 1, "shift_blend", loop=False)
+    expected = _translate(base, torch.tensor([6.0]), torch.tensor([0.0]))
+    # 只比较内部区域，边缘是按边界像素填充的
+    assert torch.allclose(result.images[1, 8:-8, 16:-16], expected[0, 8:-8, 16:-16], atol=1e-4)
+
+
+def test_frame_count_and_metadata():
+    views = MultiViewImages(torch.rand(4, 8, 8, 3), azimuths=[0, 90, 180, 270])
+
+    looped = interpolate_views(views, 2, "blend", loop=True)
+    assert len(looped) == 12
+    np.testing.assert_allclose(looped.azimuths, np.arange(12) * 30.0)
+    assert torch.equal(looped.images[::3], views.images)
+    assert looped.source_indices.tolist() == [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3]
+
+    opened = interpolate_views(views, 2, "blend", loop=False)
+    assert len(opened) == 10
+    assert torch.equal(opened.images[-1], views.images[-1])
+    assert torch.allclose(opened.images[1], torch.lerp(views.images[0], views.images[1], 1 / 3))
+
+
+def test_node_accepts_legacy_dict():
+    legacy = {"images": [torch.rand(1, 8, 8, 3), torch.rand(1, 8, 8, 3)]}
+    (result,) = nodes.MultiViewFrameInterpolation().interpolate(legacy, 3, "blend", loop=True)
+    assert result.images.shape == (8, 8, 8, 3)
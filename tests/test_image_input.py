@@ -0,0 +1,109 @@
+"""
+测试 MultiViewImageInput：尺寸不同的视角按 fit/stretch/pad 统一、通道数统一，以及 image_N 输入的顺序
+"""
+
+import pytest
+import torch
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.image_utils import normalize_views
+
+
+def solid(height, width, channels=3, value=0.5):
+    return torch.full((1, height, width, channels), value)
+
+
+def test_fit_scales_into_target_and_centers():
+    # 目标为最大高度 × 最大宽度 (16 × 16)；4 × 8 的视角放大 2 倍到 8 × 16，上下各补 4 行
+    out = normalize_views([solid(4, 8), solid(16, 16, value=1.0)], "fit")
+    assert out.shape == (2, 16, 16, 3) and out.dtype == torch.float32
+    assert torch.allclose(out[0, 4:12], torch.full((8, 16, 3), 0.5), atol=1e-4)
+    assert out[0, :4].abs().max() == 0 and out[0, 12:].abs().max() == 0
+    assert torch.equal(out[1], torch.ones(16, 16, 3))
+
+
+def test_stretch_fills_the_target():
+    out = normalize_views([solid(4, 8), solid(16, 16)], "stretch")
+    assert out.shape == (2, 16, 16, 3)
+    assert torch.allclose(out[0], torch.full((16, 16, 3), 0.5), atol=1e-4)
+
+
+def test_pad_keeps_size_and_centers():
+    view = torch.rand(1, 4, 8, 3)
+    out = normalize_views([view, solid(16, 16)], "pad")
+    # 不缩放，居中放在 (6, 4)
+    assert torch.equal(out[0, 6:10, 4:12], view[0])
+    mask = torch.ones(16, 16, dtype=torch.bool)
+    mask[6:10, 4:12] = False
+    assert out[0][mask].abs().max() == 0
+
+
+def test_same_views_keep_each_pixel():
+    views = [torch.rand(1, 8, 8, 3) for _ in range(3)]
+    out = normalize_views(views)
+    assert torch.equal(out, torch.cat(views))
+
+
+def test_rgba_wins_and_padding_is_transparent():
+    gray = solid(8, 8, channels=1, value=0.25)
+    rgba = torch.rand(1, 8, 16, 4)
+    out = normalize_views([gray, rgba], "pad")
+    assert out.shape == (2, 8, 16, 4)
+    # 灰度扩展为 RGB，补出的透明度为不透明；补边区域完全透明
+    assert torch.equal(out[0, :, 4:12, :3], torch.full((8, 8, 3), 0.25))
+    assert torch.equal(out[0, :, 4:12, 3], torch.ones(8, 8))
+    assert out[0, :, :4].abs().max() == 0 and out[0, :, 12:].abs().max() == 0
+    assert torch.equal(out[1], rgba[0])
+
+
+def test_channels_unify_to_rgb_without_alpha():
+    gray = solid(8, 8, channels=1, value=0.75)
+    rgb = torch.rand(1, 8, 8, 3)
+    out = normalize_views([gray, rgb])
+    assert out.shape == (2, 8, 8, 3)
+    assert torch.equal(out[0], torch.full((8, 8, 3), 0.75))
+    assert torch.equal(out[1], rgb[0])
+
+    # 灰度 + 透明度也算带透明通道
+    gray_alpha = torch.cat([solid(8, 8, 1, 0.5), solid(8, 8, 1, 0.2)], dim=-1)
+    out = normalize_views([gray_alpha, rgb])
+    assert out.shape == (2, 8, 8, 4)
+    assert torch.allclose(out[0, 0, 0], torch.tensor([0.5, 0.5, 0.5, 0.2]))
+    assert torch.equal(out[1, ..., 3], torch.ones(8, 8))
+
+
+def test_uint8_views_are_scaled_to_float():
+    view = torch.full((1, 4, 4, 3), 255, dtype=torch.uint8)
+    out = normalize_views([view, solid(8, 8)], "pad")
+    assert out.dtype == torch.float32
+    assert torch.equal(out[0, 2:6, 2:6], torch.ones(4, 4, 3))
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError):
+        normalize_views([])
+    with pytest.raises(ValueError):
+        normalize_views([solid(4, 4)], "crop")
+    with pytest.raises(ValueError):
+        normalize_views([solid(4, 4, channels=5), solid(8, 8)])
+
+
+def test_inputs_are_ordered_by_number_and_gaps_skipped():
+    node = nodes.MultiViewImageInput()
+    values = {i: solid(8, 8, value=i / 20) for i in (2, 3, 10)}
+    # image_10 排在 image_2 之后（按数字而不是字符串排序），未连接的 image_1 被跳过
+    (result,) = node.process_images(
+        image_10=values[10], image_2=values[2], image_1=None, image_3=values[3], image_extra=solid(8, 8),
+    )
+    images = result.images
+    assert images.shape == (3, 8, 8, 3)
+    assert [round(images[i, 0, 0, 0].item() * 20) for i in range(3)] == [2, 3, 10]
+
+    # 缺少 resize_mode 的旧工作流按 fit 处理
+    (fitted,) = node.process_images(image_1=solid(4, 8), image_2=solid(16, 16))
+    assert torch.equal(fitted.images, normalize_views([solid(4, 8), solid(16, 16)], "fit"))
+    (padded,) = node.process_images("pad", image_1=solid(4, 8), image_2=solid(16, 16))
+    assert padded.images[0, 0].abs().max() == 0 and padded.images[0, 6, 4, 0] == 0.5
+
+    with pytest.raises(ValueError):
+        node.process_images(image_1=None)
@@ -0,0 +1,125 @@
+"""
+测试多视角图片的批量转换：uint8 量化、尺寸不一致的列表、copy=True 时不与输入共享内存，以及预览尺寸的缩小
+"""
+
+import numpy as np
+import pytest
+import torch
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.image_utils import preview_size, resize_views, tensors_to_uint8, uint8_nbytes
+from multiview3d_plugin.multi_view import MultiViewImages
+
+
+def test_float_views_are_clamped_and_quantized():
+    views = torch.tensor([-0.5, 0.0, 0.5, 1.0, 2.0]).reshape(1, 1, 5, 1).expand(2, 1, 5, 3).contiguous()
+    out = tensors_to_uint8(views)
+    assert isinstance(out, np.ndarray) and out.dtype == np.uint8
+    assert out.shape == (2, 1, 5, 3) and out.flags["C_CONTIGUOUS"]
+    # 与逐张 (x * 255).clip(0, 255).astype(uint8) 的结果一致
+    assert out[0, 0, :, 0].tolist() == [0, 0, 127, 255, 255]
+    # 输入张量不被原地修改
+    assert views[0, 0, 0, 0] == -0.5
+
+    for dtype in (torch.float16, torch.float64):
+        assert np.array_equal(tensors_to_uint8(views.to(dtype)), out)
+
+
+def test_uint8_views_keep_their_values():
+    views = torch.randint(0, 256, (3, 4, 4, 4), dtype=torch.uint8)
+    assert np.array_equal(tensors_to_uint8(views), views.numpy())
+
+
+def test_list_of_mixed_sizes_converts_each_view():
+    small = torch.rand(2, 4, 6, 3)
+    large = torch.rand(1, 8, 8, 4)
+    out = tensors_to_uint8([small, large])
+    # 尺寸不一致时返回逐张的数组列表，每项只取第一张
+    assert isinstance(out, list) and [view.shape for view in out] == [(4, 6, 3), (8, 8, 4)]
+    assert all(view.dtype == np.uint8 for view in out)
+    assert np.array_equal(out[0], tensors_to_uint8(small[:1])[0])
+    assert np.array_equal(out[1], tensors_to_uint8(large)[0])
+
+    # 尺寸一致的列表拼成一个连续批量
+    batch = tensors_to_uint8([small[:1], small[1:]])
+    assert isinstance(batch, np.ndarray) and np.array_equal(batch, tensors_to_uint8(small))
+
+    assert uint8_nbytes([small, large]) == 4 * 6 * 3 + 8 * 8 * 4
+    assert uint8_nbytes(small) == small.numel()
+
+    with pytest.raises(ValueError):
+        tensors_to_uint8([])
+
+
+def test_copy_never_aliases_the_input():
+    views = torch.randint(0, 256, (2, 4, 4, 3), dtype=torch.uint8)
+    # 默认不复制 uint8 输入
+    assert np.shares_memory(tensors_to_uint8(views), views.numpy())
+
+    for images in (views, [views[:1], views[1:]], [views[:1], torch.zeros(1, 2, 2, 3, dtype=torch.uint8)]):
+        out = tensors_to_uint8(images, copy=True)
+        snapshot = [np.array(view) for view in out]
+        views.fill_(7)
+        assert all(np.array_equal(view, before) for view, before in zip(out, snapshot))
+        assert not any(np.shares_memory(view, views.numpy()) for view in out)
+        views.copy_(torch.randint(0, 256, views.shape, dtype=torch.uint8))
+
+    floats = torch.rand(2, 4, 4, 3)
+    out = tensors_to_uint8(floats, copy=True)
+    floats.fill_(0.0)
+    assert out.any()
+
+
+@pytest.mark.parametrize("size, max_size, power_of_two, expected", [
+    # 按长边等比缩小，不放大；0 表示不限制
+    ((1024, 512), 256, False, (256, 128)),
+    ((300, 1000), 512, False, (154, 512)),
+    ((100, 80), 512, False, (100, 80)),
+    ((2000, 3000), 0, False, (2000, 3000)),
+    ((1, 4000), 100, False, (1, 100)),
+    # 每条边向下取到 2 的幂
+    ((300, 1000), 512, True, (128, 512)),
+    ((100, 80), 0, True, (64, 64)),
+    ((512, 512), 512, True, (512, 512)),
+])
+def test_preview_size(size, max_size, power_of_two, expected):
+    assert preview_size(*size, max_size, power_of_two) == expected
+
+
+def test_resize_views_batches_and_lists():
+    views = torch.rand(3, 64, 32, 3)
+    resized = resize_views(views, 16)
+    assert resized.shape == (3, 16, 8, 3) and resized.dtype == torch.float32
+    # 不需要缩小时原样返回
+    assert resize_views(views, 64) is views
+    assert resize_views(views, 0) is views
+
+    # uint8 输入分块缩小并保持 uint8，结果与浮点路径一致
+    uint8 = torch.randint(0, 256, (6, 64, 32, 3), dtype=torch.uint8)
+    small = resize_views(uint8, 16, power_of_two=True)
+    assert small.shape == (6, 16, 8, 3) and small.dtype == torch.uint8
+    expected = tensors_to_uint8(resize_views(uint8.float() / 255.0, 16, power_of_two=True))
+    assert np.abs(small.numpy().astype(int) - expected.astype(int)).max() <= 1
+
+    # 尺寸不一致时逐张缩小
+    mixed = resize_views([torch.rand(1, 64, 64, 3), torch.rand(1, 20, 40, 3)], 32)
+    assert [view.shape for view in mixed] == [(1, 32, 32, 3), (1, 16, 32, 3)]
+
+
+def test_preview_reports_size_and_bytes_saved(folder_paths):
+    views = torch.rand(4, 300, 200, 3)
+
+    def run(**options):
+        return nodes.MultiView3DPreview().preview_3d(MultiViewImages(views), "carousel", 1.0, True, **options)["ui"]
+
+    ui = run(max_preview_size=150)
+    # preview_size 为 [宽, 高]
+    assert ui["preview_size"] == [[100, 150]]
+    assert ui["bytes_saved"] == [4 * 3 * (300 * 200 - 150 * 100)]
+
+    ui = run(max_preview_size=150, power_of_two=True)
+    assert ui["preview_size"] == [[64, 128]]
+    assert ui["bytes_saved"] == [4 * 3 * (300 * 200 - 128 * 64)]
+
+    ui = run(max_preview_size=0)
+    assert ui["preview_size"] == [[200, 300]] and ui["bytes_saved"] == [0]
@@ -0,0 +1,77 @@
+"""
+测试可选的性能统计：ui 中的 profile 和 JSONL 日志
+"""
+
+import json
+
+import torch
+
+from multiview3d_plugin import instrumentation, nodes
+from multiview3d_plugin.multi_view import MultiViewImages
+
+
+def test_disabled_by_default(folder_paths, monkeypatch):
+    monkeypatch.delenv("MULTIVIEW_PROFILE", raising=False)
+    monkeypatch.delenv("MULTIVIEW_PROFILE_LOG", raising=False)
+    views = MultiViewImages(torch.rand(2, 16, 16, 3))
+    result = nodes.MultiView3DPreview().preview_3d(views, "carousel", 1.0, True)
+    assert "profile" not in result["ui"]
+    assert nodes.MultiViewImageBatch().process_batch(torch.rand(2, 8, 8, 3))[0].images.shape[0] == 2
+
+
+def test_preview_profile_and_log(folder_paths, monkeypatch, tmp_path):
+    log_path = tmp_path / "profile.jsonl"
+    monkeypatch.setenv("MULTIVIEW_PROFILE_LOG", str(log_path))
+    views = MultiViewImages(torch.rand(3, 64, 48, 3))
+
+    result = nodes.MultiView3DPreview().preview_3d(
+        views, "sphere", 1.0, True, preview_format="png", max_preview_size=32, unique_id="7"
+    )
+    (profile,) = result["ui"]["profile"]
+    assert profile["node"] == "MultiView3DPreview"
+    assert profile["node_id"] == "7"
+    assert {"layout", "resize", "convert", "copy", "hash", "encode", "write"} <= set(profile["stages_ms"])
+    assert profile["bytes_written"] == result["ui"]["bytes_written"][0] > 0
+    assert profile["total_ms"] > 0
+
+    # 只返回元组的节点改为 {"ui", "result"} 形式
+    batch = nodes.MultiViewImageBatch().process_batch(torch.rand(2, 8, 8, 3))
+    assert batch["result"][0].images.shape[0] == 2
+    assert batch["ui"]["profile"][0]["node"] == "MultiViewImageBatch"
+
+    records = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [record["node"] for record in records] == ["MultiView3DPreview", "MultiViewImageBatch"]
+    assert records[0]["stages_ms"] == profile["stages_ms"]
+
+
+def test_bundle_export_counts_bytes(folder_paths, monkeypatch):
+    monkeypatch.setenv("MULTIVIEW_PROFILE", "1")
+    monkeypatch.delenv("MULTIVIEW_PROFILE_LOG", raising=False)
+    result = nodes.SaveMultiView3D().save_html(
+        MultiViewImages(torch.rand(2, 16, 16, 3)), "carousel", 1.0, True, "profiled"
+    )
+    (profile,) = result["ui"]["profile"]
+    assert {"convert", "encode", "write"} <= set(profile["stages_ms"])
+    # 图片、HTML 和清单（以及本地 three.js）都计入写入字节数
+    assert profile["bytes_written"] > 0
+
+
+def test_peak_memory_is_read_without_resetting(monkeypatch):
+    # 不写 /proc/self/clear_refs，进程的峰值内存保持不变
+    opened = []
+    real_open = open
+
+    def recording_open(path, mode="r", *args, **kwargs):
+        opened.append((str(path), mode))
+        return real_open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", recording_open)
+    profile = instrumentation.Profile("test")
+    buffer = bytearray(64 * 2**20)
+    buffer[::4096] = b"x" * len(buffer[::4096])
+    summary = profile.summary()
+    assert not any(mode != "r" for _, mode in opened)
+    if "peak_rss_growth_mb" in summary:
+        # 节点期间分配并仍持有的 64 MB 计入增长
+        assert summary["peak_rss_growth_mb"] >= 32
+    del buffer
@@ -0,0 +1,64 @@
+"""
+测试视角布局的变换矩阵
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from multiview3d_plugin.layout import LAYOUT_MODES, compute_layout
+
+
+def as_matrices(layout):
+    """列主序的 [N, 16] 转换为 [N, 4, 4]"""
+    return layout.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+
+@pytest.mark.parametrize("mode", LAYOUT_MODES)
+@pytest.mark.parametrize("count", [1, 6, 8, 144])
+def test_every_view_gets_a_transform(mode, count):
+    layout = compute_layout(mode, count)
+    assert layout.shape == (count, 16)
+    assert layout.dtype == np.float32
+    assert np.isfinite(layout).all()
+
+
+def test_carousel_matches_previous_placement():
+    count = 8
+    matrices = as_matrices(compute_layout("carousel", count))
+    for index, matrix in enumerate(matrices):
+        angle = index / count * math.pi * 2
+        np.testing.assert_allclose(matrix[:3, 3], [math.cos(angle) * 3, 0, math.sin(angle) * 3], atol=1e-5)
+        # rotation.y = -angle
+        np.testing.assert_allclose(matrix[0, 2], math.sin(-angle), atol=1e-5)
+
+
+def test_cube_keeps_views_beyond_six():
+    matrices = as_matrices(compute_layout("cube", 12))
+    positions = matrices[:, :3, 3]
+    # 所有视角的位置互不相同，前六个仍然在六个面上
+    assert len(np.unique(positions.round(4), axis=0)) == 12
+    np.testing.assert_allclose(np.abs(positions[:6]).max(axis=1), 2.0, atol=1e-5)
+
+    # 六个及以下保持原来的布局
+    six = as_matrices(compute_layout("cube", 6))
+    np.testing.assert_allclose(six[0, :3, 3], [0, 0, 2], atol=1e-5)
+    np.testing.assert_allclose(six[0, :3, :3], np.eye(3), atol=1e-5)
+
+
+def test_turntable_uses_view_angles():
+    matrices = as_matrices(compute_layout("turntable", 2, azimuths=[0, 180], elevations=[0, 30]))
+    np.testing.assert_allclose(matrices[0, :3, 3], [0, 0, 3], atol=1e-5)
+    # 平面正面背离中心
+    direction = matrices[1, :3, 3] / np.linalg.norm(matrices[1, :3, 3])
+    np.testing.assert_allclose(matrices[1, :3, 2], direction, atol=1e-5)
+    assert matrices[1, 1, 3] == pytest.approx(3 * math.sin(math.radians(30)), abs=1e-5)
+
+
+def test_multi_ring_groups_by_elevation():
+    elevations = [0, 0, 0, 20, 20, 20]
+    matrices = as_matrices(compute_layout("multi_ring", 6, elevations=elevations))
+    heights = matrices[:, 1, 3]
+    assert len(set(heights[:3].round(4))) == 1
+    assert heights[3] > heights[0]
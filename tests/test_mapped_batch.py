@@ -0,0 +1,74 @@
+"""
+测试内存映射批量：结果与普通批量一致，且峰值内存明显更低
+"""
+
+import os
+import subprocess
+import sys
+
+import torch
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.image_utils import resize_views, tensors_to_uint8
+
+# 在独立进程中测量峰值 RSS（ru_maxrss 是整个进程的峰值，不能在测试进程里重置）
+PEAK_RSS_SCRIPT = """
+import resource, sys
+sys.path.insert(0, {tests_dir!r})
+from plugin_loader import load_plugin
+import torch
+load_plugin()
+from multiview3d_plugin import nodes
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+images = torch.rand(32, 512, 512, 3)
+base = peak_mb()
+(views,) = nodes.MultiViewImageBatch().process_batch(images, memory_mapped={mapped})
+nodes.MultiView3DPreview().preview_3d(views, "carousel", 1.0, True, preview_format="jpeg", max_preview_size=0)
+print(peak_mb() - base)
+"""
+
+
+def peak_rss_growth(mapped):
+    script = PEAK_RSS_SCRIPT.format(tests_dir=os.path.dirname(os.path.abspath(__file__)), mapped=mapped)
+    output = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def test_mapped_batch_matches_resident_batch(folder_paths):
+    images = torch.rand(6, 40, 48, 3)
+    (resident,) = nodes.MultiViewImageBatch().process_batch(images)
+    (mapped,) = nodes.MultiViewImageBatch().process_batch(images, memory_mapped=True)
+
+    assert mapped.images.dtype == torch.uint8
+    assert torch.equal(mapped.images, torch.from_numpy(tensors_to_uint8(images)))
+    # 文件在映射建立后已删除，不占用临时目录
+    mapped_dir = os.path.join(folder_paths.get_temp_directory(), nodes.MAPPED_SUBFOLDER)
+    assert os.listdir(mapped_dir) == []
+
+    # 分块缩放 uint8 批量保持 uint8，与缩放浮点批量的结果只差量化误差
+    resized = resize_views(mapped.images, 24)
+    assert resized.dtype == torch.uint8
+    expected = torch.from_numpy(tensors_to_uint8(resize_views(resident.images, 24)))
+    assert (resized.int() - expected.int()).abs().max() <= 1
+
+    preview = nodes.MultiView3DPreview()
+    expected = preview.preview_3d(resident, "carousel", 1.0, True, preview_format="png")
+    result = preview.preview_3d(mapped, "carousel", 1.0, True, preview_format="png")
+    # 编码结果完全相同：全部命中缓存，文件链接到本次的目录
+    assert result["ui"]["cache_hits"] == [6]
+    temp_dir = folder_paths.get_temp_directory()
+    for image, reference in zip(result["ui"]["images"], expected["ui"]["images"]):
+        assert image["filename"] == reference["filename"]
+        assert os.path.samefile(os.path.join(temp_dir, image["subfolder"], image["filename"]),
+                                os.path.join(temp_dir, reference["subfolder"], reference["filename"]))
+
+
+def test_mapped_batch_lowers_peak_rss():
+    resident = peak_rss_growth(mapped=False)
+    mapped = peak_rss_growth(mapped=True)
+    print(f"peak RSS growth: resident {resident:.1f} MiB, memory mapped {mapped:.1f} MiB")
+    # 批量本身是 96 MiB 的 float32；普通批量会再产生整批的浮点和 uint8 副本
+    assert mapped < resident * 0.6
@@ -0,0 +1,119 @@
+"""
+测试预览临时目录的磁盘占用上限
+"""
+
+import os
+
+import torch
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.multi_view import MultiViewImages
+from multiview3d_plugin.preview_store import PreviewStore
+from multiview3d_plugin.view_cache import ViewCache
+
+
+def disk_usage(root):
+    """返回 (子目录数, 总字节数)"""
+    folders = 0
+    total = 0
+    for entry in os.scandir(root):
+        if entry.is_dir():
+            folders += 1
+            total += sum(f.stat().st_size for f in os.scandir(entry.path))
+    return folders, total
+
+
+def write_run(store, owner, run, size=4096, count=3):
+    subfolder, path = store.acquire("multiview", owner)
+    image_files = []
+    for idx in range(count):
+        filename = f"view_{idx:02d}_{run}.png"
+        with open(os.path.join(path, filename), "wb") as f:
+            f.write(os.urandom(size))
+        image_files.append({"filename": filename, "subfolder": subfolder, "type": "temp"})
+    store.commit(image_files, subfolder)
+    return image_files
+
+
+def test_one_off_folders_stay_bounded(tmp_path):
+    store = PreviewStore(lambda: str(tmp_path), max_bytes=64 * 1024, max_folders=8)
+
+    for run in range(200):
+        write_run(store, None, run)
+        folders, total = disk_usage(tmp_path)
+        assert folders <= 8
+        assert total <= 64 * 1024
+
+    assert store.usage() == {"folders": folders, "bytes": total}
+
+
+def test_byte_limit_evicts_oldest_first(tmp_path):
+    store = PreviewStore(lambda: str(tmp_path), max_bytes=3 * 3 * 4096, max_folders=100)
+
+    runs = [write_run(store, None, run)[0]["subfolder"] for run in range(5)]
+
+    assert sorted(os.listdir(tmp_path)) == sorted(runs[2:])
+
+
+def test_node_folder_is_reused_and_pruned(tmp_path):
+    store = PreviewStore(lambda: str(tmp_path), max_bytes=1024 ** 2, max_folders=8)
+
+    for run in range(50):
+        image_files = write_run(store, "12", run)
+
+    assert os.listdir(tmp_path) == ["multiview_node_12"]
+    assert sorted(os.listdir(tmp_path / "multiview_node_12")) == sorted(
+        image["filename"] for image in image_files
+    )
+
+
+def test_referenced_folders_are_not_evicted(tmp_path):
+    store = PreviewStore(lambda: str(tmp_path), max_bytes=1, max_folders=1)
+
+    first = write_run(store, None, 0)
+    subfolder, _ = store.acquire("multiview")
+    store.commit(first, subfolder)
+
+    assert first[0]["subfolder"] in os.listdir(tmp_path)
+
+
+def test_preview_nodes_bound_temp_usage(folder_paths, monkeypatch):
+    temp_dir = folder_paths.get_temp_directory()
+    monkeypatch.setattr(nodes, "PREVIEW_CACHE", ViewCache())
+    monkeypatch.setattr(nodes, "PREVIEW_STORE", PreviewStore(
+        folder_paths.get_temp_directory, max_bytes=256 * 1024, max_folders=6
+    ))
+
+    preview_3d = nodes.MultiView3DPreview()
+    preview = nodes.MultiViewImagePreview()
+    for run in range(40):
+        multi_view_images = {"images": list(torch.rand(4, 1, 64, 64, 3))}
+        preview_3d.preview_3d(multi_view_images, "carousel", 1.0, True)
+        preview_3d.preview_3d(multi_view_images, "carousel", 1.0, True, unique_id="3")
+        preview.preview_images(multi_view_images)
+
+        folders, total = disk_usage(temp_dir)
+        assert folders <= 6
+        assert total <= 256 * 1024
+
+    assert "multiview_node_3" in os.listdir(temp_dir)
+
+
+def test_cache_hits_survive_other_node_pruning(folder_paths, monkeypatch):
+    monkeypatch.setattr(nodes, "PREVIEW_CACHE", ViewCache())
+    monkeypatch.setattr(nodes, "PREVIEW_STORE", PreviewStore(folder_paths.get_temp_directory))
+    temp_dir = folder_paths.get_temp_directory()
+    preview_3d = nodes.MultiView3DPreview()
+
+    views = MultiViewImages(torch.rand(2, 32, 32, 3))
+    preview_3d.preview_3d(views, "carousel", 1.0, True, unique_id="1")
+    # 节点 2 显示相同的图片：命中节点 1 写入的文件
+    shared = preview_3d.preview_3d(views, "carousel", 1.0, True, unique_id="2")["ui"]
+    assert shared["cache_hits"] == [2]
+
+    # 节点 1 换了图片并清理自己的目录，节点 2 显示的文件仍然存在
+    preview_3d.preview_3d(MultiViewImages(torch.rand(2, 32, 32, 3)), "carousel", 1.0, True, unique_id="1")
+    assert [
+        os.path.exists(os.path.join(temp_dir, image["subfolder"], image["filename"]))
+        for image in shared["images"]
+    ] == [True, True]
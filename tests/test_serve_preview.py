@@ -0,0 +1,22 @@
+"""
+测试 test_preview.html 的本地服务：/layout 返回 layout.py 计算的矩阵
+"""
+
+import serve_preview
+from multiview3d_plugin.layout import LAYOUT_MODES, compute_layout, layout_to_json
+
+
+def test_layout_matches_layout_py(folder_paths):
+    for mode in LAYOUT_MODES:
+        status, layout = serve_preview.layout_response(f"mode={mode}&count=9")
+        assert status == 200
+        assert layout == layout_to_json(compute_layout(mode, 9))
+    # 立方体布局不再丢弃第六个之后的视角
+    status, layout = serve_preview.layout_response("mode=cube&count=8")
+    assert len(layout) == 8 and layout[6] != layout[0]
+
+
+def test_invalid_layout_requests(folder_paths):
+    for query in ("mode=cylinder&count=4", "mode=sphere&count=many", "mode=sphere&count=-1", "count=100000"):
+        status, data = serve_preview.layout_response(query)
+        assert status == 400 and "error" in data
@@ -0,0 +1,90 @@
+"""
+测试 3D 预览的流式推送：每个视角一条消息、按视角顺序，缓存命中的视角也会推送
+"""
+
+import types
+
+import pytest
+import torch
+
+from multiview3d_plugin import encoding, nodes
+from multiview3d_plugin.multi_view import MultiViewImages
+from multiview3d_plugin.view_store import VIEW_STORE
+
+
+class RecordingServer:
+    """代替 PromptServer.instance，记录发给前端的消息"""
+
+    client_id = "client"
+
+    def __init__(self):
+        self.messages = []
+
+    def send_sync(self, event, data, sid=None):
+        self.messages.append((event, data, sid))
+
+
+@pytest.fixture
+def server(monkeypatch, folder_paths):
+    server = RecordingServer()
+    monkeypatch.setattr(nodes, "PromptServer", types.SimpleNamespace(instance=server))
+    VIEW_STORE.clear()
+    yield server
+    VIEW_STORE.clear()
+
+
+def preview(views, **options):
+    return nodes.MultiView3DPreview().preview_3d(
+        MultiViewImages(views), "carousel", 1.0, True, unique_id="5", **options,
+    )["ui"]
+
+
+def streamed(server):
+    assert all(event == "multiview3d.view" and sid == "client" for event, _, sid in server.messages)
+    return [data for _, data, _ in server.messages]
+
+
+def test_one_message_per_view_in_order(server, monkeypatch):
+    # 多个编码线程时视角的完成顺序不确定，推送仍按视角顺序
+    monkeypatch.setattr(encoding, "ENCODE_WORKERS", 4)
+    monkeypatch.setattr(encoding, "_pool", None)
+    views = torch.rand(12, 32, 32, 3)
+    # 重复的视角只编码一次，但仍各自推送
+    views[7] = views[2]
+    ui = preview(views)
+
+    messages = streamed(server)
+    assert [message["indices"] for message in messages] == [[idx] for idx in range(12)]
+    assert {message["stream_id"] for message in messages} == set(ui["stream_id"])
+    assert all(message["node"] == "5" and message["total"] == 12 for message in messages)
+    assert [message["matrices"][0] for message in messages] == ui["layout"][0]
+    # 推送的视角与最终结果一致
+    assert [message["image"] for message in messages] == ui["views"]
+    assert messages[7]["image"] == messages[2]["image"]
+
+
+def test_cache_hits_are_streamed(server):
+    views = torch.rand(6, 32, 32, 3)
+    preview(views)
+    server.messages.clear()
+
+    # 一半视角变化：命中的视角也推送，并且和新编码的视角一起按顺序发出
+    views[1::2] = torch.rand(3, 32, 32, 3)
+    ui = preview(views)
+    assert ui["cache_hits"] == [3]
+    messages = streamed(server)
+    assert [message["indices"] for message in messages] == [[idx] for idx in range(6)]
+    assert len({message["stream_id"] for message in messages}) == 1
+    assert messages[0]["stream_id"] == ui["stream_id"][0]
+
+    server.messages.clear()
+    ui = preview(views)
+    assert ui["cache_hits"] == [6] and len(streamed(server)) == 6
+
+
+def test_no_stream_without_option_or_in_atlas_mode(server):
+    views = torch.rand(4, 16, 16, 3)
+    for options in ({"stream_views": False}, {"atlas": True}):
+        ui = preview(views, **options)
+        assert "stream_id" not in ui
+    assert server.messages == []
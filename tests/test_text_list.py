@@ -0,0 +1,103 @@
+"""
+测试文本列表节点：TEXT_LIST 按引用传递，只在 TextListToString 中序列化，旧的 STRING 输入仍然可用
+"""
+
+import json
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.text_list import TextList
+
+
+def test_native_list_passes_by_reference():
+    (first,) = nodes.TextListCreate().create_list(text_1="a, with comma", text_2=" b ", text_3="")
+    assert first == ("a, with comma", "b")
+
+    merge = nodes.TextListMerge()
+    # 只有一个输入时直接返回同一个对象
+    assert merge.merge_lists(list_2=first)[0] is first
+
+    (second,) = nodes.TextListCreate().create_list(text_1="c")
+    (merged,) = merge.merge_lists(list_1=first, list_3=second)
+    assert isinstance(merged, TextList)
+    assert list(merged) == ["a, with comma", "b", "c"]
+
+    result = nodes.TextListDisplay().display_list(merged)
+    assert result["result"][0] is merged
+    assert result["ui"]["text"] == ["1. a, with comma\n2. b\n3. c"]
+
+    # 含逗号的项不会被拆开
+    (text,) = nodes.TextListToString().to_string(merged)
+    assert json.loads(text) == ["a, with comma", "b", "c"]
+
+
+def test_chain_nodes_do_not_serialize(monkeypatch):
+    # 链中的节点只传递 TEXT_LIST，JSON 只在 TextListToString 中生成一次
+    calls = []
+    to_json = TextList.to_json
+    monkeypatch.setattr(TextList, "to_json", lambda self: calls.append(len(self)) or to_json(self))
+
+    (items,) = nodes.TextListCreate().create_list(text_1="a", text_2="b")
+    for _ in range(16):
+        (items,) = nodes.TextListMerge().merge_lists(list_1=items, list_2=TextList(["c"]))
+    (items,) = nodes.TextListDisplay().display_list(items, "paged", 10)["result"]
+    assert calls == []
+
+    (text,) = nodes.TextListToString().to_string(items)
+    assert calls == [18] and json.loads(text)[-1] == "c"
+
+
+def test_legacy_string_inputs():
+    merge = nodes.TextListMerge()
+    (merged,) = merge.merge_lists(list_1='["1", "2"]', list_2="3, 4", list_3="五")
+    assert list(merged) == ["1", "2", "3", "4", "五"]
+
+    result = nodes.TextListDisplay().display_list('["x", "y"]')
+    assert result["result"][0] == ("x", "y")
+    assert result["ui"]["text"] == ["1. x\n2. y"]
+    assert nodes.TextListDisplay().display_list("plain")["ui"]["text"] == ["plain"]
+
+    assert nodes.TextListToString().to_string('["x", "y"]') == ('["x", "y"]',)
+    assert nodes.TextListToString().to_string("3, 4") == ('["3", "4"]',)
+
+
+def test_paged_display_payload_is_bounded():
+    items = TextList(f"prompt {i}" for i in range(100000))
+    result = nodes.TextListDisplay().display_list(items, "paged", 20)
+    (summary,) = result["ui"]["summary"]
+    assert "list" not in result["ui"]
+    assert summary["count"] == 100000 and summary["pages"] == 5000
+    assert summary["head"][0] == "prompt 0" and summary["tail"][-1] == "prompt 99999"
+    assert summary["tail_start"] == 99980
+    assert len(json.dumps(result["ui"], ensure_ascii=False)) < 4096
+    assert result["result"][0] is items
+
+    full = nodes.TextListDisplay().display_list(TextList(["a", "b"]), "full")
+    assert full["ui"]["list"] == ['["a", "b"]']
+
+
+def test_page_route():
+    import asyncio
+
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+
+    from multiview3d_plugin import routes
+
+    items = TextList(str(i) for i in range(25))
+    summary = nodes.TextListDisplay().display_list(items, "paged", 10)["ui"]["summary"][0]
+
+    async def fetch():
+        table = web.RouteTableDef()
+        routes.register_routes(table)
+        app = web.Application()
+        app.add_routes(table)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get(f"/multiview3d/text_list/{summary['list_id']}?page=2&page_size=10")
+            page = await response.json()
+            missing = await client.get("/multiview3d/text_list/unknown")
+            return page, missing.status
+
+    page, missing_status = asyncio.run(fetch())
+    assert page["items"] == ["20", "21", "22", "23", "24"]
+    assert (page["page"], page["pages"], page["start"], page["count"]) == (2, 3, 20, 25)
+    assert missing_status == 404
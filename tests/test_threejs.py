@@ -0,0 +1,40 @@
+"""
+测试随插件提交的 three.js 本地副本及其下载校验
+"""
+
+import base64
+import hashlib
+import io
+import os
+
+import pytest
+
+from multiview3d_plugin import threejs
+
+
+def test_vendored_copy_matches_pinned_digest():
+    with open(threejs.THREEJS_PATH, "rb") as f:
+        threejs.verify_threejs(f.read())
+
+
+@pytest.fixture
+def fake_cdn(monkeypatch, tmp_path):
+    """CDN 返回指定内容，本地副本写到临时目录"""
+    monkeypatch.setattr(threejs, "THREEJS_PATH", str(tmp_path / "vendor" / "three.min.js"))
+    content = {}
+    monkeypatch.setattr(threejs.urllib.request, "urlopen", lambda url, timeout: io.BytesIO(content["data"]))
+    return content
+
+
+def test_fetch_rejects_unexpected_content(fake_cdn):
+    fake_cdn["data"] = b"console.log('not three.js')"
+    with pytest.raises(ValueError, match="sha512"):
+        threejs.fetch_threejs()
+    assert not os.path.exists(threejs.THREEJS_PATH)
+
+
+def test_fetch_writes_verified_copy(fake_cdn, monkeypatch):
+    fake_cdn["data"] = b"var THREE = {};"
+    monkeypatch.setattr(threejs, "THREEJS_SHA512", base64.b64encode(hashlib.sha512(fake_cdn["data"]).digest()).decode())
+    with open(threejs.fetch_threejs(), "rb") as f:
+        assert f.read() == fake_cdn["data"]
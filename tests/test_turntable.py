@@ -0,0 +1,107 @@
+"""
+测试转台动画的逐帧生成和编码
+"""
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.multi_view import MultiViewImages
+from multiview3d_plugin.turntable import TurntableFrames, write_turntable
+
+
+def solid_views(values, size=16):
+    """每个视角是一张纯色图片，值为 0-1"""
+    return torch.tensor(values, dtype=torch.float32)[:, None, None, None].expand(len(values), size, size, 3).contiguous()
+
+
+def test_frame_count_and_blend():
+    frames = TurntableFrames(solid_views([0.0, 1.0]), inbetween_frames=3, loop=True)
+    assert len(frames) == 8
+    # 第 2 帧位于两个视角的正中间
+    assert frames.frame(2)[0, 0, 0] in (127, 128)
+    assert frames.frame(4)[0, 0, 0] == 255
+    # 循环时最后几帧过渡回第一个视角
+    assert frames.frame(7)[0, 0, 0] < frames.frame(6)[0, 0, 0]
+
+    assert len(TurntableFrames(solid_views([0.0, 1.0, 0.5]), inbetween_frames=2, loop=False)) == 7
+    held = TurntableFrames(solid_views([0.0, 1.0]), inbetween_frames=3, interpolation="none")
+    assert held.frame(3)[0, 0, 0] == 0
+
+
+@pytest.mark.parametrize("video_format", ["webp", "gif"])
+def test_write_animation(tmp_path, video_format):
+    frames = TurntableFrames(torch.rand(4, 24, 32, 3), inbetween_frames=1)
+    path = write_turntable(frames, str(tmp_path / f"turntable.{video_format}"), video_format, fps=10)
+    with Image.open(path) as image:
+        assert image.size == (32, 24)
+        assert image.n_frames == 8
+    # 临时文件已被重命名
+    assert [p.name for p in tmp_path.iterdir()] == [f"turntable.{video_format}"]
+
+
+def gradient_views(count, channels):
+    """平滑渐变的视角，有损编码的误差较小"""
+    ys, xs = torch.meshgrid(torch.linspace(0, 1, 24), torch.linspace(0, 1, 32), indexing="ij")
+    views = [
+        torch.stack([(xs + i / count) / 2, ys, (xs + ys) / 2, 1 - xs * ys][:channels], dim=-1)
+        for i in range(count)
+    ]
+    return torch.stack(views)
+
+
+def read_frames(path, mode):
+    with Image.open(path) as image:
+        frames = []
+        for index in range(image.n_frames):
+            image.seek(index)
+            frames.append((np.asarray(image.convert(mode)).astype(int), image.info.get("duration")))
+    return frames
+
+
+@pytest.mark.parametrize("video_format, channels, tolerance", [
+    # GIF 逐帧量化到 256 色，WebP 为有损编码
+    ("gif", 3, 6),
+    ("webp", 3, 6),
+    ("webp", 4, 6),
+])
+def test_frames_match_their_source(tmp_path, video_format, channels, tolerance):
+    frames = TurntableFrames(gradient_views(3, channels), inbetween_frames=1, loop=False)
+    path = write_turntable(frames, str(tmp_path / f"turntable.{video_format}"), video_format, fps=20)
+    mode = "RGBA" if channels == 4 else "RGB"
+    decoded = read_frames(path, mode)
+    assert len(decoded) == len(frames) == 5
+    for index, (pixels, duration) in enumerate(decoded):
+        assert duration == 50
+        expected = frames.frame(index).astype(int)
+        assert pixels.shape == expected.shape
+        assert np.abs(pixels - expected).mean() < tolerance
+        if channels == 4:
+            # 透明通道原样保留
+            assert np.abs(pixels[..., 3] - expected[..., 3]).max() <= 2
+
+
+def test_failed_write_leaves_no_file(tmp_path, monkeypatch):
+    frames = TurntableFrames(torch.rand(2, 8, 8, 3))
+
+    def broken(index):
+        raise RuntimeError("frame failed")
+
+    monkeypatch.setattr(frames, "frame", broken)
+    with pytest.raises(RuntimeError, match="frame failed"):
+        write_turntable(frames, str(tmp_path / "turntable.webp"), "webp", fps=10)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_node_orders_views_by_azimuth(folder_paths):
+    views = MultiViewImages(solid_views([0.2, 0.8, 0.5]), azimuths=[0, 240, 120])
+    result = nodes.SaveMultiViewTurntable().save_turntable(views, "turntable", "gif", fps=10, loop=False)
+    with Image.open(result["result"][0]) as image:
+        levels = []
+        for index in range(image.n_frames):
+            image.seek(index)
+            levels.append(np.asarray(image.convert("RGB"))[0, 0, 0])
+    assert levels == sorted(levels)
+    assert result["ui"]["images"][0]["type"] == "output"
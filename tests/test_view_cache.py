@@ -0,0 +1,109 @@
+"""
+测试已编码视角的缓存：LRU 淘汰（按条目数和字节数）、命中计数，以及缓存键随编码参数和尺寸变化
+"""
+
+import numpy as np
+import torch
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.encoding import get_save_options
+from multiview3d_plugin.multi_view import MultiViewImages
+from multiview3d_plugin.view_cache import ViewCache, hash_view, hash_views, make_key
+
+
+def entry(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return {"filename": name, "subfolder": "", "type": "temp", "path": str(path), "size": size}
+
+
+def test_evicts_least_recently_used_by_entries(tmp_path):
+    cache = ViewCache(max_entries=2, max_bytes=1 << 20)
+    cache.put("a", entry(tmp_path, "a", 1))
+    cache.put("b", entry(tmp_path, "b", 1))
+    # 访问 a 之后 b 成为最久未使用的条目
+    assert cache.get("a")["filename"] == "a"
+    cache.put("c", entry(tmp_path, "c", 1))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert len(cache) == 2
+
+
+def test_evicts_least_recently_used_by_bytes(tmp_path):
+    cache = ViewCache(max_entries=100, max_bytes=10)
+    cache.put("a", entry(tmp_path, "a", 4))
+    cache.put("b", entry(tmp_path, "b", 4))
+    cache.get("a")
+    cache.put("c", entry(tmp_path, "c", 4))
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats()["bytes"] == 8
+
+    # 替换同一个键时按新大小计算
+    cache.put("a", entry(tmp_path, "a2", 2))
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, 6)
+
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = ViewCache()
+    assert cache.get("a") is None
+    cache.put("a", entry(tmp_path, "a", 3))
+    cache.get("a")
+    cache.get("a")
+    assert cache.stats() == {"hits": 2, "misses": 1, "entries": 1, "bytes": 3}
+
+    # 文件被删除的条目视为未命中并移除
+    (tmp_path / "a").unlink()
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 2, "misses": 2, "entries": 0, "bytes": 0}
+
+    cache.put("b", entry(tmp_path, "b", 1))
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+
+
+def test_key_depends_on_pixels_shape_and_options():
+    rng = np.random.default_rng(0)
+    view = rng.integers(0, 256, (16, 16, 3), dtype=np.uint8)
+    png, _ = get_save_options("png")
+
+    def key(img_np, options=png):
+        return make_key(hash_view(img_np), img_np, options)
+
+    assert key(view) == key(view.copy())
+    changed = view.copy()
+    changed[0, 0, 0] ^= 1
+    assert key(changed) != key(view)
+
+    # 相同的字节换一个形状（尺寸）不能命中
+    assert key(view.reshape(8, 32, 3)) != key(view)
+
+    options = [
+        get_save_options("png"),
+        get_save_options("png", compress_level=1),
+        get_save_options("jpeg", 90),
+        get_save_options("jpeg", 80),
+        get_save_options("webp", 90),
+        get_save_options("webp_lossless", 90),
+    ]
+    assert len({key(view, save_options) for save_options, _ in options}) == len(options)
+    # 参数的顺序不影响键
+    assert key(view, {"quality": 90, "format": "JPEG"}) == key(view, {"format": "JPEG", "quality": 90})
+
+    views = rng.integers(0, 256, (5, 8, 8, 3), dtype=np.uint8)
+    assert hash_views(views) == [hash_view(img_np) for img_np in views]
+
+
+def test_preview_reencodes_only_when_inputs_change(folder_paths):
+    nodes.PREVIEW_CACHE.clear()
+    views = MultiViewImages(torch.rand(3, 32, 32, 3))
+
+    def run(**options):
+        ui = nodes.MultiView3DPreview().preview_3d(views, "carousel", 1.0, True, unique_id="9", **options)["ui"]
+        return ui["cache_hits"][0], ui["cache_misses"][0]
+
+    assert run(preview_format="jpeg", quality=90) == (0, 3)
+    assert run(preview_format="jpeg", quality=90) == (3, 0)
+    assert run(preview_format="jpeg", quality=70) == (0, 3)
+    assert run(preview_format="png") == (0, 3)
+    assert run(preview_format="png", max_preview_size=16) == (0, 3)
@@ -0,0 +1,148 @@
+"""
+测试从目录、压缩包和导出目录读取多视角图片
+"""
+
+import base64
+import io
+import os
+import tarfile
+import zipfile
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.image_utils import tensors_to_uint8
+from multiview3d_plugin.multi_view import MultiViewImages
+from multiview3d_plugin.view_loader import load_views
+
+
+def write_views(directory, count, size=(32, 24), suffix="png"):
+    """view_1 ... view_N，每张图片的红色通道等于序号"""
+    os.makedirs(directory, exist_ok=True)
+    for index in range(1, count + 1):
+        array = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        array[..., 0] = index * 10
+        Image.fromarray(array).save(os.path.join(directory, f"view_{index}.{suffix}"))
+
+
+def levels(images):
+    return [round(float(level) * 255) for level in images[:, 0, 0, 0]]
+
+
+def test_directory_natural_order_and_pattern(tmp_path):
+    write_views(tmp_path, 11)
+    (tmp_path / "notes.txt").write_text("ignored")
+    images = load_views(str(tmp_path), prefetch=2)
+    assert images.shape == (11, 24, 32, 3)
+    assert images.dtype == torch.float32
+    assert levels(images) == [index * 10 for index in range(1, 12)]
+    assert levels(load_views(str(tmp_path), "view_1.png;view_1?.png")) == [10, 100, 110]
+
+
+@pytest.mark.parametrize("archive", ["zip", "tar"])
+def test_archives(tmp_path, archive):
+    write_views(tmp_path / "views", 3)
+    path = tmp_path / f"views.{archive}"
+    names = ["view_3.png", "view_1.png", "view_2.png"]
+    if archive == "zip":
+        with zipfile.ZipFile(path, "w") as f:
+            for name in names:
+                f.write(tmp_path / "views" / name, f"set/{name}")
+    else:
+        with tarfile.open(path, "w") as f:
+            for name in names:
+                f.add(tmp_path / "views" / name, f"set/{name}")
+    assert levels(load_views(str(path))) == [10, 20, 30]
+
+
+def test_max_size_and_mixed_sizes(tmp_path):
+    write_views(tmp_path, 2, size=(400, 200), suffix="jpg")
+    images = load_views(str(tmp_path), max_size=100)
+    assert images.shape == (2, 50, 100, 3)
+
+    Image.new("RGB", (40, 40)).save(tmp_path / "view_3.png")
+    assert load_views(str(tmp_path)).shape == (3, 200, 400, 3)
+
+
+def test_alpha_is_kept_and_channels_unified(tmp_path):
+    write_views(tmp_path, 2)
+    rgba = np.zeros((24, 32, 4), dtype=np.uint8)
+    rgba[..., 0] = 30
+    rgba[:, :16, 3] = 255
+    Image.fromarray(rgba).save(tmp_path / "view_3.png")
+    images = load_views(str(tmp_path))
+    # 有一张带透明通道时全部为 RGBA，原本没有透明通道的视角不透明
+    assert images.shape == (3, 24, 32, 4)
+    assert levels(images) == [10, 20, 30]
+    assert torch.equal(images[:2, ..., 3], torch.ones(2, 24, 32))
+    assert torch.equal(images[2, ..., 3], torch.from_numpy(rgba[..., 3]).float() / 255)
+
+    # 全部带透明通道时直接写入批量；调色板透明色也算透明通道
+    os.remove(tmp_path / "view_1.png")
+    os.remove(tmp_path / "view_2.png")
+    Image.fromarray(rgba).convert("RGB").convert("P").save(tmp_path / "view_4.png", transparency=0)
+    images = load_views(str(tmp_path))
+    assert images.shape == (2, 24, 32, 4)
+    assert torch.equal(images[0], torch.from_numpy(rgba).float() / 255)
+
+
+def test_node_reads_saved_bundle(folder_paths):
+    views = torch.rand(5, 16, 20, 3)
+    path = nodes.SaveMultiView3D().save_html(
+        MultiViewImages(views), "carousel", 1.0, True, "bundle_test", image_format="png", export_mode="bundle"
+    )[0]
+    bundle = os.path.relpath(path, folder_paths.get_output_directory())
+
+    loader = nodes.LoadMultiViewImages()
+    (loaded,) = loader.load_images(bundle)
+    assert torch.equal(loaded.images, torch.from_numpy(tensors_to_uint8(views)).float() / 255)
+    fingerprint = loader.IS_CHANGED(bundle)
+    assert fingerprint and fingerprint == loader.IS_CHANGED(bundle)
+
+    # 文件内容被改动时校验失败
+    image_path = os.path.join(os.path.dirname(path), sorted(
+        name for name in os.listdir(os.path.dirname(path)) if name.endswith(".png")
+    )[0])
+    Image.new("RGB", (20, 16)).save(image_path)
+    with pytest.raises(ValueError):
+        loader.load_images(bundle)
+
+
+@pytest.mark.parametrize("export_mode", ["single_file", "shared_folder"])
+def test_node_reads_saved_html_only(folder_paths, export_mode):
+    output_dir = folder_paths.get_output_directory()
+    os.makedirs(output_dir, exist_ok=True)
+    # 输出目录中其他节点保存的图片不能被当作视角读入
+    Image.new("RGB", (64, 64)).save(os.path.join(output_dir, "ComfyUI_00001_.png"))
+
+    views = torch.rand(3, 16, 20, 3)
+    path = nodes.SaveMultiView3D().save_html(
+        MultiViewImages(views), "carousel", 1.0, True, "html_test", export_mode=export_mode
+    )[0]
+    html = os.path.relpath(path, output_dir)
+
+    loader = nodes.LoadMultiViewImages()
+    (loaded,) = loader.load_images(html)
+    assert torch.equal(loaded.images, torch.from_numpy(tensors_to_uint8(views)).float() / 255)
+    assert loader.IS_CHANGED(html) == loader.IS_CHANGED(html)
+
+
+def test_single_file_checksum(folder_paths):
+    path = nodes.SaveMultiView3D().save_html(
+        MultiViewImages(torch.rand(2, 8, 8, 3)), "carousel", 1.0, True, "tampered", export_mode="single_file"
+    )[0]
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    # 换掉第一张内嵌图片，内嵌清单中的 sha256 不再匹配
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, format="PNG")
+    start = html.index("data:image/png;base64,", html.rindex("const imagePaths = "))
+    end = html.index('"', start)
+    html = html[:start] + "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode() + html[end:]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    with pytest.raises(ValueError, match="校验失败"):
+        load_views(path)
@@ -0,0 +1,88 @@
+"""
+测试 3D 预览视角的内存存储和 /multiview3d/view 路由
+"""
+
+import asyncio
+import os
+
+import pytest
+import torch
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from multiview3d_plugin import nodes, routes
+from multiview3d_plugin.multi_view import MultiViewImages
+from multiview3d_plugin.view_store import VIEW_STORE, MemoryViewStore
+
+
+@pytest.fixture
+def memory_previews(monkeypatch, folder_paths):
+    # 测试中没有 PromptServer，直接开启内存模式
+    monkeypatch.setattr(nodes, "_memory_previews", lambda nbytes: True)
+    VIEW_STORE.clear()
+    yield folder_paths
+    VIEW_STORE.clear()
+
+
+def test_store_evicts_least_recently_used():
+    store = MemoryViewStore(max_bytes=10)
+    store.put("a", b"1234", "image/png")
+    store.put("b", b"1234", "image/png")
+    store.get("a")
+    store.put("c", b"1234", "image/png")
+    assert store.get("b") is None
+    assert store.get("a")["data"] == b"1234" and store.get("c") is not None
+    assert store.total_bytes == 8
+
+    # 超过预算的单个视角也会保留到下一次放入
+    store.put("big", b"x" * 100, "image/png")
+    assert len(store) == 1 and store.get("big") is not None
+
+
+def test_preview_serves_views_from_memory(memory_previews):
+    views = torch.rand(4, 16, 16, 3)
+    views[3] = views[0]
+    result = nodes.MultiView3DPreview().preview_3d(
+        MultiViewImages(views), "carousel", 1.0, True, preview_format="jpeg", unique_id="7",
+    )
+    ui = result["ui"]
+    assert "images" not in ui
+    ids = [view["view_id"] for view in ui["views"]]
+    assert ids[3] == ids[0] and len(set(ids)) == 3
+    assert ui["cache_misses"] == [4] and ui["bytes_written"][0] > 0
+    # 预览没有写任何临时文件
+    assert os.listdir(memory_previews.get_temp_directory()) == []
+
+    again = nodes.MultiView3DPreview().preview_3d(
+        MultiViewImages(views), "carousel", 1.0, True, preview_format="jpeg", unique_id="7",
+    )["ui"]
+    assert again["views"] == ui["views"] and again["cache_hits"] == [4]
+
+    async def fetch():
+        table = web.RouteTableDef()
+        routes.register_routes(table)
+        app = web.Application()
+        app.add_routes(table)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get(f"/multiview3d/view/{ids[0]}")
+            body = await response.read()
+            revalidated = await client.get(f"/multiview3d/view/{ids[0]}",
+                                           headers={"If-None-Match": response.headers["ETag"]})
+            missing = await client.get("/multiview3d/view/unknown")
+            return response, body, revalidated.status, missing.status
+
+    response, body, revalidated_status, missing_status = asyncio.run(fetch())
+    assert response.status == 200
+    assert response.headers["Content-Type"] == "image/jpeg"
+    assert response.headers["ETag"] == f'"{ids[0]}"'
+    assert "immutable" in response.headers["Cache-Control"]
+    assert body == VIEW_STORE.get(ids[0])["data"] and body[:2] == b"\xff\xd8"
+    assert revalidated_status == 304
+    assert missing_status == 404
+
+
+def test_preview_falls_back_to_temp_files_outside_comfyui(folder_paths):
+    result = nodes.MultiView3DPreview().preview_3d(
+        MultiViewImages(torch.rand(2, 16, 16, 3)), "carousel", 1.0, True, preview_format="jpeg",
+    )
+    assert [image["type"] for image in result["ui"]["images"]] == ["temp", "temp"]
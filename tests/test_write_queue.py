@@ -0,0 +1,93 @@
+"""
+测试后台写入队列：顺序、失败报告、内存预算背压，以及 SaveMultiView3D 的后台写入
+"""
+
+import json
+import os
+import threading
+
+import pytest
+import torch
+
+from multiview3d_plugin import nodes
+from multiview3d_plugin.multi_view import MultiViewImages
+from multiview3d_plugin.write_queue import WriteQueue
+
+
+def test_jobs_run_in_submission_order():
+    queue = WriteQueue(max_bytes=1 << 20)
+    done = []
+    futures = [queue.submit(lambda index=index: done.append(index) or index, nbytes=10) for index in range(20)]
+    assert queue.flush(timeout=10)
+    assert done == list(range(20))
+    assert [future.result() for future in futures] == list(range(20))
+    assert queue.pending() == 0 and queue.pending_bytes == 0
+
+
+def test_failure_is_reported_and_later_jobs_still_run():
+    reported = []
+    queue = WriteQueue(max_bytes=1 << 20, on_failure=lambda description, error: reported.append((description, error)))
+
+    def fail():
+        raise OSError("disk full")
+
+    failed = queue.submit(fail, description="a.html")
+    ok = queue.submit(lambda: "b.html", description="b.html")
+    assert queue.flush(timeout=10)
+    assert isinstance(failed.exception(), OSError)
+    assert ok.result() == "b.html"
+    assert [description for description, _ in reported] == ["a.html"]
+    assert [description for description, _ in queue.failures()] == ["a.html"]
+
+
+def test_submit_blocks_when_over_budget():
+    queue = WriteQueue(max_bytes=100)
+    release = threading.Event()
+    queue.submit(release.wait, nbytes=60)
+
+    submitted = threading.Event()
+    thread = threading.Thread(target=lambda: (queue.submit(lambda: None, nbytes=60), submitted.set()))
+    thread.start()
+    # 第一个任务还没写完，再排 60 字节会超出预算
+    assert not submitted.wait(0.2)
+    assert queue.pending_bytes == 60
+
+    release.set()
+    assert submitted.wait(10)
+    thread.join()
+    assert queue.flush(timeout=10)
+
+    # 队列为空时超出预算的单个任务也会被接受
+    assert queue.submit(lambda: "big", nbytes=1000).result(timeout=10) == "big"
+
+
+@pytest.mark.parametrize("export_mode", ["bundle", "single_file"])
+def test_background_save_returns_path_and_snapshots_views(folder_paths, export_mode):
+    images = torch.full((3, 16, 16, 3), 50, dtype=torch.uint8)
+    release = threading.Event()
+    # 先让队列忙着，节点返回时文件一定还没写
+    nodes.WRITE_QUEUE.submit(release.wait)
+    try:
+        html_path, = nodes.SaveMultiView3D().save_html(
+            MultiViewImages(images), "carousel", 1.0, True, "async", export_mode=export_mode, background_write=True,
+        )
+        if export_mode == "bundle":
+            assert not os.path.exists(os.path.join(os.path.dirname(html_path), "manifest.json"))
+        # 上游在节点返回后改写输入，不影响导出的内容
+        images.fill_(200)
+    finally:
+        release.set()
+    assert nodes.WRITE_QUEUE.flush(timeout=30)
+
+    if export_mode == "bundle":
+        with open(os.path.join(os.path.dirname(html_path), "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        synchronous, = nodes.SaveMultiView3D().save_html(
+            MultiViewImages(torch.full((3, 16, 16, 3), 50, dtype=torch.uint8)), "carousel", 1.0, True, "async",
+        )
+        with open(os.path.join(os.path.dirname(synchronous), "manifest.json"), encoding="utf-8") as f:
+            expected = json.load(f)
+        assert [view["sha256"] for view in manifest["views"]] == [view["sha256"] for view in expected["views"]]
+    else:
+        with open(html_path, encoding="utf-8") as f:
+            assert "data:image/png;base64," in f.read()
@@ -0,0 +1,130 @@
+"""
+TEXT_LIST 数据类型：文本列表节点之间按引用传递的列表
+
+旧版本的文本列表节点之间传递 JSON 字符串，每经过一个节点都要 json.loads 再 json.dumps。
+现在列表本身沿 TEXT_LIST 连线传递，下游节点不再解析 JSON；需要字符串时由 TextListToString
+在链的末端序列化一次。
+"""
+
+import itertools
+import json
+import threading
+import uuid
+from collections import OrderedDict
+
+
+class TextList(tuple):
+    """不可变的文本列表；下游节点共享同一个对象，不能原地修改"""
+
+    def to_json(self):
+        """JSON 字符串（第一次调用时生成并缓存）"""
+        cached = self.__dict__.get("_json")
+        if cached is None:
+            cached = self.__dict__["_json"] = json.dumps(self, ensure_ascii=False)
+        return cached
+
+
+def parse_text_list(value):
+    """把输入统一为 TextList
+
+    TextList 原样返回；list/tuple 转换为 TextList；字符串按旧格式解析：
+    JSON 列表取其元素，其他 JSON 值作为一项，不是 JSON 时按逗号分割。
+    """
+    if isinstance(value, TextList):
+        return value
+    if isinstance(value, (list, tuple)):
+        return TextList(value)
+    if not isinstance(value, str):
+        return TextList((str(value),))
+
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError:
+        if ',' in value:
+            return TextList(item.strip() for item in value.split(','))
+        return TextList((value,))
+    if isinstance(parsed, list):
+        return TextList(parsed)
+    return TextList((str(parsed),))
+
+
+def merge_text_lists(lists):
+    """按顺序拼接多个 TextList；只有一个时直接返回它，不复制"""
+    lists = [items for items in lists if items is not None]
+    if len(lists) == 1:
+        return lists[0]
+    return TextList(itertools.chain.from_iterable(lists))
+
+
+# 分页显示：界面上只发送摘要和第一页，其余页由前端按需请求（/multiview3d/text_list/{list_id}）
+TEXT_DISPLAY_MODES = ["paged", "full"]
+MAX_PAGE_SIZE = 1000
+# 摘要中每一项最多显示的字符数，避免个别超长项撑大消息
+SUMMARY_ITEM_CHARS = 500
+# 服务器只保留最近显示过的若干个列表
+MAX_STORED_LISTS = 32
+
+
+class TextListStore:
+    """按 id 保存最近显示过的文本列表（只保存引用，不复制）"""
+
+    def __init__(self, max_lists=MAX_STORED_LISTS):
+        self.max_lists = max_lists
+        self._lists = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, items):
+        list_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._lists[list_id] = items
+            while len(self._lists) > self.max_lists:
+                self._lists.popitem(last=False)
+        return list_id
+
+    def get(self, list_id):
+        with self._lock:
+            items = self._lists.get(list_id)
+            if items is not None:
+                self._lists.move_to_end(list_id)
+            return items
+
+
+TEXT_LIST_STORE = TextListStore()
+
+
+def _clip(item, limit=SUMMARY_ITEM_CHARS):
+    text = item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def text_list_page(items, page, page_size):
+    """取第 page 页（从 0 开始，超出范围时取最后一页）"""
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    pages = max(1, -(-len(items) // page_size))
+    page = max(0, min(int(page), pages - 1))
+    start = page * page_size
+    return {
+        "page": page,
+        "pages": pages,
+        "page_size": page_size,
+        "count": len(items),
+        "start": start,
+        "items": list(items[start:start + page_size]),
+    }
+
+
+def summarize_text_list(items, page_size, list_id):
+    """分页显示的摘要：项数、UTF-8 字节数、开头一页和最后几项；大小与列表长度无关"""
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    head = items[:page_size]
+    tail = items[max(page_size, len(items) - page_size):]
+    return {
+        "list_id": list_id,
+        "count": len(items),
+        "bytes": sum(len(str(item).encode("utf-8")) for item in items),
+        "page_size": page_size,
+        "pages": max(1, -(-len(items) // page_size)),
+        "head": [_clip(item) for item in head],
+        "tail": [_clip(item) for item in tail],
+        "tail_start": len(items) - len(tail),
+    }
@@ -0,0 +1,72 @@
+"""
+插件使用的 three.js 固定版本及本地副本
+
+本地副本 vendor/three.min.js 随插件一起提交（不放在 web 目录下，避免被 ComfyUI 当作扩展在启动时加载），
+预览和导出都只使用这份副本，离线可用。
+重新下载本地副本: python threejs.py
+"""
+
+import base64
+import hashlib
+import os
+import urllib.request
+
+THREEJS_VERSION = "r129"
+THREEJS_CDN_URL = f"https://cdnjs.cloudflare.com/ajax/libs/three.js/{THREEJS_VERSION}/three.min.js"
+# 本地副本的 sha512（SRI 格式）；下载的内容不一致时拒绝写入
+THREEJS_SHA512 = "GhsIxJNJ8uvkaVE3UbDIoEJCY1CpSTT/yPrg6RInnQLnQKXTuQlZpYMurLisriAsFsl6gEHr1UlqP6CmQrXQ6Q=="
+THREEJS_FILENAME = "three.min.js"
+THREEJS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor", THREEJS_FILENAME)
+
+_source = None
+
+
+def load_threejs_source():
+    """读取本地的 three.js 源码（只读一次），本地副本缺失时抛出 FileNotFoundError"""
+    global _source
+    if _source is None:
+        if not os.path.isfile(THREEJS_PATH):
+            raise FileNotFoundError(
+                f"插件安装不完整，缺少本地 three.js ({THREEJS_PATH})；请重新安装插件或在插件目录执行 python threejs.py"
+            )
+        with open(THREEJS_PATH, "r", encoding="utf-8") as f:
+            _source = f.read()
+    return _source
+
+
+def threejs_script_tag(inline=False):
+    """生成 HTML 中加载 three.js 的 script 标签，导出的页面不依赖 CDN
+
+    inline 时把本地副本直接嵌入页面；否则引用与 HTML 同目录的 three.min.js，
+    由调用方用 load_threejs_source() 的内容写入该文件。
+    """
+    source = load_threejs_source()
+    if not inline:
+        return f'<script src="{THREEJS_FILENAME}"></script>'
+    # 避免源码中的 "</script" 提前结束标签
+    return "<script>" + source.replace("</script", "<\\/script") + "</script>"
+
+
+def verify_threejs(data):
+    """检查内容是否为固定版本的 three.js，不一致时抛出 ValueError"""
+    digest = base64.b64encode(hashlib.sha512(data).digest()).decode("ascii")
+    if digest != THREEJS_SHA512:
+        raise ValueError(f"three.js {THREEJS_VERSION} 校验失败: sha512-{digest}，应为 sha512-{THREEJS_SHA512}")
+
+
+def fetch_threejs():
+    """从 CDN 下载固定版本的 three.js 到 vendor 目录，校验通过后才替换本地副本"""
+    with urllib.request.urlopen(THREEJS_CDN_URL, timeout=60) as response:
+        data = response.read()
+    verify_threejs(data)
+    os.makedirs(os.path.dirname(THREEJS_PATH), exist_ok=True)
+    tmp_path = THREEJS_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, THREEJS_PATH)
+    return THREEJS_PATH
+
+
+if __name__ == "__main__":
+    path = fetch_threejs()
+    print(f"three.js {THREEJS_VERSION} -> {path}")
@@ -0,0 +1,250 @@
+"""
+转台动画导出：把多视角图片逐帧编码为动画 WebP/GIF/MP4
+
+帧按需从批量张量生成，任意时刻内存中只有相邻的两个视角和当前一帧，
+峰值内存与视角数量和帧数无关。
+"""
+
+import io
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from .export import atomic_path
+from .image_utils import resize_views, tensors_to_uint8
+
+# MP4 需要本地的 ffmpeg（环境变量 MULTIVIEW_FFMPEG 可指定路径）
+FFMPEG_PATH = os.environ.get("MULTIVIEW_FFMPEG") or shutil.which("ffmpeg")
+
+TURNTABLE_FORMATS = ["webp", "gif"] + (["mp4"] if FFMPEG_PATH else [])
+
+# 相邻视角之间的过渡：blend 线性混合，none 保持上一视角
+INTERPOLATION_MODES = ["blend", "none"]
+
+FORMAT_EXTENSIONS = {"webp": ".webp", "gif": ".gif", "mp4": ".mp4"}
+
+
+class TurntableFrames:
+    """按需生成转台动画的每一帧
+
+    - images: [batch, height, width, channels] 张量，按播放顺序排列
+    - inbetween_frames: 相邻视角之间插入的帧数
+    - loop: 最后一个视角之后是否过渡回第一个视角
+    - max_size: 限制帧的长边（0 表示原尺寸）
+    """
+
+    def __init__(self, images, inbetween_frames=0, interpolation="blend", loop=True, max_size=0):
+        self.images = images
+        self.view_count = images.shape[0]
+        self.step = inbetween_frames + 1
+        self.interpolation = interpolation
+        self.loop = loop and self.view_count > 1
+        self.max_size = max_size
+        # 只缓存最近用到的两个视角
+        self._views = OrderedDict()
+
+    def __len__(self):
+        if self.view_count == 1:
+            return 1
+        if self.loop:
+            return self.view_count * self.step
+        return (self.view_count - 1) * self.step + 1
+
+    def _view(self, index):
+        view = self._views.get(index)
+        if view is None:
+            view = tensors_to_uint8(resize_views(self.images[index:index + 1], self.max_size))[0]
+            self._views[index] = view
+            if len(self._views) > 2:
+                self._views.popitem(last=False)
+        else:
+            self._views.move_to_end(index)
+        return view
+
+    def frame(self, index):
+        """返回第 index 帧的 [height, width, channels] uint8 数组"""
+        view_index, offset = divmod(index, self.step)
+        current = self._view(view_index % self.view_count)
+        if offset == 0 or self.interpolation == "none":
+            return current
+
+        following = self._view((view_index + 1) % self.view_count)
+        t = offset / self.step
+        blended = current.astype(np.float32)
+        blended *= 1.0 - t
+        blended += following.astype(np.float32) * t
+        return np.rint(blended).astype(np.uint8)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.frame(index)
+
+
+def _to_image(frame, mode=None):
+    """uint8 帧转换为 PIL 图片；mode 为 RGB 时去掉透明通道"""
+    if frame.shape[2] == 1:
+        frame = frame[..., 0]
+    image = Image.fromarray(frame)
+    if mode is not None and image.mode != mode:
+        image = image.convert(mode)
+    return image
+
+
+# PIL 的 save_all 会把所有帧留在内存中（WebP 先把 append_images 转成列表，GIF 要比较相邻帧），
+# 这里每帧单独用 Image.save 编码，再按 WebP / GIF 的容器格式把各帧拼成动画，内存中只有当前一帧
+
+def _riff_chunk(fourcc, payload):
+    """RIFF 块：FourCC + 小端长度 + 数据（奇数长度补一个字节）"""
+    return fourcc + struct.pack("<I", len(payload)) + payload + b"\0" * (len(payload) & 1)
+
+
+def _webp_frame_chunks(data):
+    """从单帧 WebP 文件中取出图像数据块（ALPH 和 VP8/VP8L），按原顺序拼接"""
+    chunks = []
+    offset = 12
+    while offset + 8 <= len(data):
+        fourcc = data[offset:offset + 4]
+        size = struct.unpack_from("<I", data, offset + 4)[0]
+        if fourcc in (b"ALPH", b"VP8 ", b"VP8L"):
+            chunks.append(_riff_chunk(fourcc, data[offset + 8:offset + 8 + size]))
+        offset += 8 + size + (size & 1)
+    return b"".join(chunks)
+
+
+def _uint24(value):
+    return value.to_bytes(3, "little")
+
+
+def _write_webp(frames, path, duration, quality):
+    """逐帧编码为有损 WebP，每帧作为一个完整的 ANMF 帧写入动画（不与前一帧混合）"""
+    with open(path, "wb") as f:
+        # RIFF 的总长度最后回填
+        f.write(b"RIFF\0\0\0\0WEBP")
+        for index, frame in enumerate(frames):
+            image = _to_image(frame)
+            buffer = io.BytesIO()
+            image.save(buffer, format="WEBP", quality=quality, method=4)
+            width, height = image.size
+            if index == 0:
+                # VP8X：动画标志，帧带透明通道时加上透明标志；ANIM：透明背景，无限循环
+                flags = 0x02 | (0x10 if image.mode in ("RGBA", "LA") else 0)
+                f.write(_riff_chunk(b"VP8X", bytes([flags, 0, 0, 0]) + _uint24(width - 1) + _uint24(height - 1)))
+                f.write(_riff_chunk(b"ANIM", bytes(4) + struct.pack("<H", 0)))
+            # 帧位置 (0, 0)、尺寸、时长，0x02 表示直接覆盖而不是与上一帧混合
+            header = _uint24(0) + _uint24(0) + _uint24(width - 1) + _uint24(height - 1) + _uint24(duration) + b"\x02"
+            f.write(_riff_chunk(b"ANMF", header + _webp_frame_chunks(buffer.getvalue())))
+        riff_size = f.tell() - 8
+        f.seek(4)
+        f.write(struct.pack("<I", riff_size))
+
+
+def _skip_gif_sub_blocks(data, offset):
+    """跳过以长度 0 结束的一串数据子块，返回其后的位置"""
+    while data[offset]:
+        offset += data[offset] + 1
+    return offset + 1
+
+
+def _gif_frame(data):
+    """从单帧 GIF 文件中取出 (调色板, 图像描述符, LZW 图像数据)"""
+    screen_flags = data[10]
+    offset = 13
+    palette = b""
+    if screen_flags & 0x80:
+        size = 3 << ((screen_flags & 0x07) + 1)
+        palette = data[offset:offset + size]
+        offset += size
+    # 跳过图像之前的扩展块
+    while data[offset] == 0x21:
+        offset = _skip_gif_sub_blocks(data, offset + 2)
+    if data[offset] != 0x2C:
+        raise ValueError("无法解析 GIF 帧")
+    descriptor = bytearray(data[offset:offset + 10])
+    offset += 10
+    if descriptor[9] & 0x80:
+        size = 3 << ((descriptor[9] & 0x07) + 1)
+        palette = data[offset:offset + size]
+        offset += size
+    # LZW 最小码长 1 个字节，之后是图像数据子块
+    end = _skip_gif_sub_blocks(data, offset + 1)
+    return palette, descriptor, data[offset:end]
+
+
+def _write_gif(frames, path, duration):
+    """逐帧写 GIF：每帧使用自己的调色板（作为局部调色板写入）"""
+    delay = int(duration / 10)
+    with open(path, "wb") as f:
+        for index, frame in enumerate(frames):
+            image = _to_image(frame, "RGB").quantize(256)
+            buffer = io.BytesIO()
+            image.save(buffer, format="GIF")
+            palette, descriptor, image_data = _gif_frame(buffer.getvalue())
+            if index == 0:
+                # 逻辑屏幕（不用全局调色板）和无限循环的 NETSCAPE 扩展
+                f.write(b"GIF89a" + struct.pack("<HHBBB", image.width, image.height, 0x70, 0, 0))
+                f.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", 0) + b"\x00")
+            # 图形控制扩展：帧时长（1/100 秒），显示后不清除
+            f.write(b"\x21\xf9\x04\x04" + struct.pack("<H", delay) + b"\x00\x00")
+            # 调色板改为该帧的局部调色板，保留隔行标志
+            descriptor[9] = 0x80 | (descriptor[9] & 0x40) | ((len(palette) // 3).bit_length() - 2)
+            f.write(bytes(descriptor) + palette + image_data)
+        f.write(b";")
+
+
+def _to_rgb(frame):
+    channels = frame.shape[2]
+    if channels == 3:
+        return frame
+    if channels == 4:
+        return frame[..., :3]
+    return np.repeat(frame[..., :1], 3, axis=2)
+
+
+def _write_mp4(frames, path, fps, quality):
+    """通过管道把原始 RGB 帧交给 ffmpeg 编码为 H.264"""
+    height, width = frames.frame(0).shape[:2]
+    crf = round(40 - quality * 0.24)
+    command = [
+        FFMPEG_PATH, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        # yuv420p 要求宽高为偶数
+        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", str(crf),
+        "-movflags", "+faststart", "-f", "mp4", path,
+    ]
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=stderr)
+        try:
+            for frame in frames:
+                process.stdin.write(np.ascontiguousarray(_to_rgb(frame)).tobytes())
+        except BrokenPipeError:
+            pass
+        finally:
+            process.stdin.close()
+        if process.wait() != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"ffmpeg 编码失败: {stderr.read().decode(errors='replace').strip()}")
+
+
+def write_turntable(frames, path, video_format, fps, quality=90):
+    """把帧源编码到 path；先写临时文件再重命名，读者不会看到写了一半的文件"""
+    if video_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"不支持的动画格式: {video_format}")
+    if video_format == "mp4" and FFMPEG_PATH is None:
+        raise RuntimeError("导出 MP4 需要 ffmpeg，请安装 ffmpeg 或设置 MULTIVIEW_FFMPEG")
+
+    duration = max(1, round(1000 / fps))
+    with atomic_path(path) as tmp_path:
+        if video_format == "webp":
+            _write_webp(frames, tmp_path, duration, quality)
+        elif video_format == "gif":
+            _write_gif(frames, tmp_path, duration)
+        else:
+            _write_mp4(frames, tmp_path, fps, quality)
+    return path
@@ -0,0 +1,102 @@
+"""
+已编码视角的内容寻址缓存
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .encoding import get_encode_pool
+
+
+def hash_view(img_np):
+    """计算单张视角像素数据的快速摘要（blake2b 处理大块数据时会释放 GIL）"""
+    img_np = np.ascontiguousarray(img_np)
+    return hashlib.blake2b(memoryview(img_np).cast("B"), digest_size=16).hexdigest()
+
+
+def hash_views(views_np):
+    """并行计算所有视角的摘要，顺序与输入一致"""
+    if len(views_np) <= 1:
+        return [hash_view(img_np) for img_np in views_np]
+    return list(get_encode_pool().map(hash_view, views_np))
+
+
+def make_key(digest, img_np, save_options):
+    """缓存键：像素摘要 + 形状 + 编码参数"""
+    return (digest, tuple(img_np.shape), tuple(sorted(save_options.items())))
+
+
+class ViewCache:
+    """编码结果的 LRU 缓存
+
+    键由 make_key 生成，值记录已写入磁盘的文件（filename/subfolder/type/path/size）。
+    条目数和文件总字节数超过上限时淘汰最久未使用的条目；
+    文件已被删除的条目在查询时视为未命中并移除。
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=2 * 1024 ** 3):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """查询缓存，命中时返回条目并标记为最近使用"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not os.path.exists(entry["path"]):
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        """写入条目，并按上限淘汰旧条目"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.total_bytes += entry["size"]
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry["size"]
+
+    def clear(self):
+        """清空缓存和计数"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """返回命中/未命中计数和当前占用"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+            }
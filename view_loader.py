@@ -0,0 +1,305 @@
+"""
+从磁盘读取多视角图片：目录、zip/tar 压缩包或 SaveMultiView3D 导出的目录和 HTML
+
+文件按顺序读取，解码在共享线程池中并行进行；已提交但未取走的解码结果不超过 prefetch 个，
+内存中只保留有限的几张解码后的图片。
+"""
+
+import base64
+import binascii
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import zipfile
+from collections import deque
+
+import numpy as np
+import torch
+from PIL import Image, ImageOps
+
+from .encoding import get_encode_pool
+from .export import MANIFEST_NAME
+from .instrumentation import current_profile, stage, timed
+from .image_utils import normalize_views, preview_size
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff")
+
+
+def _natural_key(name):
+    """view_2 排在 view_10 之前"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+
+def _select(names, pattern):
+    """按通配符（可用 ; 分隔多个）和图片扩展名筛选并自然排序"""
+    patterns = [p.strip() for p in (pattern or "*").split(";") if p.strip()] or ["*"]
+    selected = [
+        name for name in names
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+        and any(fnmatch.fnmatch(os.path.basename(name), p) for p in patterns)
+    ]
+    return sorted(selected, key=_natural_key)
+
+
+def _manifest_order(manifest_bytes):
+    """导出清单中的 (文件名, sha256) 列表；单文件导出的清单没有图片文件，返回 None"""
+    manifest = json.loads(manifest_bytes)
+    views = sorted(manifest.get("views", []), key=lambda view: view["index"])
+    if not views or any(view.get("file") is None for view in views):
+        return None
+    return [(view["file"], view.get("sha256")) for view in views]
+
+
+class _DirectorySource:
+    def __init__(self, path, pattern):
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        entries = None
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, "rb") as f:
+                entries = _manifest_order(f.read())
+        if entries is None:
+            entries = [(name, None) for name in _select(os.listdir(path), pattern)]
+        self.entries = entries
+
+    def read(self, name):
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def close(self):
+        pass
+
+
+class _ZipSource:
+    def __init__(self, path, pattern):
+        self.archive = zipfile.ZipFile(path)
+        names = [info.filename for info in self.archive.infolist() if not info.is_dir()]
+        self.entries = self._entries(names, pattern)
+
+    def _entries(self, names, pattern):
+        manifests = [name for name in names if os.path.basename(name) == MANIFEST_NAME]
+        if manifests:
+            prefix = os.path.dirname(manifests[0])
+            entries = _manifest_order(self.read(manifests[0]))
+            if entries is not None:
+                return [(f"{prefix}/{name}" if prefix else name, digest) for name, digest in entries]
+        return [(name, None) for name in _select(names, pattern)]
+
+    def read(self, name):
+        return self.archive.read(name)
+
+    def close(self):
+        self.archive.close()
+
+
+class _TarSource(_ZipSource):
+    def __init__(self, path, pattern):
+        self.archive = tarfile.open(path)
+        self.members = {member.name: member for member in self.archive.getmembers() if member.isfile()}
+        self.entries = self._entries(list(self.members), pattern)
+
+    def read(self, name):
+        with self.archive.extractfile(self.members[name]) as f:
+            return f.read()
+
+
+class _HtmlSource:
+    """SaveMultiView3D 导出的 HTML：只读取页面引用的视角
+
+    single_file 的视角是页面中的 data URI，校验和来自内嵌的清单；bundle 和 shared_folder
+    引用与 HTML 同目录的图片文件，只读取这些文件，不会扫描整个目录（shared_folder 的目录就是输出目录）。
+    同目录的 manifest.json 属于这个 HTML 时用它校验文件。
+    """
+
+    def __init__(self, path, pattern=None):
+        self.directory = os.path.dirname(os.path.abspath(path))
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+
+        image_paths = _html_json(html, "const imagePaths = ")
+        if not isinstance(image_paths, list):
+            raise ValueError(f"不是 SaveMultiView3D 导出的 HTML: {path}")
+        digests = self._digests(html, os.path.basename(path), len(image_paths))
+
+        self.embedded = {}
+        self.files = []
+        self.entries = []
+        for index, (image_path, digest) in enumerate(zip(image_paths, digests)):
+            if image_path.startswith("data:"):
+                name = f"view_{index:02d} (data URI)"
+                self.embedded[name] = _decode_data_uri(image_path)
+            else:
+                name = image_path
+                normalized = os.path.normpath(image_path)
+                if os.path.isabs(normalized) or normalized.startswith(os.pardir) or ":" in image_path:
+                    raise ValueError(f"HTML 引用了目录之外的图片: {image_path}")
+                self.files.append(os.path.join(self.directory, normalized))
+            self.entries.append((name, digest))
+
+    def _digests(self, html, html_name, count):
+        """内嵌清单或同目录清单中的 sha256；没有清单时不校验"""
+        embedded = re.search(r'<script type="application/json" id="manifest">(.*?)</script>', html, re.S)
+        manifest = None
+        if embedded is not None:
+            manifest = json.loads(embedded.group(1).replace("<\\/", "</"))
+        else:
+            manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+            if os.path.isfile(manifest_path):
+                with open(manifest_path, "rb") as f:
+                    manifest = json.loads(f.read())
+                if manifest.get("html") != html_name:
+                    manifest = None
+        views = sorted((manifest or {}).get("views", []), key=lambda view: view["index"])
+        if len(views) != count:
+            return [None] * count
+        return [view.get("sha256") for view in views]
+
+    def read(self, name):
+        data = self.embedded.get(name)
+        if data is not None:
+            return data
+        with open(os.path.join(self.directory, os.path.normpath(name)), "rb") as f:
+            return f.read()
+
+    def close(self):
+        pass
+
+
+def _html_json(html, prefix):
+    """页面脚本中 prefix 之后的 JSON 值（取最后一处，内联的 three.js 在前面）"""
+    start = html.rfind(prefix)
+    if start < 0:
+        return None
+    try:
+        value, _ = json.JSONDecoder().raw_decode(html, start + len(prefix))
+    except json.JSONDecodeError:
+        return None
+    return value
+
+
+def _decode_data_uri(uri):
+    header, _, payload = uri.partition(",")
+    if not header.endswith(";base64"):
+        raise ValueError("只支持 base64 编码的 data URI")
+    try:
+        return base64.b64decode(payload, validate=True)
+    except binascii.Error:
+        raise ValueError("data URI 中的图片数据无效")
+
+
+def _is_html(path):
+    return os.path.isfile(path) and path.lower().endswith(".html")
+
+
+def open_view_source(path, pattern="*"):
+    """根据路径类型打开视角来源"""
+    if _is_html(path):
+        return _HtmlSource(path, pattern)
+    if os.path.isdir(path):
+        return _DirectorySource(path, pattern)
+    if zipfile.is_zipfile(path):
+        return _ZipSource(path, pattern)
+    if tarfile.is_tarfile(path):
+        return _TarSource(path, pattern)
+    raise ValueError(f"无法读取多视角图片: {path}（需要目录、zip/tar 压缩包或导出的 HTML）")
+
+
+def _decode_timed(data, max_size, profile):
+    with timed(profile, "decode"):
+        return decode_view(data, max_size)
+
+
+def decode_view(data, max_size=0):
+    """解码一张图片为 uint8 数组；max_size 大于 0 时限制长边
+
+    带透明通道（或调色板透明色）的图片解码为 RGBA，其余为 RGB。
+    JPEG 通过 draft 直接按 1/2、1/4、1/8 缩小解码，跳过全分辨率解码。
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+        target_h, target_w = preview_size(height, width, max_size)
+        if (target_w, target_h) != (width, height):
+            image.draft("RGB", (target_w, target_h))
+        mode = "RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB"
+        image = ImageOps.exif_transpose(image).convert(mode)
+        if max_size > 0:
+            target_h, target_w = preview_size(image.height, image.width, max_size)
+            if (target_w, target_h) != image.size:
+                image = image.resize((target_w, target_h), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        return np.array(image)
+
+
+def load_views(path, pattern="*", max_size=0, prefetch=8):
+    """读取并解码所有视角，返回 [batch, height, width, channels] 的 float32 张量
+
+    尺寸和通道数一致时解码结果直接写入预先分配的批量；不一致时按 fit 方式统一（与多视角图片输入节点相同），
+    任一视角带透明通道时全部统一为 RGBA。
+    导出目录或压缩包中有清单时按清单顺序读取，并校验每个文件的 sha256。
+    """
+    source = open_view_source(path, pattern)
+    try:
+        entries = source.entries
+        if not entries:
+            raise ValueError(f"没有找到图片: {path}")
+
+        pool = get_encode_pool()
+        profile = current_profile()
+        pending = deque()
+        batch = None
+        views = None
+        for index in range(len(entries) + 1):
+            if index < len(entries):
+                name, digest = entries[index]
+                with stage("read"):
+                    data = source.read(name)
+                if digest is not None and hashlib.sha256(data).hexdigest() != digest:
+                    raise ValueError(f"文件校验失败: {name}")
+                pending.append((index, pool.submit(_decode_timed, data, max_size, profile)))
+                # 限制已读取但尚未取走的图片数
+                if len(pending) < max(1, prefetch):
+                    continue
+
+            # 按顺序取走解码结果（最后一轮取走剩下的全部）
+            while pending and (index == len(entries) or len(pending) >= max(1, prefetch)):
+                done, future = pending.popleft()
+                view = torch.from_numpy(future.result())
+                if batch is None and views is None:
+                    batch = torch.empty((len(entries),) + tuple(view.shape), dtype=torch.float32)
+                if batch is not None and tuple(view.shape) != tuple(batch.shape[1:]):
+                    # 出现不同尺寸或通道数，改为逐张收集
+                    views = [batch[i:i + 1] for i in range(done)]
+                    batch = None
+                if batch is not None:
+                    batch[done].copy_(view).div_(255.0)
+                else:
+                    views.append(view[None].float().div_(255.0))
+    finally:
+        source.close()
+
+    if batch is not None:
+        return batch
+    return normalize_views(views, "fit")
+
+
+def source_fingerprint(path, pattern="*"):
+    """用于判断输入是否变化：路径下匹配文件的修改时间和大小"""
+    if not os.path.exists(path):
+        return ""
+    if _is_html(path):
+        try:
+            files = _HtmlSource(path).files
+        except ValueError:
+            files = []
+        stats = [os.stat(path)] + [os.stat(name) for name in files if os.path.exists(name)]
+    elif os.path.isdir(path):
+        names = _select(os.listdir(path), pattern) + [MANIFEST_NAME]
+        stats = [os.stat(os.path.join(path, name)) for name in names if os.path.exists(os.path.join(path, name))]
+    else:
+        stats = [os.stat(path)]
+    return hashlib.sha256(
+        repr([(stat.st_mtime_ns, stat.st_size) for stat in stats]).encode()
+    ).hexdigest()
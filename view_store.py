@@ -0,0 +1,76 @@
+"""
+预览视角的内存存储：编码结果保存在内存中，由插件路由 /multiview3d/view/{view_id} 提供
+
+3D 预览节点不再把视角写入临时目录再经 ComfyUI 的 /view 读回。view_id 由像素摘要、
+尺寸和编码参数决定，相同的视角总是同一个 id，浏览器可以一直缓存。
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+VIEW_STORE_MB_ENV = "MULTIVIEW_VIEW_STORE_MB"
+
+
+def _default_max_bytes():
+    """内存预算：环境变量 MULTIVIEW_VIEW_STORE_MB，默认 512 MB，设为 0 时预览改回写临时目录"""
+    try:
+        megabytes = float(os.environ.get(VIEW_STORE_MB_ENV, "512"))
+    except ValueError:
+        megabytes = 512
+    return int(max(0, megabytes) * 2**20)
+
+
+def view_id(key):
+    """把 view_cache.make_key 生成的缓存键转换为 URL 中使用的 id"""
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=12).hexdigest()
+
+
+class MemoryViewStore:
+    """已编码视角的 LRU 存储
+
+    总字节数或条目数超过上限时淘汰最久未使用的视角（最近放入的一个总会保留）。
+    被淘汰的视角请求时返回 404，重新运行工作流即可。
+    """
+
+    def __init__(self, max_bytes=None, max_entries=4096):
+        self.max_bytes = _default_max_bytes() if max_bytes is None else max_bytes
+        self.max_entries = max_entries
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, view_id):
+        """返回 {"data", "mime"}，不存在时返回 None；命中时标记为最近使用"""
+        with self._lock:
+            entry = self._entries.get(view_id)
+            if entry is not None:
+                self._entries.move_to_end(view_id)
+            return entry
+
+    def put(self, view_id, data, mime):
+        with self._lock:
+            old = self._entries.pop(view_id, None)
+            if old is not None:
+                self.total_bytes -= len(old["data"])
+            self._entries[view_id] = {"data": data, "mime": mime}
+            self.total_bytes += len(data)
+
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+            ):
+                _, entry = self._entries.popitem(last=False)
+                self.total_bytes -= len(entry["data"])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+# 3D 预览节点与插件路由共享的存储
+VIEW_STORE = MemoryViewStore()
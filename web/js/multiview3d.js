@@ -4,18 +4,442 @@
  */
 
 import { app } from "../../scripts/app.js";
+import { api } from "../../scripts/api.js";
+import { applyLayoutMatrix, buildCanvasAtlas, createInstancedViews } from "./multiview3d_views.js";
+
+// three.js 只在第一次需要时加载一次，所有预览节点共享同一个 Promise。
+// 优先使用插件自带的副本（服务器路由，可长期缓存），没有时退回 CDN。
+const THREEJS_CDN_URL = "https://cdnjs.cloudflare.com/ajax/libs/three.js/r129/three.min.js";
+let threeJSPromise = null;
+
+function loadScript(src) {
+    return new Promise((resolve, reject) => {
+        const script = document.createElement("script");
+        script.src = src;
+        script.async = true;
+        script.onload = resolve;
+        script.onerror = () => {
+            script.remove();
+            reject(new Error(`Failed to load ${src}`));
+        };
+        document.head.appendChild(script);
+    });
+}
+
+function loadThreeJS() {
+    if (typeof THREE !== "undefined") {
+        return Promise.resolve();
+    }
+    if (!threeJSPromise) {
+        threeJSPromise = loadScript(api.apiURL("/multiview3d/three.min.js"))
+            .catch(() => loadScript(THREEJS_CDN_URL))
+            .catch((error) => {
+                // 加载失败时允许下次重试
+                threeJSPromise = null;
+                throw error;
+            });
+    }
+    return threeJSPromise;
+}
+
+// 所有预览节点共用一个 WebGL 渲染器（浏览器能同时存在的 WebGL 上下文有限）。
+// 每个节点在共享画布左下角的视口/裁剪区域中渲染，再复制到节点自己的 2D 画布；
+// 只有场景有变化或正在旋转、并且在屏幕上可见时才渲染，没有需要渲染的节点时循环停止。
+// 节点重新执行时先移除旧预览再添加新预览，渲染器要等一段时间没有任何预览后才释放，
+// 否则每次运行都会销毁并重建 WebGL 上下文。
+const FRAME_STATS_SIZE = 120;
+const RENDERER_IDLE_MS = 30000;
+
+class PreviewManager {
+    constructor() {
+        this.renderer = null;
+        this.previews = new Set();
+        this.frameId = null;
+        this.releaseTimer = null;
+        this.frameTimes = [];
+        this.frameCount = 0;
+        this.renderCount = 0;
+    }
+    
+    getRenderer(width, height) {
+        if (!this.renderer) {
+            this.renderer = new THREE.WebGLRenderer({ antialias: true });
+            this.renderer.setScissorTest(true);
+        }
+        // 共享画布只增不减，容纳最大的预览
+        const size = this.renderer.getSize(new THREE.Vector2());
+        if (size.x < width || size.y < height) {
+            this.renderer.setSize(Math.max(size.x, width), Math.max(size.y, height), false);
+        }
+        return this.renderer;
+    }
+    
+    add(preview) {
+        if (this.releaseTimer !== null) {
+            clearTimeout(this.releaseTimer);
+            this.releaseTimer = null;
+        }
+        this.previews.add(preview);
+        if ("IntersectionObserver" in window) {
+            preview.observer = new IntersectionObserver(([entry]) => {
+                preview.visible = entry.isIntersecting;
+                this.requestRender(preview);
+            });
+            preview.observer.observe(preview.canvas);
+        }
+        this.requestRender(preview);
+    }
+    
+    remove(preview) {
+        if (!this.previews.delete(preview)) {
+            return;
+        }
+        preview.disposed = true;
+        preview.observer?.disconnect();
+        disposeScene(preview.scene);
+        
+        // 最后一个预览移除后停止循环，空闲一段时间仍没有新预览时再释放 WebGL 上下文
+        if (this.previews.size === 0) {
+            if (this.frameId !== null) {
+                cancelAnimationFrame(this.frameId);
+                this.frameId = null;
+            }
+            if (this.renderer && this.releaseTimer === null) {
+                this.releaseTimer = setTimeout(() => this.releaseRenderer(), RENDERER_IDLE_MS);
+            }
+        }
+    }
+    
+    releaseRenderer() {
+        this.releaseTimer = null;
+        if (this.renderer && this.previews.size === 0) {
+            this.renderer.dispose();
+            this.renderer.forceContextLoss();
+            this.renderer = null;
+        }
+    }
+    
+    requestRender(preview) {
+        if (preview) {
+            preview.dirty = true;
+        }
+        if (this.frameId === null && this.previews.size > 0) {
+            this.frameId = requestAnimationFrame(() => this.renderFrame());
+        }
+    }
+    
+    renderFrame() {
+        this.frameId = null;
+        const start = performance.now();
+        let rendered = 0;
+        let rotating = false;
+        
+        for (const preview of this.previews) {
+            if (!preview.visible) {
+                continue;
+            }
+            if (preview.rotating) {
+                preview.group.rotation.y += 0.005 * preview.speed;
+                preview.dirty = true;
+                rotating = true;
+            }
+            if (preview.dirty) {
+                preview.dirty = false;
+                this.renderPreview(preview);
+                rendered++;
+            }
+        }
+        
+        if (rendered > 0) {
+            this.frameTimes.push(performance.now() - start);
+            if (this.frameTimes.length > FRAME_STATS_SIZE) {
+                this.frameTimes.shift();
+            }
+            this.frameCount++;
+            this.renderCount += rendered;
+        }
+        if (rotating) {
+            this.requestRender();
+        }
+    }
+    
+    renderPreview(preview) {
+        const { canvas, context } = preview;
+        const width = canvas.width;
+        const height = canvas.height;
+        const renderer = this.getRenderer(width, height);
+        
+        renderer.setViewport(0, 0, width, height);
+        renderer.setScissor(0, 0, width, height);
+        renderer.render(preview.scene, preview.camera);
+        preview.drawCalls = renderer.info.render.calls;
+        
+        // WebGL 视口原点在左下角，2D 画布原点在左上角
+        const source = renderer.domElement;
+        context.drawImage(source, 0, source.height - height, width, height, 0, 0, width, height);
+    }
+    
+    // 立即上传纹理并计时（否则上传发生在下一次绘制中，和绘制耗时混在一起）
+    uploadTexture(preview, texture) {
+        const renderer = this.getRenderer(1, 1);
+        if (!renderer.initTexture) {
+            return;
+        }
+        const start = performance.now();
+        renderer.initTexture(texture);
+        preview.uploadMs = (preview.uploadMs || 0) + performance.now() - start;
+    }
+    
+    stats() {
+        const times = this.frameTimes;
+        const total = times.reduce((sum, time) => sum + time, 0);
+        return {
+            previews: this.previews.size,
+            running: this.frameId !== null,
+            frames: this.frameCount,
+            renders: this.renderCount,
+            drawCalls: [...this.previews].reduce((sum, preview) => sum + (preview.drawCalls || 0), 0),
+            avgFrameMs: times.length ? total / times.length : 0,
+            maxFrameMs: times.length ? Math.max(...times) : 0,
+        };
+    }
+}
+
+// 释放场景中的几何体、材质和纹理（图集页的材质和纹理被多个平面共用，只释放一次）
+function disposeScene(scene) {
+    const geometries = new Set();
+    const materials = new Set();
+    scene.traverse((object) => {
+        if (object.geometry) {
+            geometries.add(object.geometry);
+        }
+        if (object.material) {
+            materials.add(object.material);
+        }
+    });
+    geometries.forEach((geometry) => geometry.dispose());
+    materials.forEach((material) => {
+        material.map?.dispose();
+        material.dispose();
+    });
+}
+
+const previewManager = new PreviewManager();
+
+// 环形、球形和转台布局视角较多时使用实例化渲染：所有视角共用一个几何体，每页纹理只有一次绘制调用。
+// 立方体布局、少量视角和流式预览仍逐个创建平面。
+const INSTANCED_MODES = ["carousel", "sphere", "multi_ring", "turntable"];
+const INSTANCING_MIN_VIEWS = 12;
+const CANVAS_ATLAS_MAX_SIZE = 4096;
+
+// 后端各阶段耗时和内存（开启 MULTIVIEW_PROFILE 时节点返回 profile）
+function formatProfile(profile) {
+    const stages = Object.entries(profile.stages_ms || {})
+        .map(([name, ms]) => `${name} ${ms.toFixed(1)}ms`)
+        .join(" / ");
+    const lines = [
+        `后端 ${profile.total_ms.toFixed(1)}ms${stages ? ` (${stages})` : ""}`,
+        `写入 ${(profile.bytes_written / 1024).toFixed(1)} KB`,
+    ];
+    if (profile.peak_rss_mb !== undefined) {
+        lines.push(`峰值内存 ${profile.peak_rss_mb} MB${profile.peak_cuda_mb !== undefined ? ` / 显存 ${profile.peak_cuda_mb} MB` : ""}`);
+    }
+    return lines.join("\n");
+}
+
+const MODE_NAMES = {
+    carousel: "环形",
+    sphere: "球形",
+    cube: "立方体",
+    multi_ring: "多层环形",
+    turntable: "转台",
+};
+
+// TextListDisplay 分页显示：后端只发送摘要和第一页，其余页翻页时再向服务器请求
+function createTextListView(node) {
+    const container = document.createElement("div");
+    container.style.display = "flex";
+    container.style.flexDirection = "column";
+    container.style.gap = "4px";
+    container.style.fontSize = "12px";
+    
+    const body = document.createElement("pre");
+    body.style.margin = "0";
+    body.style.maxHeight = "240px";
+    body.style.overflow = "auto";
+    body.style.whiteSpace = "pre-wrap";
+    body.style.wordBreak = "break-all";
+    container.appendChild(body);
+    
+    const pager = document.createElement("div");
+    pager.style.display = "flex";
+    pager.style.alignItems = "center";
+    pager.style.gap = "6px";
+    const prev = document.createElement("button");
+    prev.textContent = "◀";
+    const next = document.createElement("button");
+    next.textContent = "▶";
+    const label = document.createElement("span");
+    pager.append(prev, label, next);
+    container.appendChild(pager);
+    
+    const view = { summary: null, page: 0, pages: new Map(), request: 0 };
+    
+    const renderItems = (start, items) => {
+        body.textContent = items.map((item, i) => `${start + i + 1}. ${item}`).join("\n");
+    };
+    
+    const showPage = async (page) => {
+        const summary = view.summary;
+        if (!summary) {
+            return;
+        }
+        view.page = Math.max(0, Math.min(page, summary.pages - 1));
+        const kb = (summary.bytes / 1024).toFixed(1);
+        label.textContent = `第 ${view.page + 1}/${summary.pages} 页 · 共 ${summary.count} 项 · ${kb} KB`;
+        prev.disabled = view.page === 0;
+        next.disabled = view.page >= summary.pages - 1;
+        
+        if (view.page === 0) {
+            renderItems(0, summary.head);
+            return;
+        }
+        if (view.pages.has(view.page)) {
+            const cached = view.pages.get(view.page);
+            renderItems(cached.start, cached.items);
+            return;
+        }
+        
+        const request = ++view.request;
+        body.textContent = "⏳ 加载中...";
+        try {
+            const params = new URLSearchParams({ page: view.page, page_size: summary.page_size });
+            const response = await api.fetchApi(`/multiview3d/text_list/${summary.list_id}?${params}`);
+            if (!response.ok) {
+                throw new Error(response.status === 404 ? "列表已过期，请重新运行工作流" : `HTTP ${response.status}`);
+            }
+            const data = await response.json();
+            view.pages.set(data.page, data);
+            if (request === view.request) {
+                renderItems(data.start, data.items);
+            }
+        } catch (error) {
+            if (request === view.request) {
+                body.textContent = `⚠️ ${error.message}`;
+            }
+        }
+    };
+    
+    prev.onclick = () => showPage(view.page - 1);
+    next.onclick = () => showPage(view.page + 1);
+    
+    const widget = node.addDOMWidget("text_list_view", "text_list_view", container, { serialize: false });
+    
+    return {
+        widget,
+        show(summary, text) {
+            view.request++;
+            view.pages.clear();
+            view.summary = summary || null;
+            pager.style.display = summary && summary.pages > 1 ? "flex" : "none";
+            if (summary) {
+                showPage(0);
+            } else {
+                body.textContent = text;
+            }
+        },
+    };
+}
 
 // 注册扩展
 app.registerExtension({
     name: "Comfy.MultiView3DPreview",
     
+    async setup() {
+        // 流式预览：后端每写完一个视角就推送一条消息
+        api.addEventListener("multiview3d.view", ({ detail }) => {
+            const node = app.graph.getNodeById(detail.node);
+            node?.onStreamedView?.(detail);
+        });
+
+        // 保存节点的后台写入失败时节点早已返回，只能在这里提示
+        api.addEventListener("multiview3d.write_failed", ({ detail }) => {
+            console.error(`[MultiView3D] 后台写入失败: ${detail.path}`, detail.error);
+            app.extensionManager?.toast?.add({
+                severity: "error",
+                summary: "多视角 HTML 保存失败",
+                detail: `${detail.path}: ${detail.error}`,
+            });
+        });
+    },
+    
     async beforeRegisterNodeDef(nodeType, nodeData, app) {
+        if (nodeData.name === "MultiViewImageInput") {
+            // 图片输入随连线动态增减：始终只保留一个空的 image_N 输入在末尾
+            const updateImageInputs = function () {
+                const imageInputs = () => (this.inputs || []).filter((input) => input.name.startsWith("image_"));
+                
+                // 移除末尾多余的空输入
+                let inputs = imageInputs();
+                while (inputs.length > 1 && !inputs[inputs.length - 1].link && !inputs[inputs.length - 2].link) {
+                    this.removeInput(this.inputs.indexOf(inputs[inputs.length - 1]));
+                    inputs = imageInputs();
+                }
+                
+                // 最后一个输入已连接时追加一个新的空输入
+                if (inputs.length === 0 || inputs[inputs.length - 1].link) {
+                    this.addInput(`image_${inputs.length + 1}`, "IMAGE");
+                }
+                
+                // 按顺序重新编号，保证后端按连线顺序拼接视角
+                imageInputs().forEach((input, index) => {
+                    input.name = `image_${index + 1}`;
+                    input.label = input.name;
+                });
+                this.setDirtyCanvas(true, true);
+            };
+            
+            const onNodeCreated = nodeType.prototype.onNodeCreated;
+            nodeType.prototype.onNodeCreated = function () {
+                const result = onNodeCreated?.apply(this, arguments);
+                updateImageInputs.call(this);
+                return result;
+            };
+            
+            const onConnectionsChange = nodeType.prototype.onConnectionsChange;
+            nodeType.prototype.onConnectionsChange = function (type) {
+                const result = onConnectionsChange?.apply(this, arguments);
+                if (type === LiteGraph.INPUT) {
+                    updateImageInputs.call(this);
+                }
+                return result;
+            };
+        }
+        
+        if (nodeData.name === "TextListDisplay") {
+            const onExecuted = nodeType.prototype.onExecuted;
+            nodeType.prototype.onExecuted = function (message) {
+                onExecuted?.apply(this, arguments);
+                if (!message || !this.addDOMWidget) {
+                    return;
+                }
+                if (!this.textListView) {
+                    this.textListView = createTextListView(this);
+                }
+                this.textListView.show(message.summary ? message.summary[0] : null, message.text ? message.text[0] : "");
+                this.setDirtyCanvas(true, true);
+            };
+        }
+        
         if (nodeData.name === "MultiView3DPreview") {
             const onNodeCreated = nodeType.prototype.onNodeCreated;
             
             nodeType.prototype.onNodeCreated = function () {
                 const result = onNodeCreated?.apply(this, arguments);
                 
+                // 节点创建时就开始预取 three.js，第一次执行时通常已经加载完成
+                loadThreeJS().catch(() => {});
+                
                 // 创建一个隐藏的widget来存储数据
                 const widget = this.addWidget("button", "3D_preview_widget", null, () => {});
                 widget.serialize = false;
@@ -54,16 +478,49 @@ app.registerExtension({
                     onExecuted.apply(this, arguments);
                 }
                 
-                if (message && message.images) {
+                this.preview3DProfile = message && message.profile ? message.profile[0] : null;
+                
+                // 流式预览已经逐个添加了这次运行的所有视角
+                if (message && message.stream_id && message.stream_id[0] === this.preview3DStreamId) {
+                    return;
+                }
+                
+                // 视角在内存中时放在 views 里，否则是临时目录中的 images
+                const images = message && (message.views || message.images);
+                if (images) {
                     const previewMode = message.preview_mode ? message.preview_mode[0] : "carousel";
                     const rotationSpeed = message.rotation_speed ? message.rotation_speed[0] : 1.0;
                     const autoRotate = message.auto_rotate ? message.auto_rotate[0] : true;
+                    const options = {
+                        atlasRects: message.atlas_rects ? message.atlas_rects[0] : null,
+                        layout: message.layout ? message.layout[0] : null,
+                    };
                     
-                    this.render3DPreview(message.images, previewMode, rotationSpeed, autoRotate);
+                    this.render3DPreview(images, previewMode, rotationSpeed, autoRotate, options);
                 }
             };
             
-            nodeType.prototype.render3DPreview = function (images, mode, speed, autoRotate) {
+            nodeType.prototype.onStreamedView = function (detail) {
+                // 新的一次运行：先建好空场景，视角到达后逐个添加
+                if (this.preview3DStreamId !== detail.stream_id) {
+                    this.preview3DStreamId = detail.stream_id;
+                    this.preview3DAddImage = null;
+                    this.preview3DPending = [];
+                    this.render3DPreview([], detail.preview_mode, detail.rotation_speed, detail.auto_rotate, {
+                        imageCount: detail.total,
+                        streaming: true,
+                    });
+                }
+                
+                if (this.preview3DAddImage) {
+                    this.preview3DAddImage(detail.image, detail.indices, detail.matrices);
+                } else {
+                    // Three.js 还在加载，场景建好后再添加
+                    this.preview3DPending.push(detail);
+                }
+            };
+            
+            nodeType.prototype.render3DPreview = function (images, mode, speed, autoRotate, options = {}) {
                 console.log("Starting 3D preview with", images.length, "images");
                 
                 // 如果没有Three.js，动态加载
@@ -71,38 +528,25 @@ app.registerExtension({
                     console.log("Loading Three.js...");
                     this.loadThreeJS().then(() => {
                         console.log("Three.js loaded successfully");
-                        this.createPreviewContainer(images, mode, speed, autoRotate);
+                        this.createPreviewContainer(images, mode, speed, autoRotate, options);
                     }).catch((error) => {
                         console.error("Failed to load Three.js:", error);
                     });
                 } else {
                     console.log("Three.js already loaded");
-                    this.createPreviewContainer(images, mode, speed, autoRotate);
+                    this.createPreviewContainer(images, mode, speed, autoRotate, options);
                 }
             };
             
             nodeType.prototype.loadThreeJS = function () {
-                return new Promise((resolve, reject) => {
-                    if (document.querySelector('script[src*="three.min.js"]')) {
-                        resolve();
-                        return;
-                    }
-                    
-                    const script = document.createElement('script');
-                    script.src = 'https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js';
-                    script.onload = resolve;
-                    script.onerror = reject;
-                    document.head.appendChild(script);
-                });
+                return loadThreeJS();
             };
             
-            nodeType.prototype.createPreviewContainer = function(images, mode, speed, autoRotate) {
+            nodeType.prototype.createPreviewContainer = function(images, mode, speed, autoRotate, options = {}) {
                 const self = this;
                 
-                // 移除旧容器
-                if (this.preview3DContainer) {
-                    this.preview3DContainer.remove();
-                }
+                // 移除旧容器并释放旧场景
+                this.disposePreview3D();
                 
                 // 创建新容器
                 const container = document.createElement("div");
@@ -147,7 +591,7 @@ app.registerExtension({
                 this.preview3DHint = hint;
                 
                 // 初始化3D场景
-                this.initThreeScene(canvas, hint, images, mode, speed, autoRotate);
+                this.initThreeScene(canvas, hint, images, mode, speed, autoRotate, options);
                 
                 // 更新位置
                 const rect = this.getBounding();
@@ -155,7 +599,7 @@ app.registerExtension({
                 container.style.top = (rect[1] + 80) + "px";
             };
             
-            nodeType.prototype.initThreeScene = function (canvas, hint, images, mode, speed, autoRotate) {
+            nodeType.prototype.initThreeScene = function (canvas, hint, images, mode, speed, autoRotate, options = {}) {
                 const self = this;
                 
                 console.log("Initializing Three.js scene...");
@@ -168,14 +612,28 @@ app.registerExtension({
                 const camera = new THREE.PerspectiveCamera(75, canvas.width / canvas.height, 0.1, 1000);
                 camera.position.z = 5;
                 
-                // 创建渲染器
-                const renderer = new THREE.WebGLRenderer({ canvas: canvas, antialias: true });
-                renderer.setSize(canvas.width, canvas.height);
-                
                 // 创建组
                 const group = new THREE.Group();
                 scene.add(group);
                 
+                // 由共享渲染器绘制，节点画布只用 2D 上下文接收结果
+                const preview = {
+                    canvas,
+                    context: canvas.getContext("2d"),
+                    scene,
+                    camera,
+                    group,
+                    speed,
+                    rotating: autoRotate,
+                    visible: true,
+                    dirty: true,
+                    disposed: false,
+                    loadStart: performance.now(),
+                    loadMs: null,
+                    uploadMs: 0,
+                };
+                this.preview3D = preview;
+                
                 // 添加光源
                 const ambientLight = new THREE.AmbientLight(0xffffff, 0.6);
                 scene.add(ambientLight);
@@ -186,6 +644,10 @@ app.registerExtension({
                 // 转换图片URL
                 const getImageUrl = (imageData) => {
                     if (typeof imageData === 'string') return imageData;
+                    // 内存中的视角由插件路由提供，按内容寻址，浏览器可以一直缓存
+                    if (typeof imageData === 'object' && imageData.view_id) {
+                        return api.apiURL(`/multiview3d/view/${imageData.view_id}`);
+                    }
                     if (typeof imageData === 'object' && imageData.filename) {
                         const params = new URLSearchParams({
                             filename: imageData.filename,
@@ -197,73 +659,151 @@ app.registerExtension({
                     return imageData;
                 };
                 
+                // 视角的摆放由后端统一计算（layout.py），这里只应用每个视角的变换矩阵
+                const layout = options.layout ? [...options.layout] : [];
+                const applyLayout = (object, index) => applyLayoutMatrix(object, layout[index]);
+                
+                // 图集模式下每个视角只占纹理的一块区域：rect 为 [page, x, y, w, h]（归一化，原点在左上角）
+                const createGeometry = (rect) => {
+                    const geometry = new THREE.PlaneGeometry(2, 2);
+                    if (rect) {
+                        const [, x, y, w, h] = rect;
+                        const uv = geometry.attributes.uv;
+                        for (let i = 0; i < uv.count; i++) {
+                            uv.setXY(i, x + uv.getX(i) * w, 1 - y - h + uv.getY(i) * h);
+                        }
+                        uv.needsUpdate = true;
+                    }
+                    return geometry;
+                };
+                
                 // 加载图片
                 const textureLoader = new THREE.TextureLoader();
-                const imageCount = images.length;
+                const atlasRects = options.atlasRects || null;
+                const imageCount = options.imageCount ?? (atlasRects ? atlasRects.length : images.length);
+                const useInstancing = INSTANCED_MODES.includes(mode) && imageCount >= INSTANCING_MIN_VIEWS && !options.streaming;
                 let loadedCount = 0;
                 
                 hint.innerHTML = `⏳ 加载图片 0/${imageCount}...`;
                 
-                images.forEach((imageData, index) => {
+                const readyText = () => {
+                    const modeText = MODE_NAMES[mode] || mode;
+                    const profile = self.preview3DProfile;
+                    const timing = profile ? ` | ⏱️ ${Math.round(profile.total_ms)}ms` : "";
+                    return `✅ ${modeText} | 🖱️ 拖拽 | ${preview.rotating ? '🔄 旋转中' : '⏸️ 暂停'}${timing}`;
+                };
+                
+                const onViewsLoaded = (count) => {
+                    loadedCount += count;
+                    hint.innerHTML = `⏳ 加载图片 ${loadedCount}/${imageCount}...`;
+                    
+                    // 所有图片加载完成
+                    if (loadedCount === imageCount) {
+                        preview.loadMs = performance.now() - preview.loadStart;
+                        hint.innerHTML = readyText();
+                        hint.style.backgroundColor = "rgba(0,128,0,0.7)";
+                        console.log("All images loaded successfully");
+                    }
+                };
+                
+                // 加载一张图片并为它对应的视角创建平面；views 为 [{ index, rect }]
+                const loadImage = (imageData, views) => {
                     const imageUrl = getImageUrl(imageData);
-                    console.log(`Loading image ${index}:`, imageUrl);
+                    console.log(`Loading image for views ${views.map((view) => view.index)}:`, imageUrl);
                     
                     textureLoader.load(imageUrl, (texture) => {
-                        loadedCount++;
-                        hint.innerHTML = `⏳ 加载图片 ${loadedCount}/${imageCount}...`;
-                        
-                        const geometry = new THREE.PlaneGeometry(2, 2);
-                        const material = new THREE.MeshBasicMaterial({
-                            map: texture,
-                            side: THREE.DoubleSide
-                        });
-                        const plane = new THREE.Mesh(geometry, material);
-                        
-                        // 设置位置
-                        if (mode === 'carousel') {
-                            const radius = 3;
-                            const angle = (index / imageCount) * Math.PI * 2;
-                            plane.position.x = Math.cos(angle) * radius;
-                            plane.position.z = Math.sin(angle) * radius;
-                            plane.rotation.y = -angle;
-                        } else if (mode === 'sphere') {
-                            const radius = 3;
-                            const phi = Math.acos(-1 + (2 * index) / imageCount);
-                            const theta = Math.sqrt(imageCount * Math.PI) * phi;
-                            plane.position.x = radius * Math.cos(theta) * Math.sin(phi);
-                            plane.position.y = radius * Math.sin(theta) * Math.sin(phi);
-                            plane.position.z = radius * Math.cos(phi);
-                            plane.lookAt(0, 0, 0);
-                        } else if (mode === 'cube') {
-                            const positions = [
-                                { x: 0, y: 0, z: 2, rx: 0, ry: 0 },
-                                { x: 0, y: 0, z: -2, rx: 0, ry: Math.PI },
-                                { x: -2, y: 0, z: 0, rx: 0, ry: -Math.PI/2 },
-                                { x: 2, y: 0, z: 0, rx: 0, ry: Math.PI/2 },
-                                { x: 0, y: 2, z: 0, rx: -Math.PI/2, ry: 0 },
-                                { x: 0, y: -2, z: 0, rx: Math.PI/2, ry: 0 }
-                            ];
-                            if (index < positions.length) {
-                                const pos = positions[index];
-                                plane.position.set(pos.x, pos.y, pos.z);
-                                plane.rotation.set(pos.rx, pos.ry, 0);
-                            }
+                        // 加载完成前预览已被移除
+                        if (preview.disposed) {
+                            texture.dispose();
+                            return;
                         }
                         
-                        group.add(plane);
-                        
-                        // 所有图片加载完成
-                        if (loadedCount === imageCount) {
-                            const modeText = {'carousel': '环形', 'sphere': '球形', 'cube': '立方体'}[mode] || mode;
-                            hint.innerHTML = `✅ ${modeText} | 🖱️ 拖拽 | ${autoRotate ? '🔄 旋转中' : '⏸️ 暂停'}`;
-                            hint.style.backgroundColor = "rgba(0,128,0,0.7)";
-                            console.log("All images loaded successfully");
+                        previewManager.uploadTexture(preview, texture);
+                        if (useInstancing) {
+                            group.add(createInstancedViews(texture, views, applyLayout));
+                        } else {
+                            // 同一页图集的所有平面共用一个纹理和材质
+                            const material = new THREE.MeshBasicMaterial({
+                                map: texture,
+                                side: THREE.DoubleSide
+                            });
+                            
+                            views.forEach(({ index, rect }) => {
+                                const plane = new THREE.Mesh(createGeometry(rect), material);
+                                applyLayout(plane, index);
+                                group.add(plane);
+                            });
                         }
+                        
+                        onViewsLoaded(views.length);
+                        previewManager.requestRender(preview);
                     }, undefined, (error) => {
-                        console.error(`Failed to load image ${index}:`, error);
-                        loadedCount++;
+                        console.error(`Failed to load image ${imageUrl}:`, error);
+                        loadedCount += views.length;
                         hint.innerHTML = `⚠️ 加载图片 ${loadedCount}/${imageCount} (有错误)`;
                     });
+                };
+                
+                // 实例化渲染需要所有视角在同一张纹理上：普通模式下先在浏览器中拼成图集
+                const loadCanvasAtlas = () => {
+                    const imageLoader = new THREE.ImageLoader();
+                    const imageElements = new Array(images.length).fill(null);
+                    let settled = 0;
+                    
+                    const onSettled = () => {
+                        settled++;
+                        if (settled < images.length || preview.disposed) {
+                            return;
+                        }
+                        const { texture, rects } = buildCanvasAtlas(imageElements, CANVAS_ATLAS_MAX_SIZE);
+                        const views = rects
+                            .map((rect, index) => ({ index, rect }))
+                            .filter((view) => imageElements[view.index]);
+                        if (views.length > 0) {
+                            previewManager.uploadTexture(preview, texture);
+                            group.add(createInstancedViews(texture, views, applyLayout));
+                        } else {
+                            texture.dispose();
+                        }
+                        previewManager.requestRender(preview);
+                    };
+                    
+                    images.forEach((imageData, index) => {
+                        const imageUrl = getImageUrl(imageData);
+                        imageLoader.load(imageUrl, (image) => {
+                            imageElements[index] = image;
+                            onViewsLoaded(1);
+                            onSettled();
+                        }, undefined, (error) => {
+                            console.error(`Failed to load image ${imageUrl}:`, error);
+                            loadedCount += 1;
+                            hint.innerHTML = `⚠️ 加载图片 ${loadedCount}/${imageCount} (有错误)`;
+                            onSettled();
+                        });
+                    });
+                };
+                
+                if (useInstancing && !atlasRects) {
+                    loadCanvasAtlas();
+                } else {
+                    images.forEach((imageData, imageIndex) => {
+                        // 图集页对应的视角；普通模式下每张图片就是一个视角
+                        const views = atlasRects
+                            ? atlasRects.map((rect, index) => ({ index, rect })).filter((view) => view.rect[0] === imageIndex)
+                            : [{ index: imageIndex, rect: null }];
+                        loadImage(imageData, views);
+                    });
+                }
+                
+                // 供流式预览逐个添加视角（同一张图片可能对应多个重复的视角）
+                this.preview3DAddImage = (imageData, indices, matrices = []) => {
+                    indices.forEach((index, i) => {
+                        layout[index] = matrices[i];
+                    });
+                    loadImage(imageData, indices.map((index) => ({ index, rect: null })));
+                };
+                (this.preview3DPending || []).splice(0).forEach((detail) => {
+                    this.preview3DAddImage(detail.image, detail.indices, detail.matrices);
                 });
                 
                 // 鼠标控制
@@ -283,6 +823,7 @@ app.registerExtension({
                         };
                         group.rotation.y += deltaMove.x * 0.01;
                         group.rotation.x += deltaMove.y * 0.01;
+                        previewManager.requestRender(preview);
                     }
                     previousMousePosition = { x: e.offsetX, y: e.offsetY };
                 });
@@ -296,32 +837,51 @@ app.registerExtension({
                 });
                 
                 // 点击切换旋转
-                let isRotating = autoRotate;
                 hint.onclick = () => {
-                    isRotating = !isRotating;
-                    const modeText = {'carousel': '环形', 'sphere': '球形', 'cube': '立方体'}[mode] || mode;
-                    hint.innerHTML = `✅ ${modeText} | 🖱️ 拖拽 | ${isRotating ? '🔄 旋转中' : '⏸️ 暂停'}`;
+                    preview.rotating = !preview.rotating;
+                    hint.innerHTML = readyText();
+                    previewManager.requestRender(preview);
                 };
                 
-                // 动画循环
-                const animate = () => {
-                    requestAnimationFrame(animate);
-                    if (isRotating) {
-                        group.rotation.y += 0.005 * speed;
+                // 悬停时显示共享渲染器的帧耗时、浏览器加载和纹理上传耗时，以及后端的统计
+                hint.onmouseenter = () => {
+                    const stats = previewManager.stats();
+                    const lines = [
+                        `预览 ${stats.previews} 个 | 帧耗时 平均 ${stats.avgFrameMs.toFixed(2)}ms / 最大 ${stats.maxFrameMs.toFixed(2)}ms`,
+                    ];
+                    if (preview.loadMs !== null) {
+                        lines.push(`浏览器 加载图片 ${preview.loadMs.toFixed(1)}ms / 纹理上传 ${preview.uploadMs.toFixed(1)}ms`);
+                    }
+                    if (self.preview3DProfile) {
+                        lines.push(formatProfile(self.preview3DProfile));
                     }
-                    renderer.render(scene, camera);
+                    hint.title = lines.join("\n");
                 };
                 
-                animate();
-                console.log("Animation started");
+                previewManager.add(preview);
+                console.log("Preview registered with shared renderer");
             };
             
-            // 清理
-            const onRemoved = nodeType.prototype.onRemoved;
-            nodeType.prototype.onRemoved = function() {
+            nodeType.prototype.getPreview3DStats = function () {
+                return previewManager.stats();
+            };
+            
+            nodeType.prototype.disposePreview3D = function () {
+                if (this.preview3D) {
+                    previewManager.remove(this.preview3D);
+                    this.preview3D = null;
+                }
                 if (this.preview3DContainer) {
                     this.preview3DContainer.remove();
+                    this.preview3DContainer = null;
                 }
+                this.preview3DAddImage = null;
+            };
+            
+            // 清理
+            const onRemoved = nodeType.prototype.onRemoved;
+            nodeType.prototype.onRemoved = function() {
+                this.disposePreview3D();
                 if (onRemoved) {
                     onRemoved.apply(this, arguments);
                 }
@@ -0,0 +1,72 @@
+/**
+ * 3D 预览的视角渲染辅助函数（不依赖 ComfyUI，使用全局的 THREE）
+ * 节点预览和 test_preview.html 共用，避免各自维护一份着色器和图集代码
+ */
+
+// 视角的摆放由后端统一计算（layout.py）：matrix 为列主序的 16 个数，没有矩阵时保持原位
+export function applyLayoutMatrix(object, matrix) {
+    if (matrix) {
+        object.matrix.fromArray(matrix);
+        object.matrix.decompose(object.position, object.quaternion, object.scale);
+    }
+}
+
+// 实例化材质：每个实例通过 uvRect 属性 (x, y, w, h) 选择纹理中属于自己的区域
+export function createInstancedMaterial(texture) {
+    const material = new THREE.MeshBasicMaterial({ map: texture, side: THREE.DoubleSide });
+    material.onBeforeCompile = (shader) => {
+        shader.vertexShader = shader.vertexShader
+            .replace("#include <common>", "#include <common>\nattribute vec4 uvRect;")
+            .replace("#include <uv_vertex>", "#include <uv_vertex>\n#ifdef USE_UV\n\tvUv = uvRect.xy + vUv * uvRect.zw;\n#endif");
+    };
+    return material;
+}
+
+// 为同一张纹理上的视角创建一个 InstancedMesh；views 为 [{ index, rect }]，rect 为 [page, x, y, w, h]
+export function createInstancedViews(texture, views, applyLayout) {
+    const geometry = new THREE.PlaneGeometry(2, 2);
+    const mesh = new THREE.InstancedMesh(geometry, createInstancedMaterial(texture), views.length);
+    const uvRects = new Float32Array(views.length * 4);
+    
+    views.forEach(({ index, rect }, i) => {
+        const [, x, y, w, h] = rect;
+        uvRects.set([x, 1 - y - h, w, h], i * 4);
+        
+        const dummy = new THREE.Object3D();
+        applyLayout(dummy, index);
+        dummy.updateMatrix();
+        mesh.setMatrixAt(i, dummy.matrix);
+    });
+    
+    geometry.setAttribute("uvRect", new THREE.InstancedBufferAttribute(uvRects, 4));
+    mesh.instanceMatrix.needsUpdate = true;
+    // 包围球只按单个平面计算，实例分布在整个场景中，不能做视锥剔除
+    mesh.frustumCulled = false;
+    return mesh;
+}
+
+// 把多张图片画到一张画布上作为共享纹理；加载失败的图片为 null，对应区域留空
+export function buildCanvasAtlas(imageElements, maxSize) {
+    const valid = imageElements.filter(Boolean);
+    const cols = Math.ceil(Math.sqrt(imageElements.length));
+    const rows = Math.ceil(imageElements.length / cols);
+    const largest = Math.max(1, ...valid.map((image) => Math.max(image.width, image.height)));
+    const cell = Math.max(1, Math.min(largest, Math.floor(maxSize / cols)));
+    
+    const canvas = document.createElement("canvas");
+    canvas.width = cols * cell;
+    canvas.height = rows * cell;
+    const context = canvas.getContext("2d");
+    
+    // 平面是正方形，与逐个创建平面时一样把图片拉伸到整个格子
+    const rects = imageElements.map((image, index) => {
+        const col = index % cols;
+        const row = Math.floor(index / cols);
+        if (image) {
+            context.drawImage(image, col * cell, row * cell, cell, cell);
+        }
+        return [0, (col * cell) / canvas.width, (row * cell) / canvas.height, cell / canvas.width, cell / canvas.height];
+    });
+    
+    return { texture: new THREE.CanvasTexture(canvas), rects };
+}
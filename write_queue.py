@@ -0,0 +1,116 @@
+"""
+SaveMultiView3D 的后台写入队列：编码和写盘放到后台线程，节点拿到最终路径后立即返回
+
+一个后台线程按提交顺序执行任务。排队中（含正在执行）的任务持有的像素数据超过内存预算时
+submit 会阻塞，直到后台线程写完足够的任务（背压）；进程退出前等待所有任务写完。
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+WRITE_QUEUE_MB_ENV = "MULTIVIEW_WRITE_QUEUE_MB"
+# 只保留最近的若干条失败记录
+MAX_FAILURES = 32
+
+
+def _default_max_bytes():
+    """内存预算：环境变量 MULTIVIEW_WRITE_QUEUE_MB，默认 1024 MB"""
+    try:
+        megabytes = float(os.environ.get(WRITE_QUEUE_MB_ENV, ""))
+    except ValueError:
+        megabytes = 0
+    return int((megabytes if megabytes > 0 else 1024) * 2**20)
+
+
+class WriteQueue:
+    """按提交顺序在单个后台线程中执行写入任务
+
+    队列为空时超过预算的单个任务也会被接受，不会永远阻塞。
+    任务失败时记录日志、保存在 failures() 中并调用 on_failure(description, error)，
+    提交返回的 Future 也会带上异常；后面的任务照常执行。
+    """
+
+    def __init__(self, max_bytes=None, on_failure=None):
+        self.max_bytes = _default_max_bytes() if max_bytes is None else max_bytes
+        self.on_failure = on_failure
+        self._jobs = deque()
+        self._pending_bytes = 0
+        self._failures = deque(maxlen=MAX_FAILURES)
+        self._condition = threading.Condition()
+        self._thread = None
+
+    @property
+    def pending_bytes(self):
+        with self._condition:
+            return self._pending_bytes
+
+    def pending(self):
+        """排队中和正在执行的任务数"""
+        with self._condition:
+            return len(self._jobs)
+
+    def submit(self, function, nbytes=0, description=None):
+        """提交任务 function()，nbytes 为任务持有的数据量；超出预算时阻塞到有空间为止"""
+        future = Future()
+        with self._condition:
+            while self._jobs and self._pending_bytes + nbytes > self.max_bytes:
+                self._condition.wait()
+            self._jobs.append((future, function, nbytes, description))
+            self._pending_bytes += nbytes
+            self._start()
+            self._condition.notify_all()
+        return future
+
+    def flush(self, timeout=None):
+        """等待所有已提交的任务完成，超时返回 False"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._jobs, timeout)
+
+    def failures(self):
+        """最近失败的任务 [(description, error)]"""
+        with self._condition:
+            return list(self._failures)
+
+    def _start(self):
+        if self._thread is None:
+            # 守护线程不会阻止解释器退出，由 atexit 中的 flush 保证写完
+            self._thread = threading.Thread(target=self._run, name="multiview_write", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jobs)
+                # 执行完才出队，flush 和内存预算都把正在执行的任务算在内
+                future, function, nbytes, description = self._jobs[0]
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = function()
+                except BaseException as error:
+                    self._report(description, error)
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+            with self._condition:
+                self._jobs.popleft()
+                self._pending_bytes -= nbytes
+                self._condition.notify_all()
+
+    def _report(self, description, error):
+        logger.error("后台写入失败: %s", description, exc_info=error)
+        with self._condition:
+            self._failures.append((description, error))
+        if self.on_failure is not None:
+            try:
+                self.on_failure(description, error)
+            except Exception:
+                logger.exception("后台写入失败回调出错")